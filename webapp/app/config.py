@@ -31,4 +31,106 @@ PRICE_ADJUSTMENT_PERCENT = 0.02  # 2% price adjustment for buy/sell orders
 
 # Order Configuration
 DEFAULT_TIF = "DAY"  # Default Time in Force
-ORDER_CHECK_INTERVAL = 20  # Seconds between order status checks 
\ No newline at end of file
+ORDER_CHECK_INTERVAL = 20  # Seconds between order status checks for resting orders
+ORDER_FAST_POLL_INTERVAL = float(os.environ.get('ORDER_FAST_POLL_INTERVAL', 0.5))  # Seconds, right after submission
+ORDER_FAST_POLL_WINDOW = float(os.environ.get('ORDER_FAST_POLL_WINDOW', 60))  # Seconds an order counts as fresh
+ORDER_MISSING_POLLS = 3  # Polls an order may be absent from the live list before it is dropped
+
+# Chart Render Cache Configuration
+CHART_CACHE_MAX_BYTES = int(os.environ.get('CHART_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+CHART_CACHE_DIR = os.environ.get('CHART_CACHE_DIR')  # Optional on-disk tier
+CHART_CACHE_DISK_MAX_BYTES = int(os.environ.get('CHART_CACHE_DISK_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+
+# Chart Render Pool Configuration
+CHART_RENDER_POOL_SIZE = int(os.environ.get('CHART_RENDER_POOL_SIZE', 0))  # 0 renders inline in the request thread
+CHART_RENDER_QUEUE_SIZE = int(os.environ.get('CHART_RENDER_QUEUE_SIZE', 64))
+CHART_RENDER_TIMEOUT = float(os.environ.get('CHART_RENDER_TIMEOUT', 60))  # Seconds per render job
+CHART_PREWARM = os.environ.get('CHART_PREWARM', 'false').lower() in ('1', 'true', 'yes')  # Warm Kaleido in the background at startup
+
+# Chart Batch Configuration
+CHART_BATCH_WORKERS = int(os.environ.get('CHART_BATCH_WORKERS', os.cpu_count() or 1))
+CHART_BATCH_MAX_JOBS = int(os.environ.get('CHART_BATCH_MAX_JOBS', 500))
+
+# Chart Decimation Configuration
+CHART_MAX_POINTS = int(os.environ.get('CHART_MAX_POINTS', 1000))  # Candles/bars per panel; longer series are bucketed, 0 disables
+CHART_DECIMATION = os.environ.get('CHART_DECIMATION', 'minmax')  # Line downsampling: minmax or lttb
+
+# Chart Renderer Configuration
+CHART_RENDERER = os.environ.get('CHART_RENDERER', 'plotly')  # plotly (Kaleido) or agg (matplotlib raster)
+CHART_IMAGE_QUALITY = int(os.environ.get('CHART_IMAGE_QUALITY', 0))  # JPEG/WebP quality 1-95; 0 keeps the backend default
+
+# Gateway HTTP Client Configuration
+GATEWAY_POOL_SIZE = int(os.environ.get('GATEWAY_POOL_SIZE', 20))  # Keep-alive connections per host
+GATEWAY_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+GATEWAY_ENDPOINT_TIMEOUTS = {
+    '/iserver/marketdata/snapshot': (3.05, 5),
+    '/iserver/marketdata/history': (3.05, 30),
+    '/iserver/account': (3.05, 20),  # Order placement and replies
+}
+GATEWAY_MAX_RETRIES = int(os.environ.get('GATEWAY_MAX_RETRIES', 3))
+GATEWAY_BACKOFF_BASE = 0.2  # Seconds, doubled per attempt with full jitter
+GATEWAY_BACKOFF_MAX = 5.0
+
+# Async Service Configuration
+ASYNC_GATEWAY_CONCURRENCY = int(os.environ.get('ASYNC_GATEWAY_CONCURRENCY', 16))  # Requests in flight per upstream
+ASYNC_NOCODB_CONCURRENCY = int(os.environ.get('ASYNC_NOCODB_CONCURRENCY', 8))
+ASYNC_N8N_CONCURRENCY = int(os.environ.get('ASYNC_N8N_CONCURRENCY', 4))
+ASYNC_CALL_TIMEOUT = float(os.environ.get('ASYNC_CALL_TIMEOUT', 60))  # Seconds a sync wrapper waits for its coroutine
+
+# Quote Cache Configuration
+QUOTE_CACHE_TTL = float(os.environ.get('QUOTE_CACHE_TTL', 2.0))  # Seconds a snapshot counts as fresh
+SNAPSHOT_PRIME_RETRIES = 3  # Extra snapshot calls while a new subscription warms up
+SNAPSHOT_PRIME_DELAY = 0.5  # Seconds between priming calls
+
+# Market Data Stream Configuration
+STREAM_ENABLED = os.environ.get('STREAM_ENABLED', 'true').lower() in ('1', 'true', 'yes')  # Price orders from streamed ticks
+STREAM_URL = os.environ.get('STREAM_URL', BASE_API_URL.replace('https://', 'wss://', 1) + '/ws')
+STREAM_MAX_QUOTE_AGE = float(os.environ.get('STREAM_MAX_QUOTE_AGE', 5.0))  # Seconds a streamed tick may price an order
+STREAM_BAR_SECONDS = int(os.environ.get('STREAM_BAR_SECONDS', 60))  # Tick bars fed to the incremental indicators
+STREAM_HEARTBEAT = 10  # Seconds between keep-alive messages
+STREAM_RECONNECT_BASE = 0.5  # Seconds, doubled per failed reconnect with full jitter
+STREAM_RECONNECT_MAX = 30.0
+
+# Bulk Snapshot Configuration
+SNAPSHOT_CHUNK_SIZE = int(os.environ.get('SNAPSHOT_CHUNK_SIZE', 100))  # Conids per gateway snapshot request
+SNAPSHOT_MAX_CONCURRENCY = int(os.environ.get('SNAPSHOT_MAX_CONCURRENCY', 8))
+SNAPSHOT_RATE_LIMIT = float(os.environ.get('SNAPSHOT_RATE_LIMIT', 10))  # Snapshot requests per second
+
+# NocoDB Write-Behind Configuration
+NOCODB_WRITE_BATCH_SIZE = int(os.environ.get('NOCODB_WRITE_BATCH_SIZE', 50))
+NOCODB_WRITE_FLUSH_INTERVAL = float(os.environ.get('NOCODB_WRITE_FLUSH_INTERVAL', 2.0))  # Seconds
+NOCODB_JOURNAL_PATH = os.environ.get('NOCODB_JOURNAL_PATH', 'data/nocodb_orders.journal')
+
+# Batch Order Configuration
+ORDER_BATCH_MAX_PER_REQUEST = int(os.environ.get('ORDER_BATCH_MAX_PER_REQUEST', 20))  # Orders per gateway POST; 1 if the gateway rejects mixed batches
+ORDER_BATCH_CONCURRENCY = int(os.environ.get('ORDER_BATCH_CONCURRENCY', 4))  # Gateway order requests in flight
+ORDER_MAX_REPLY_ROUNDS = 5  # Confirmation questions answered per submission
+
+# Bar Store Configuration
+BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR', 'data/bars')  # Local columnar history, one directory per conid and bar size
+BAR_STORE_REFRESH_SECONDS = float(os.environ.get('BAR_STORE_REFRESH_SECONDS', 60))  # Serve stored bars without a gateway call for this long
+
+# Metrics Configuration
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_TRACE_HEADER = 'X-Trace'  # Requests sending this header get a Server-Timing stage breakdown
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # Seconds
+METRICS_PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # Bytes
+
+# Local Scanner Configuration
+SCANNER_BARS = int(os.environ.get('SCANNER_BARS', 250))  # Bars per symbol loaded into the scan panel
+SCANNER_MAX_RESULTS = 200
+SCANNER_CACHE_ROWS = int(os.environ.get('SCANNER_CACHE_ROWS', 5000))  # (conid, bar, bars) rows kept between scans
+
+# Backtest Configuration
+BACKTEST_BARS = int(os.environ.get('BACKTEST_BARS', 1000))  # Stored bars per symbol a backtest runs over
+BACKTEST_CAPITAL = float(os.environ.get('BACKTEST_CAPITAL', 100_000))  # Starting capital per symbol for PnL
+BACKTEST_WORKERS = int(os.environ.get('BACKTEST_WORKERS', os.cpu_count() or 1))  # Processes for parameter sweeps
+BACKTEST_MAX_RUNS = int(os.environ.get('BACKTEST_MAX_RUNS', 100_000))  # Parameter combinations x symbols per sweep
+
+# Indicator Data Configuration
+INDICATOR_DATA_BARS = int(os.environ.get('INDICATOR_DATA_BARS', 100))  # Default last-N bars returned
+INDICATOR_DATA_MAX_BARS = int(os.environ.get('INDICATOR_DATA_MAX_BARS', 5000))
+INDICATOR_DATA_PRECISION = int(os.environ.get('INDICATOR_DATA_PRECISION', 4))  # Decimals kept in JSON output
+INDICATOR_DATA_MAX_PRECISION = 12  # Largest precision a request may ask for
+INDICATOR_DATA_GZIP_MIN_BYTES = int(os.environ.get('INDICATOR_DATA_GZIP_MIN_BYTES', 1024))  # Smaller bodies go uncompressed
+INDICATOR_DATA_CACHE_MAX_BYTES = int(os.environ.get('INDICATOR_DATA_CACHE_MAX_BYTES', 32 * 1024 * 1024))
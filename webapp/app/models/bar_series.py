@@ -0,0 +1,113 @@
+from decimal import Decimal
+from operator import itemgetter
+from typing import List, Dict, Any, Optional
+import numpy as np
+from .quote import Quote
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Column names used by the chart DataFrames and the keys of the IBKR
+# /iserver/marketdata/history bars
+DATAFRAME_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+IBKR_HISTORY_KEYS = {'open': 'o', 'high': 'h', 'low': 'l', 'close': 'c', 'volume': 'v'}
+
+
+class BarSeries:
+    """OHLCV bars stored as contiguous float64 columns with a datetime64 index"""
+
+    __slots__ = ('symbol', 'dates', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, dates, open, high, low, close, volume, symbol: Optional[str] = None):
+        self.symbol = symbol
+        self.dates = np.ascontiguousarray(dates, dtype='datetime64[ns]')
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.float64)
+
+        lengths = {len(self.dates)} | {len(getattr(self, field)) for field in FIELDS}
+        if len(lengths) != 1:
+            raise ValueError(f"BarSeries columns have mismatched lengths: {sorted(lengths)}")
+
+    @classmethod
+    def from_dataframe(cls, df, symbol: Optional[str] = None) -> 'BarSeries':
+        """Build from a DataFrame with Date/Open/High/Low/Close/Volume columns
+
+        A DatetimeIndex is used when there is no Date column.
+        """
+        dates = df['Date'].values if 'Date' in df.columns else df.index.values
+        return cls(
+            dates,
+            *(df[DATAFRAME_COLUMNS[field]].to_numpy(dtype=np.float64) for field in FIELDS),
+            symbol=symbol
+        )
+
+    @classmethod
+    def from_ibkr_history(cls, history: Dict[str, Any], symbol: Optional[str] = None) -> 'BarSeries':
+        """Build from the JSON returned by /iserver/marketdata/history"""
+        bars = history.get('data') or []
+        count = len(bars)
+
+        def column(key, dtype):
+            return np.fromiter(map(itemgetter(key), bars), dtype=dtype, count=count)
+
+        # Bar timestamps are epoch milliseconds
+        dates = column('t', np.int64).astype('datetime64[ms]')
+        return cls(
+            dates,
+            *(column(IBKR_HISTORY_KEYS[field], np.float64) for field in FIELDS),
+            symbol=symbol or history.get('symbol')
+        )
+
+    @classmethod
+    def from_quotes(cls, quotes: List[Quote], symbol: Optional[str] = None) -> 'BarSeries':
+        """Build from a list of Quote objects"""
+        count = len(quotes)
+        return cls(
+            np.array([quote.date for quote in quotes], dtype='datetime64[ns]'),
+            *(np.fromiter((float(getattr(quote, field)) for quote in quotes), dtype=np.float64, count=count)
+              for field in FIELDS),
+            symbol=symbol
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index) -> 'BarSeries':
+        """Slice the series; integer and boolean-mask indexing return views where NumPy does"""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return BarSeries(
+            self.dates[index], *(getattr(self, field)[index] for field in FIELDS), symbol=self.symbol
+        )
+
+    def tail(self, count: int) -> 'BarSeries':
+        """Return the last count bars"""
+        return self[max(len(self) - count, 0):]
+
+    def between(self, start=None, end=None) -> 'BarSeries':
+        """Return bars with start <= date <= end"""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start, 'ns'), side='left')
+        hi = len(self) if end is None else np.searchsorted(self.dates, np.datetime64(end, 'ns'), side='right')
+        return self[lo:hi]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Return the OHLCV columns keyed by field name"""
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def to_dataframe(self):
+        """Convert to a DataFrame with the chart service's column names"""
+        import pandas as pd
+        data = {'Date': self.dates}
+        data.update({DATAFRAME_COLUMNS[field]: getattr(self, field) for field in FIELDS})
+        return pd.DataFrame(data)
+
+    def to_quotes(self) -> List[Quote]:
+        """Convert to Quote objects for the Decimal reference indicators"""
+        dates = self.dates.astype('datetime64[us]').tolist()
+        rows = zip(dates, *(getattr(self, field).tolist() for field in FIELDS))
+        return [
+            Quote(date, *(Decimal(repr(value)) for value in values))
+            for date, *values in rows
+        ]
@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+@dataclass
+class ChartJob:
+    symbol: str
+    df: Any  # DataFrame with Date/Open/High/Low/Close/Volume columns
+    timeframe: str = '1d'
+    index: Optional[int] = None  # position in the request, for batch output names
+
+@dataclass
+class ChartResult:
+    symbol: str
+    timeframe: str
+    image: Optional[bytes] = None
+    error: Optional[str] = None
+    cached: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+    index: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def summary(self) -> Dict[str, Any]:
+        """Result metadata without the image bytes"""
+        return {
+            'index': self.index,
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'ok': self.ok,
+            'error': self.error,
+            'cached': self.cached,
+            'bytes': len(self.image) if self.image else 0,
+            'timings': self.timings
+        }
@@ -0,0 +1,89 @@
+import logging
+from flask import Blueprint, jsonify, request
+from ..config import BACKTEST_BARS, BACKTEST_CAPITAL, BACKTEST_WORKERS, PRICE_ADJUSTMENT_PERCENT
+from ..services.backtest_service import BacktestService
+from ..utils.backtest import BacktestError
+from ..utils.bar_store import BarStoreKeyError
+from ..utils.scanner import ScanExpressionError
+
+logger = logging.getLogger(__name__)
+
+backtest_bp = Blueprint('backtest', __name__)
+
+
+def _rules(body):
+    entry, exit = body.get('entry'), body.get('exit')
+    if not body.get('conids') or not entry or not exit:
+        raise BacktestError('conids, entry and exit are required')
+    if not isinstance(body['conids'], list) or not isinstance(entry, str) or not isinstance(exit, str):
+        raise BacktestError('conids must be a list and entry and exit expression strings')
+    return entry, exit
+
+
+def _positive_int(body, name, default):
+    try:
+        value = int(body.get(name, default))
+    except (TypeError, ValueError):
+        raise BacktestError(f"{name} must be an integer")
+    if value < 1:
+        raise BacktestError(f"{name} must be at least 1")
+    return value
+
+
+@backtest_bp.route('/backtest', methods=['POST'])
+def backtest():
+    """Backtest entry/exit expressions over stored bars
+
+    Body: {"conids": [...], "entry": "st_dir > 0 and rsi < {rsi_low}", "exit": "st_dir < 0",
+    "fields": {"st_dir": "st_direction({period},3)"}, "params": {"rsi_low": 40, "period": 10},
+    "bars": 1000, "bar": "1d", "adjustment_percent": 0.001, "capital": 100000}
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        entry, exit = _rules(body)
+        result = BacktestService.backtest(
+            body['conids'], entry, exit,
+            params=body.get('params'),
+            fields=body.get('fields'),
+            bars=_positive_int(body, 'bars', BACKTEST_BARS),
+            bar=body.get('bar', '1d'),
+            adjustment_percent=float(body.get('adjustment_percent', PRICE_ADJUSTMENT_PERCENT)),
+            capital=float(body.get('capital', BACKTEST_CAPITAL))
+        )
+    except (BacktestError, ScanExpressionError, BarStoreKeyError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error running backtest: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    return jsonify(result)
+
+
+@backtest_bp.route('/backtest/sweep', methods=['POST'])
+def sweep():
+    """Backtest every combination of a parameter grid
+
+    Body: as /backtest, with "grid": {"period": [7, 10, 14], "rsi_low": [30, 40]} instead of
+    "params", plus "workers", "sort_by": "total_return", "limit": 20 and "include_symbols": false
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        entry, exit = _rules(body)
+        result = BacktestService.sweep(
+            body['conids'], entry, exit,
+            grid=body.get('grid') or {},
+            fields=body.get('fields'),
+            bars=_positive_int(body, 'bars', BACKTEST_BARS),
+            bar=body.get('bar', '1d'),
+            adjustment_percent=float(body.get('adjustment_percent', PRICE_ADJUSTMENT_PERCENT)),
+            capital=float(body.get('capital', BACKTEST_CAPITAL)),
+            workers=_positive_int(body, 'workers', BACKTEST_WORKERS),
+            include_symbols=bool(body.get('include_symbols', False)),
+            sort_by=body.get('sort_by', 'total_return'),
+            limit=_positive_int(body, 'limit', 20)
+        )
+    except (BacktestError, ScanExpressionError, BarStoreKeyError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error running backtest sweep: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    return jsonify(result)
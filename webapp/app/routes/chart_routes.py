@@ -0,0 +1,179 @@
+import json
+import logging
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from ..config import CHART_BATCH_MAX_JOBS, CHART_PREWARM
+from ..models.bar_series import BarSeries
+from ..models.chart_job import ChartJob, ChartResult
+from ..services.market_data_service import MarketDataService
+from ..services.technical_chart_service import TechnicalChartService
+from ..utils.chart_cache import safe_name
+from ..utils.chart_renderers import available_renderers
+
+logger = logging.getLogger(__name__)
+
+chart_bp = Blueprint('charts', __name__)
+
+IMAGE_MIME_TYPES = {'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp'}
+HISTORY_FETCH_THREADS = 8
+
+
+@chart_bp.record_once
+def _prewarm_on_register(state):
+    """Start warming Kaleido as soon as the blueprint is registered on the app"""
+    if CHART_PREWARM:
+        TechnicalChartService.prewarm(background=True)
+
+
+class _StreamBuffer:
+    """Write-only file object that hands written bytes back to a streaming response"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _load_job(index, spec):
+    """Turn one request job into a ChartJob, fetching history when only a conid is given"""
+    symbol = spec.get('symbol') or str(spec.get('conid'))
+    timeframe = spec.get('timeframe') or spec.get('bar', '1d')
+    if 'bars' in spec:
+        series = BarSeries.from_ibkr_history({'data': spec['bars']}, symbol)
+    else:
+        series = MarketDataService.get_bar_series(spec['conid'], spec.get('period', '1y'), spec.get('bar', '1d'))
+        series.symbol = symbol
+    if not len(series):
+        raise ValueError(f"No historical data for {symbol}")
+    return ChartJob(symbol, series.to_dataframe(), timeframe, index)
+
+
+def _load_jobs(specs):
+    """Load all jobs concurrently; failures become ChartResults instead of jobs"""
+    def load(index, spec):
+        try:
+            return _load_job(index, spec)
+        except Exception as e:
+            symbol = spec.get('symbol') or str(spec.get('conid'))
+            logger.error(f"Error loading chart data for {symbol}: {str(e)}")
+            return ChartResult(symbol, spec.get('timeframe') or spec.get('bar', '1d'), error=str(e), index=index)
+
+    with ThreadPoolExecutor(max_workers=HISTORY_FETCH_THREADS) as pool:
+        loaded = list(pool.map(load, range(len(specs)), specs))
+    return [item for item in loaded if isinstance(item, ChartJob)], [item for item in loaded if isinstance(item, ChartResult)]
+
+
+def _results(jobs, failures, width, height, image_format, renderer=None, quality=None):
+    yield from failures
+    yield from TechnicalChartService.generate_charts(jobs, width, height, image_format,
+                                                     renderer=renderer, quality=quality)
+
+
+def _entry_name(result, image_format):
+    """Zip entry or part file name; symbol and timeframe come from the request, so only letters and digits are kept"""
+    return f"{result.index:03d}_{safe_name(result.symbol)}_{safe_name(result.timeframe)}.{image_format}"
+
+
+def _stream_zip(results, image_format):
+    buffer = _StreamBuffer()
+    summaries = []
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for result in results:
+            summaries.append(result.summary())
+            if result.ok:
+                archive.writestr(_entry_name(result, image_format), result.image)
+            yield buffer.drain()
+        archive.writestr('results.json', json.dumps(summaries, indent=2))
+    yield buffer.drain()
+
+
+def _stream_multipart(results, image_format, boundary):
+    summaries = []
+    for result in results:
+        summary = result.summary()
+        summaries.append(summary)
+        if result.ok:
+            headers = (
+                f"--{boundary}\r\n"
+                f"Content-Type: {IMAGE_MIME_TYPES[image_format]}\r\n"
+                f"Content-Disposition: attachment; filename=\"{_entry_name(result, image_format)}\"\r\n"
+                f"X-Chart-Result: {json.dumps(summary)}\r\n\r\n"
+            )
+            yield headers.encode() + result.image + b"\r\n"
+        else:
+            yield (
+                f"--{boundary}\r\n"
+                f"Content-Type: application/json\r\n\r\n"
+                f"{json.dumps(summary)}\r\n"
+            ).encode()
+    yield (
+        f"--{boundary}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Disposition: attachment; filename=\"results.json\"\r\n\r\n"
+        f"{json.dumps(summaries)}\r\n"
+        f"--{boundary}--\r\n"
+    ).encode()
+
+
+@chart_bp.route('/charts/batch', methods=['POST'])
+def generate_chart_batch():
+    """Render charts for many symbols and stream them back as they finish
+
+    Body: {"jobs": [{"symbol", "conid", "period", "bar", "timeframe"} or
+    {"symbol", "bars": [IBKR history bars], "timeframe"}], "width", "height",
+    "format", "renderer": "plotly" | "agg", "quality", "output": "zip" | "multipart"}
+    """
+    payload = request.get_json(silent=True) or {}
+    specs = payload.get('jobs') or []
+    image_format = payload.get('format', 'jpeg').lower()
+    output = payload.get('output', 'zip')
+    renderer = payload.get('renderer')
+    try:
+        width = int(payload.get('width', 1920))
+        height = int(payload.get('height', 2048))
+        quality = int(payload['quality']) if payload.get('quality') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "width, height and quality must be integers"}), 400
+
+    if not specs:
+        return jsonify({"error": "No chart jobs supplied"}), 400
+    if len(specs) > CHART_BATCH_MAX_JOBS:
+        return jsonify({"error": f"Batch exceeds {CHART_BATCH_MAX_JOBS} jobs"}), 400
+    if image_format not in IMAGE_MIME_TYPES:
+        return jsonify({"error": f"Unsupported image format: {image_format}"}), 400
+    if output not in ('zip', 'multipart'):
+        return jsonify({"error": f"Unsupported output: {output}"}), 400
+    if renderer is not None and renderer not in available_renderers():
+        return jsonify({"error": f"Unsupported renderer: {renderer}"}), 400
+    if quality is not None and not 1 <= quality <= 95:
+        return jsonify({"error": "quality must be between 1 and 95"}), 400
+
+    started = time.perf_counter()
+    jobs, failures = _load_jobs(specs)
+    logger.info(f"Loaded {len(jobs)} chart jobs ({len(failures)} failed) in {time.perf_counter() - started:.2f}s")
+    results = _results(jobs, failures, width, height, image_format, renderer, quality)
+
+    if output == 'multipart':
+        boundary = uuid.uuid4().hex
+        return Response(
+            stream_with_context(_stream_multipart(results, image_format, boundary)),
+            mimetype=f"multipart/mixed; boundary={boundary}"
+        )
+    return Response(
+        stream_with_context(_stream_zip(results, image_format)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename="charts.zip"'}
+    )
@@ -0,0 +1,68 @@
+import logging
+from flask import Blueprint, Response, jsonify, request
+from ..config import INDICATOR_DATA_BARS, INDICATOR_DATA_PRECISION
+from ..services.indicator_data_service import IndicatorDataError, IndicatorDataService
+from ..utils.bar_store import BarStoreKeyError
+from ..utils.columnar import MIME_TYPES, available_formats
+
+logger = logging.getLogger(__name__)
+
+indicator_bp = Blueprint('indicators', __name__)
+
+
+def _data_format():
+    """The format query parameter, else the best Accept match among installed formats, else JSON"""
+    if request.args.get('format'):
+        return request.args['format'].lower()
+    formats = available_formats()
+    by_mime_type = {MIME_TYPES[name]: name for name in formats}
+    best = request.accept_mimetypes.best_match([MIME_TYPES['json']] + [
+        MIME_TYPES[name] for name in formats if name != 'json'
+    ])
+    return by_mime_type.get(best, 'json')
+
+
+@indicator_bp.route('/indicators/<conid>', methods=['GET'])
+def indicator_data(conid):
+    """OHLCV plus indicator columns for the latest bars, for steps that need numbers rather than a chart
+
+    Query: period=1y, bar=1d, last=100, fields=date,close,rsi,st_direction
+    (default: everything), format=json | msgpack | arrow (or via Accept),
+    precision=4 (JSON decimals, 0-12). Honours If-None-Match against the ETag
+    and gzips large bodies for clients sending Accept-Encoding: gzip.
+    """
+    fields = [name.strip() for name in request.args.get('fields', '').split(',') if name.strip()]
+    try:
+        last = int(request.args.get('last', INDICATOR_DATA_BARS))
+        precision = int(request.args.get('precision', INDICATOR_DATA_PRECISION))
+    except ValueError:
+        return jsonify({'error': 'last and precision must be integers'}), 400
+    try:
+        result = IndicatorDataService.get_indicator_data(
+            conid,
+            period=request.args.get('period', '1y'),
+            bar=request.args.get('bar', '1d'),
+            last=last,
+            fields=fields or None,
+            data_format=_data_format(),
+            precision=precision,
+            etags=request.if_none_match.as_set(include_weak=True),
+            compress=request.accept_encodings['gzip'] > 0
+        )
+    except (IndicatorDataError, BarStoreKeyError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting indicator data for {conid}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    headers = {
+        'ETag': f'W/"{result["etag"]}"',
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept, Accept-Encoding',
+        'X-Rows': str(result['rows'])
+    }
+    if result['body'] is None:
+        return Response(status=304, headers=headers)
+    if result['encoding']:
+        headers['Content-Encoding'] = result['encoding']
+    return Response(result['body'], mimetype=result['mime_type'], headers=headers)
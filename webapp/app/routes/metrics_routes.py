@@ -0,0 +1,50 @@
+import json
+import logging
+from flask import Blueprint, Response, g, request
+from ..config import METRICS_TRACE_HEADER
+from ..services.http_client import gateway_client, nocodb_client, n8n_client
+from ..utils.metrics import end_trace, registry, start_trace
+
+logger = logging.getLogger(__name__)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _client_lines():
+    """Retry counts from the shared HTTP clients, which the stage metrics do not see"""
+    lines = [
+        '# HELP webapp_upstream_retries_total Retried upstream HTTP attempts',
+        '# TYPE webapp_upstream_retries_total counter'
+    ]
+    for client in (gateway_client, nocodb_client, n8n_client):
+        for endpoint, stats in sorted(client.metrics().items()):
+            lines.append(f'webapp_upstream_retries_total{{client="{client.name}",endpoint="{endpoint}"}} {stats["retries"]}')
+    return '\n'.join(lines) + '\n'
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(registry.render_prometheus() + _client_lines(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@metrics_bp.before_app_request
+def _start_request_trace():
+    if request.headers.get(METRICS_TRACE_HEADER):
+        g.metrics_trace = start_trace()
+
+
+@metrics_bp.after_app_request
+def _finish_request_trace(response):
+    """Attach the traced stages as Server-Timing entries and log the full breakdown"""
+    token = g.pop('metrics_trace', None)
+    if token is None:
+        return response
+    spans = end_trace(token)
+    response.headers['Server-Timing'] = ', '.join(
+        f'{index};desc="{span["stage"]}";dur={span["ms"]}' for index, span in enumerate(spans)
+    )
+    logger.info(f"Trace {request.method} {request.path}: {json.dumps(spans)}")
+    return response
@@ -0,0 +1,52 @@
+import logging
+from flask import Blueprint, jsonify, request
+from ..config import SCANNER_BARS
+from ..services.scanner_service import ScannerService
+from ..utils.bar_store import BarStoreKeyError
+from ..utils.scanner import ScanExpressionError
+
+logger = logging.getLogger(__name__)
+
+scanner_bp = Blueprint('scanner', __name__)
+
+
+@scanner_bp.route('/scanner/local', methods=['POST'])
+def local_scan():
+    """Scan stored bars with a filter/rank expression
+
+    Body: {"conids": [...], "filter": "rsi < 30 and crosses_above(st_direction, 0)",
+    "rank": "-rsi", "limit": 50, "columns": ["close", "rsi"], "bars": 250, "bar": "1d"}
+    """
+    body = request.get_json(silent=True) or {}
+    conids = body.get('conids') or []
+    if not conids or not isinstance(conids, list):
+        return jsonify({'error': 'conids must be a non-empty list'}), 400
+    try:
+        limit = int(body.get('limit', 50))
+        bars = int(body.get('bars', SCANNER_BARS))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit and bars must be integers'}), 400
+    if limit < 1 or bars < 1:
+        return jsonify({'error': 'limit and bars must be at least 1'}), 400
+    columns = body.get('columns') or ['close', 'rsi']
+    if not isinstance(columns, list) or not all(isinstance(name, str) for name in columns):
+        return jsonify({'error': 'columns must be a list of field names'}), 400
+    if not all(isinstance(body.get(key) or '', str) for key in ('filter', 'rank')):
+        return jsonify({'error': 'filter and rank must be expression strings'}), 400
+    try:
+        result = ScannerService.run_scan(
+            conids,
+            filter_expression=body.get('filter'),
+            rank_expression=body.get('rank'),
+            ascending=bool(body.get('ascending', False)),
+            limit=limit,
+            columns=columns,
+            bars=bars,
+            bar=body.get('bar', '1d')
+        )
+    except (ScanExpressionError, BarStoreKeyError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error running local scan: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    return jsonify(result)
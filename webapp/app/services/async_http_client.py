@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+import aiohttp
+from ..config import (
+    BASE_API_URL, NOCODB_BASE_URL, NOCODB_API_TOKEN, N8N_WEBHOOK_URL, GATEWAY_TIMEOUT, GATEWAY_ENDPOINT_TIMEOUTS,
+    GATEWAY_MAX_RETRIES, GATEWAY_BACKOFF_BASE, GATEWAY_BACKOFF_MAX,
+    ASYNC_GATEWAY_CONCURRENCY, ASYNC_NOCODB_CONCURRENCY, ASYNC_N8N_CONCURRENCY
+)
+from ..utils.metrics import registry as metrics_registry, tracing
+from .http_client import ClientPolicy, endpoint_name
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseError(aiohttp.ClientResponseError):
+    """Raised by AsyncResponse.raise_for_status; .response carries the body"""
+
+    def __init__(self, response: 'AsyncResponse'):
+        super().__init__(response.request_info, (), status=response.status_code,
+                         message=response.reason or '', headers=response.headers)
+        self.response = response
+
+
+class AsyncResponse:
+    """A fully read response with the parts of the requests.Response API the services use"""
+
+    __slots__ = ('status_code', 'reason', 'headers', 'content', 'request_info')
+
+    def __init__(self, status_code: int, reason: Optional[str], headers, content: bytes, request_info):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.request_info = request_info
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ResponseError(self)
+
+
+class AsyncHttpClient(ClientPolicy):
+    """aiohttp counterpart of HttpClient with a bound on requests in flight
+
+    Timeouts, retry rules, per-endpoint stats and stage metrics are the
+    same as HttpClient's. At most `concurrency` attempts to this upstream
+    run at once (backoff sleeps do not hold a slot), so a burst of
+    coroutines queues here instead of overwhelming the gateway or NocoDB.
+    The session and limit belong to the event loop that first uses them.
+    Using the client from another loop raises until close() has been
+    awaited on the first one, since a session cannot be closed from a
+    loop that does not own it.
+    """
+
+    def __init__(self, base_url: str, concurrency: int = ASYNC_GATEWAY_CONCURRENCY, verify: bool = True,
+                 timeout: Tuple[float, float] = GATEWAY_TIMEOUT,
+                 endpoint_timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_retries: int = GATEWAY_MAX_RETRIES, backoff_base: float = GATEWAY_BACKOFF_BASE,
+                 backoff_max: float = GATEWAY_BACKOFF_MAX, headers: Optional[Dict[str, str]] = None,
+                 name: str = 'http'):
+        super().__init__(base_url, verify, timeout, endpoint_timeouts, max_retries, backoff_base, backoff_max, name)
+        self.concurrency = concurrency
+        self.headers = dict(headers or {})
+        self._loop = None
+        self._session = None
+        self._slots = None
+
+    def _bind(self) -> Tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is not loop:
+            raise RuntimeError(f"The {self.name} client's session belongs to another event loop; "
+                               f"await close() on that loop before using it from this one")
+        if self._session is None or self._session.closed:
+            self._loop = loop
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=None if self.verify else False)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._session, self._slots
+
+    async def request(self, method: str, path: str, params=None, json=None, data=None,
+                      timeout: Optional[Tuple[float, float]] = None) -> AsyncResponse:
+        method = method.upper()
+        connect, read = timeout or self.timeout_for(path)
+        client_timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        key = f"{method} {endpoint_name(path)}"
+        stats = self._endpoint_stats(key)
+        session, slots = self._bind()
+
+        attempt = 0
+        first_started = time.perf_counter()
+        while True:
+            response = None
+            error = None
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    async with session.request(method, self.url(path), params=params, json=json, data=data,
+                                               timeout=client_timeout) as reply:
+                        response = AsyncResponse(reply.status, reply.reason, reply.headers, await reply.read(),
+                                                 reply.request_info)
+                    status = response.status_code
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    status = None
+                    error = e
+                self._record_attempt(stats, time.perf_counter() - started, status)
+
+            delay = self._retry_delay(stats, method, path, attempt, status, response, error)
+            if delay is not None:
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if metrics_registry.enabled or tracing():
+                self._record_stage(key, first_started, status, len(response.content) if response is not None else None)
+            if response is None:
+                raise error
+            return response
+
+    async def get(self, path: str, **kwargs) -> AsyncResponse:
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> AsyncResponse:
+        return await self.request('POST', path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> AsyncResponse:
+        return await self.request('DELETE', path, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+# Async counterparts of the shared clients in http_client, each with its own in-flight limit
+async_gateway_client = AsyncHttpClient(BASE_API_URL, concurrency=ASYNC_GATEWAY_CONCURRENCY, verify=False,
+                                       endpoint_timeouts=GATEWAY_ENDPOINT_TIMEOUTS, name='gateway')
+
+async_nocodb_client = AsyncHttpClient(NOCODB_BASE_URL, concurrency=ASYNC_NOCODB_CONCURRENCY,
+                                      headers={"xc-token": NOCODB_API_TOKEN or ""}, name='nocodb')
+
+async_n8n_client = AsyncHttpClient(N8N_WEBHOOK_URL, concurrency=ASYNC_N8N_CONCURRENCY, name='n8n')
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import aiohttp
+from ..config import (
+    MARKET_DATA_FIELDS, PRICE_ADJUSTMENT_PERCENT, SNAPSHOT_PRIME_RETRIES, SNAPSHOT_PRIME_DELAY, SNAPSHOT_CHUNK_SIZE
+)
+from ..utils.async_runner import blocking
+from ..utils.metrics import instrument
+from .async_http_client import async_gateway_client
+from .market_data_service import MarketDataService, parse_price, quote_cache, snapshot_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMarketDataService:
+    """Coroutine versions of the MarketDataService calls on the order path
+
+    Shares the quote cache and snapshot rate limit with MarketDataService,
+    so sync and async callers never double up on gateway snapshot calls.
+    """
+
+    @staticmethod
+    async def _fetch_snapshot(conids, fields=MARKET_DATA_FIELDS):
+        """One rate-limited snapshot request for at most SNAPSHOT_CHUNK_SIZE conids"""
+        await snapshot_rate_limiter.acquire_async()
+        params = {
+            'conids': ','.join(map(str, conids)),
+            'fields': fields
+        }
+        response = await async_gateway_client.get("/iserver/marketdata/snapshot", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    async def _fetch_snapshots(conids, fields=MARKET_DATA_FIELDS):
+        """Snapshots for any number of conids, in gateway-sized chunks requested together"""
+        conids = list(conids)
+        chunks = await asyncio.gather(*(AsyncMarketDataService._fetch_snapshot(conids[i:i + SNAPSHOT_CHUNK_SIZE], fields)
+                                        for i in range(0, len(conids), SNAPSHOT_CHUNK_SIZE)))
+        return [item for chunk in chunks for item in chunk]
+
+    @staticmethod
+    @instrument('market_data.async.get_live_market_data')
+    async def get_live_market_data(conids):
+        """Get live market data for specified conids"""
+        try:
+            return await AsyncMarketDataService._fetch_snapshots([str(c) for c in conids])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching live market data: {str(e)}")
+            raise
+
+    @staticmethod
+    @instrument('market_data.async.get_quotes')
+    async def get_quotes(conids, fields=MARKET_DATA_FIELDS, max_age=None, force=False):
+        """Get snapshots per conid through the short-TTL quote cache
+
+        Returns {conid: {'data', 'fetched_at', 'age', 'cached', 'complete'}}.
+        """
+        async def fetch(missing):
+            return await AsyncMarketDataService._fetch_snapshots(missing, fields)
+
+        try:
+            return await quote_cache.get_many_async(conids, fields, fetch, max_age=max_age, force=force)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching live market data: {str(e)}")
+            raise
+
+    @staticmethod
+    async def get_quote(conid, fields=MARKET_DATA_FIELDS, max_age=None, force=False):
+        """Get a single conid's snapshot through the quote cache"""
+        return (await AsyncMarketDataService.get_quotes([conid], fields, max_age, force))[str(conid)]
+
+    @staticmethod
+    @instrument('market_data.async.prime_snapshots')
+    async def prime_snapshots(conids, fields=MARKET_DATA_FIELDS, retries=SNAPSHOT_PRIME_RETRIES,
+                              delay=SNAPSHOT_PRIME_DELAY):
+        """Warm gateway subscriptions; returns the conids still incomplete (see MarketDataService)"""
+        pending = [str(c) for c in conids]
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                await asyncio.sleep(delay)
+            quotes = await AsyncMarketDataService.get_quotes(pending, fields, force=True)
+            pending = [conid for conid, quote in quotes.items() if not quote['complete']]
+        if pending:
+            logger.warning(f"Snapshots still incomplete after priming: {pending}")
+        return pending
+
+    @staticmethod
+    @instrument('market_data.async.get_historical_data')
+    async def get_historical_data(conid, period='1y', bar='1d', outside_rth=False):
+        """Get historical OHLCV bars for a conid"""
+        try:
+            params = {
+                'conid': conid,
+                'period': period,
+                'bar': bar,
+                'outsideRth': str(outside_rth).lower()
+            }
+            response = await async_gateway_client.get("/iserver/marketdata/history", params=params)
+            response.raise_for_status()
+            return response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching historical data for {conid}: {str(e)}")
+            raise
+
+    @staticmethod
+    @instrument('market_data.async.get_optimal_order_price')
+    async def get_optimal_order_price(conid, side):
+        """Get optimal order price from the streamed tick, else from a snapshot"""
+        try:
+            streamed = MarketDataService.get_streamed_price(conid, side)
+            if streamed is not None:
+                return streamed
+            quote = await AsyncMarketDataService.get_quote(conid)
+            # Field 31 is last price; an empty field means the subscription is not warm yet
+            current_price = parse_price(quote['data'].get('31'))
+            if current_price is None:
+                await AsyncMarketDataService.prime_snapshots([conid])
+                quote = await AsyncMarketDataService.get_quote(conid)
+                current_price = parse_price(quote['data'].get('31'))
+            if current_price is None:
+                logger.error(f"No last price available for {conid}")
+                return None
+
+            return {
+                'current_price': current_price,
+                'adjusted_price': MarketDataService.calculate_adjusted_price(current_price, side),
+                'adjustment_percent': PRICE_ADJUSTMENT_PERCENT * 100,
+                'quote_age': quote['age'],
+                'quote_cached': quote['cached']
+            }
+        except Exception as e:
+            logger.error(f"Error calculating optimal order price: {str(e)}")
+            return None
+
+
+# Sync wrappers for Flask routes: same signatures, run on the shared event loop
+get_live_market_data = blocking(AsyncMarketDataService.get_live_market_data)
+get_quotes = blocking(AsyncMarketDataService.get_quotes)
+get_historical_data = blocking(AsyncMarketDataService.get_historical_data)
+get_optimal_order_price = blocking(AsyncMarketDataService.get_optimal_order_price)
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import time
+import uuid
+import aiohttp
+from ..config import (
+    ACCOUNT_ID, NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_ORDERS_TABLE_ID, DEFAULT_TIF, ORDER_MAX_REPLY_ROUNDS
+)
+from ..utils.async_runner import blocking
+from ..utils.metrics import instrument
+from .async_http_client import async_gateway_client, async_nocodb_client, async_n8n_client
+from .async_market_data_service import AsyncMarketDataService
+from .market_data_service import MarketDataService, parse_price
+from .order_service import OrderService
+from .order_tracker import TrackedOrder, order_tracker
+
+logger = logging.getLogger(__name__)
+
+_UPSTREAM_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class AsyncOrderService:
+    """Coroutine versions of OrderService with independent upstream calls run together
+
+    place_order looks up the quote and the account at the same time, and
+    place_orders looks up the account while the batch is priced; neither
+    submits without an account.
+    Accepted orders are recorded through the same journaled NocoDB queue
+    as OrderService's. Request bodies, NocoDB records and results are
+    the same as OrderService's.
+    """
+
+    @staticmethod
+    @instrument('orders.async.get_account_id')
+    async def get_account_id():
+        """Account to trade in; the gateway also expects /iserver/accounts before order requests"""
+        response = await async_gateway_client.get("/iserver/accounts")
+        response.raise_for_status()
+        data = response.json()
+        return ACCOUNT_ID or data.get('selectedAccount') or next(iter(data.get('accounts') or []), None)
+
+    @staticmethod
+    def _resolved_account(account_id):
+        """get_account_id's result, or ACCOUNT_ID when the lookup failed; raises when neither names an account"""
+        if isinstance(account_id, Exception):
+            if not ACCOUNT_ID:
+                raise account_id
+            logger.warning(f"Account lookup failed, using configured account: {str(account_id)}")
+            account_id = ACCOUNT_ID
+        if not account_id:
+            raise ValueError("No account to trade in: set ACCOUNT_ID or select an account in the gateway")
+        return account_id
+
+    @staticmethod
+    @instrument('orders.async.place_order')
+    async def place_order(conid, order_type, price, quantity, side, tif=DEFAULT_TIF, persist=True, notify=True):
+        """Place an order with price management
+
+        persist queues the order on OrderService's journaled NocoDB writer
+        and notify posts a 'placed' event to the n8n webhook; neither can
+        fail an order the broker accepted.
+        """
+        try:
+            price_data, account_id = await asyncio.gather(
+                AsyncMarketDataService.get_optimal_order_price(conid, side),
+                AsyncOrderService.get_account_id(),
+                return_exceptions=True
+            )
+            account_id = AsyncOrderService._resolved_account(account_id)
+            if price_data:
+                price = price_data['adjusted_price']
+                logger.info(f"Using adjusted price: {price} (original: {price_data['current_price']})")
+
+            data = {
+                "orders": [{
+                    "conid": conid,
+                    "orderType": order_type,
+                    "price": price,
+                    "quantity": quantity,
+                    "side": side,
+                    "tif": tif
+                }]
+            }
+
+            logger.info(f"Placing order: {data}")
+            response = await async_gateway_client.post(f"/iserver/account/{account_id}/orders", json=data)
+
+            if response.status_code != 200:
+                logger.error(f"Failed to place order: {response.text}")
+                return {"error": response.text}, response.status_code
+
+            result = response.json()
+
+            if len(result) > 0:
+                order_response = result[0]
+                status = order_response.get('order_status', 'Submitted')
+                if 'order_id' in order_response:
+                    order_tracker.track(order_response['order_id'], conid, side, quantity, price, status)
+                if persist:
+                    # Through the journaled write-behind queue, so the record survives a NocoDB outage
+                    OrderService.queue_order_for_nocodb(order_response, conid, order_type, price, quantity, side, tif)
+                if notify:
+                    event = TrackedOrder(order_response.get('order_id', ''), conid, side, quantity, price, status).as_dict()
+                    event.update({'event': 'placed', 'detected_at': time.time()})
+                    try:
+                        await AsyncOrderService.notify_n8n(event)
+                    except Exception as e:
+                        logger.error(f"Error notifying n8n of placed order: {str(e)}")
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error placing order: {str(e)}")
+            return {"error": str(e)}, 500
+
+    @staticmethod
+    @instrument('orders.async.place_orders')
+    async def place_orders(orders, auto_confirm=True):
+        """Place many orders, including bracket legs; see OrderService.place_orders
+
+        Returns one result dict per input order, in input order.
+        """
+        orders = [dict(order) for order in orders]
+        for order in orders:
+            order.setdefault('tif', DEFAULT_TIF)
+            order.setdefault('c_oid', f"batch-{uuid.uuid4().hex[:16]}")
+
+        # The account is looked up while the orders are priced
+        account_lookup = asyncio.ensure_future(AsyncOrderService.get_account_id())
+        entry_conids = [order['conid'] for order in orders if not order.get('parent_c_oid')]
+        try:
+            quotes = await AsyncMarketDataService.get_quotes(entry_conids) if entry_conids else {}
+            # Field 31 is last price; cold subscriptions are primed together and re-read once
+            cold = [conid for conid, quote in quotes.items() if parse_price(quote['data'].get('31')) is None]
+            if cold:
+                await AsyncMarketDataService.prime_snapshots(cold)
+                quotes.update(await AsyncMarketDataService.get_quotes(cold))
+        except Exception as e:
+            logger.error(f"Error fetching prices for order batch: {str(e)}")
+            quotes = {}
+        for order in orders:
+            if order.get('parent_c_oid'):
+                continue
+            quote = quotes.get(str(order['conid']))
+            current_price = parse_price(quote['data'].get('31')) if quote else None
+            if current_price is not None:
+                order['price'] = MarketDataService.calculate_adjusted_price(current_price, order['side'])
+
+        try:
+            account_id = AsyncOrderService._resolved_account(
+                (await asyncio.gather(account_lookup, return_exceptions=True))[0])
+        except Exception as e:
+            logger.error(f"Error placing order batch: {str(e)}")
+            return [OrderService._record_result(order, {"error": str(e)}) for order in orders]
+
+        groups = OrderService._pack_order_groups(orders)
+        logger.info(f"Placing {len(orders)} orders in {len(groups)} gateway requests")
+
+        replies = await asyncio.gather(*(
+            AsyncOrderService._submit_orders(group, auto_confirm, account_id) for group in groups
+        ))
+        results = {}
+        for group, group_replies in zip(groups, replies):
+            for order, reply in OrderService._match_replies(group, group_replies):
+                results[order['c_oid']] = OrderService._record_result(order, reply)
+
+        return [results[order['c_oid']] for order in orders]
+
+    @staticmethod
+    @instrument('orders.async.submit_batch')
+    async def _submit_orders(group, auto_confirm, account_id):
+        """POST one orders request and answer confirmation questions; returns the final replies"""
+        try:
+            response = await async_gateway_client.post(
+                f"/iserver/account/{account_id}/orders",
+                json={"orders": [OrderService._gateway_order(order) for order in group]}
+            )
+            if response.status_code != 200:
+                logger.error(f"Failed to place orders: {response.text}")
+                return {"error": response.text, "status_code": response.status_code}
+            replies = response.json()
+
+            for _ in range(ORDER_MAX_REPLY_ROUNDS):
+                questions = [reply for reply in replies if 'id' in reply and 'message' in reply]
+                if not questions or not auto_confirm:
+                    break
+                answered = [reply for reply in replies if reply not in questions]
+                for question in questions:
+                    logger.info(f"Confirming order reply {question['id']}: {question.get('message')}")
+                answers = await asyncio.gather(*(
+                    async_gateway_client.post(f"/iserver/reply/{question['id']}", json={"confirmed": True})
+                    for question in questions
+                ))
+                for question, reply_response in zip(questions, answers):
+                    if reply_response.status_code != 200:
+                        logger.error(f"Failed to confirm order reply: {reply_response.text}")
+                        answered.append({"error": reply_response.text, "id": question['id']})
+                        continue
+                    answered.extend(reply_response.json())
+                replies = answered
+            return replies
+        except _UPSTREAM_ERRORS as e:
+            logger.error(f"Error placing orders: {str(e)}")
+            return {"error": str(e), "status_code": 500}
+
+    @staticmethod
+    @instrument('orders.async.save_to_nocodb')
+    async def save_order_to_nocodb(order_data, conid, order_type, price, quantity, side, tif):
+        """Save order details to NocoDB"""
+        if not all([NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_ORDERS_TABLE_ID]):
+            logger.error("NocoDB orders table configuration is incomplete.")
+            raise ValueError("NocoDB orders table configuration is incomplete")
+
+        path = f"/api/v2/tables/{NOCODB_ORDERS_TABLE_ID}/records"
+
+        payload = OrderService.build_order_record(order_data, conid, order_type, price, quantity, side, tif)
+
+        try:
+            response = await async_nocodb_client.post(path, json=payload)
+            response.raise_for_status()
+            logger.info(f"Saved order {order_data.get('orderId')} to NocoDB")
+        except _UPSTREAM_ERRORS as e:
+            error_msg = f"Error saving order to NocoDB: {str(e)}"
+            if getattr(e, 'response', None) is not None:
+                error_msg += f" - Response: {e.response.text}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+
+    @staticmethod
+    @instrument('orders.async.notify_n8n')
+    async def notify_n8n(event):
+        """Post an order event to the n8n webhook"""
+        try:
+            response = await async_n8n_client.post("", json=event)
+            response.raise_for_status()
+        except _UPSTREAM_ERRORS as e:
+            logger.error(f"Error sending order event to n8n: {str(e)}")
+            raise
+
+
+# Sync wrappers for Flask routes: same signatures, run on the shared event loop
+place_order = blocking(AsyncOrderService.place_order)
+place_orders = blocking(AsyncOrderService.place_orders)
+save_order_to_nocodb = blocking(AsyncOrderService.save_order_to_nocodb)
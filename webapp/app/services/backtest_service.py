@@ -0,0 +1,143 @@
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ..config import (
+    PRICE_ADJUSTMENT_PERCENT, BACKTEST_BARS, BACKTEST_CAPITAL, BACKTEST_WORKERS, BACKTEST_MAX_RUNS
+)
+from ..utils.backtest import (
+    SUMMARY_METRICS, BacktestError, check_templates, parameter_grid, per_symbol, run_backtest, summarize
+)
+from ..utils.indicator_graph import IndicatorGraph
+from ..utils.metrics import instrument
+from ..utils.scanner import ExpressionFields
+from .market_data_service import MarketDataService
+from .scanner_service import ScannerService
+
+logger = logging.getLogger(__name__)
+
+# Chunks per worker, so faster workers pick up the slack
+_CHUNKS_PER_WORKER = 4
+
+# Set in each sweep worker process by _init_sweep_worker
+_sweep_spec = None
+
+
+def _init_sweep_worker(spec):
+    global _sweep_spec
+    _sweep_spec = spec
+
+
+def _run_sweep_chunk(combos, spec=None):
+    """Sweep worker: run consecutive combinations on one indicator graph so they share nodes"""
+    spec = spec or _sweep_spec
+    fields = ExpressionFields(IndicatorGraph(spec['columns']))
+    return [
+        run_backtest(fields, spec['entry'], spec['exit'], MarketDataService.calculate_adjusted_price,
+                     spec['adjustment_percent'], params, spec['aliases'], spec['capital'])
+        for params in combos
+    ]
+
+
+class BacktestService:
+    @staticmethod
+    @instrument('backtest.run')
+    def backtest(conids, entry, exit, params=None, fields=None, bars=BACKTEST_BARS, bar='1d',
+                 adjustment_percent=PRICE_ADJUSTMENT_PERCENT, capital=BACKTEST_CAPITAL):
+        """Backtest one rule set over the stored bars of every conid
+
+        entry/exit are scanner expressions, fields names extra indicator
+        nodes; see run_backtest. Fills use the live order path's
+        calculate_adjusted_price limit prices.
+        """
+        panel, missing = ScannerService.load_panel(conids, bars, bar)
+        if not len(panel):
+            raise BacktestError(f"No conid has {bars} stored {bar} bars")
+        metrics = run_backtest(panel.fields, entry, exit, MarketDataService.calculate_adjusted_price,
+                               adjustment_percent, params, fields, capital)
+        return {
+            'summary': summarize(metrics),
+            'symbols': per_symbol(panel.symbols, metrics),
+            'missing': missing,
+            'skipped': panel.skipped
+        }
+
+    @staticmethod
+    @instrument('backtest.sweep')
+    def sweep(conids, entry, exit, grid, fields=None, bars=BACKTEST_BARS, bar='1d',
+              adjustment_percent=PRICE_ADJUSTMENT_PERCENT, capital=BACKTEST_CAPITAL,
+              workers=BACKTEST_WORKERS, include_symbols=False, sort_by='total_return', limit=None):
+        """Backtest every combination of grid over the stored bars of every conid"""
+        panel, missing = ScannerService.load_panel(conids, bars, bar)
+        if not len(panel):
+            raise BacktestError(f"No conid has {bars} stored {bar} bars")
+        result = BacktestService.sweep_panel(panel, entry, exit, grid, fields, adjustment_percent, capital,
+                                             workers, include_symbols, sort_by, limit)
+        result['missing'] = missing
+        result['skipped'] = panel.skipped
+        return result
+
+    @staticmethod
+    def sweep_panel(panel, entry, exit, grid, fields=None, adjustment_percent=PRICE_ADJUSTMENT_PERCENT,
+                    capital=BACKTEST_CAPITAL, workers=BACKTEST_WORKERS, include_symbols=False,
+                    sort_by='total_return', limit=None):
+        """Parameter sweep over a loaded panel, fanned out over a process pool
+
+        Each run is one combination over all symbols at once. Combinations
+        are split into contiguous chunks; a worker runs a chunk on one
+        indicator graph, so e.g. RSI thresholds sharing a SuperTrend
+        setting compute it once. workers is capped at BACKTEST_WORKERS.
+        Results are sorted by a summary metric, best first (smallest first
+        for drawdowns).
+        """
+        combos = parameter_grid(grid)
+        runs = len(combos) * len(panel)
+        if not combos:
+            raise BacktestError("The parameter grid is empty")
+        if runs > BACKTEST_MAX_RUNS:
+            raise BacktestError(f"Sweep of {runs} runs exceeds BACKTEST_MAX_RUNS ({BACKTEST_MAX_RUNS})")
+        if sort_by not in SUMMARY_METRICS:
+            raise BacktestError(f"Unknown sort metric {sort_by!r}; available: {', '.join(SUMMARY_METRICS)}")
+        # Fail on a bad template or expression here rather than in every worker
+        check_templates(entry, exit, fields, combos[0])
+
+        spec = {
+            'columns': panel.columns, 'entry': entry, 'exit': exit, 'aliases': fields or {},
+            'adjustment_percent': adjustment_percent, 'capital': capital
+        }
+        # A request may ask for fewer processes than configured, never more
+        workers = max(1, min(workers, BACKTEST_WORKERS, len(combos)))
+        size = math.ceil(len(combos) / (workers * _CHUNKS_PER_WORKER)) if workers > 1 else len(combos)
+        chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+
+        started = time.perf_counter()
+        if workers == 1:
+            metrics = _run_sweep_chunk(combos, spec)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_sweep_worker, initargs=(spec,)) as pool:
+                metrics = [run for chunk in pool.map(_run_sweep_chunk, chunks) for run in chunk]
+        elapsed = time.perf_counter() - started
+
+        results = []
+        for params, run in zip(combos, metrics):
+            entry_result = {'params': params, 'summary': summarize(run)}
+            if include_symbols:
+                entry_result['symbols'] = per_symbol(panel.symbols, run)
+            results.append(entry_result)
+        descending = sort_by not in ('max_drawdown', 'mean_drawdown')
+        results.sort(key=lambda item: item['summary'][sort_by], reverse=descending)
+        if limit is not None:
+            results = results[:limit]
+
+        logger.info(f"Swept {len(combos)} combinations x {len(panel)} symbols on {workers} workers "
+                    f"in {elapsed:.2f}s")
+        return {
+            'runs': runs,
+            'combinations': len(combos),
+            'symbols': panel.symbols,
+            'workers': workers,
+            'seconds': round(elapsed, 3),
+            'results': results
+        }
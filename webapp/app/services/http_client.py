@@ -0,0 +1,218 @@
+import logging
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import (
+    BASE_API_URL, NOCODB_BASE_URL, NOCODB_API_TOKEN, N8N_WEBHOOK_URL, GATEWAY_POOL_SIZE, GATEWAY_TIMEOUT, GATEWAY_ENDPOINT_TIMEOUTS,
+    GATEWAY_MAX_RETRIES, GATEWAY_BACKOFF_BASE, GATEWAY_BACKOFF_MAX
+)
+from ..utils.metrics import registry as metrics_registry, tracing
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'DELETE'}
+
+# Path segments that identify a resource rather than an endpoint
+_ID_SEGMENT = re.compile(r'/(?:\d+|[A-Z]{1,2}\d{4,}|[0-9a-f]{8}-[0-9a-f-]{27})(?=/|$)')
+
+
+def endpoint_name(path: str) -> str:
+    """Normalize a request path for metrics, e.g. /iserver/account/U123/orders -> /iserver/account/{id}/orders"""
+    return _ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])
+
+
+class EndpointStats:
+    __slots__ = ('count', 'errors', 'retries', 'total_seconds', 'max_seconds', 'last_status')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_status = None
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_ms': round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'last_status': self.last_status
+        }
+
+
+class ClientPolicy:
+    """Timeouts, retry rules and per-endpoint stats shared by the sync and async clients
+
+    Transient 429/5xx replies are retried with jittered exponential backoff:
+    always for idempotent methods, and only on 429 for POST/PUT so an order
+    is never submitted twice.
+    """
+
+    def __init__(self, base_url: str, verify: bool = True, timeout: Tuple[float, float] = GATEWAY_TIMEOUT,
+                 endpoint_timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_retries: int = GATEWAY_MAX_RETRIES, backoff_base: float = GATEWAY_BACKOFF_BASE,
+                 backoff_max: float = GATEWAY_BACKOFF_MAX, name: str = 'http'):
+        self.base_url = base_url.rstrip('/')
+        self.name = name
+        self.verify = verify
+        self.timeout = timeout
+        self.endpoint_timeouts = endpoint_timeouts or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def timeout_for(self, path: str) -> Tuple[float, float]:
+        """Longest configured path prefix wins, otherwise the client default"""
+        best = None
+        for prefix in self.endpoint_timeouts:
+            if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.endpoint_timeouts[best] if best is not None else self.timeout
+
+    def _should_retry(self, method: str, status: Optional[int]) -> bool:
+        if status is None:
+            # Connection failures: only safe when the request cannot have been applied twice
+            return method in IDEMPOTENT_METHODS
+        if status == 429:
+            return True
+        return status in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+
+    def _backoff(self, attempt: int, response) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # Full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _record_attempt(self, stats: EndpointStats, elapsed: float, status: Optional[int]):
+        with self._stats_lock:
+            stats.count += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.last_status = status
+            if status is None or status >= 400:
+                stats.errors += 1
+
+    def _retry_delay(self, stats: EndpointStats, method: str, path: str, attempt: int, status: Optional[int],
+                     response, error) -> Optional[float]:
+        """Seconds to wait before retrying this attempt, or None when it is final"""
+        if attempt >= self.max_retries or not self._should_retry(method, status):
+            return None
+        delay = self._backoff(attempt, response)
+        logger.warning(
+            f"{method} {path} returned {status if status is not None else type(error).__name__}, "
+            f"retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})"
+        )
+        with self._stats_lock:
+            stats.retries += 1
+        return delay
+
+    def _record_stage(self, key: str, started: float, status: Optional[int], size: Optional[int]):
+        """Report the whole call, retries included, as one upstream stage"""
+        metrics_registry.observe(f"{self.name} {key}", time.perf_counter() - started,
+                                 error=status is None or status >= 400, payload_bytes=size)
+
+    def _endpoint_stats(self, key: str) -> EndpointStats:
+        with self._stats_lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            return stats
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-endpoint request counts, errors, retries and latency"""
+        with self._stats_lock:
+            return {key: stats.as_dict() for key, stats in self._stats.items()}
+
+
+class HttpClient(ClientPolicy):
+    """Keep-alive HTTP client with a pooled Session, per-endpoint timeouts and retries
+
+    Responses are returned as-is; callers keep using raise_for_status() or
+    status_code checks exactly as with bare requests calls.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = GATEWAY_POOL_SIZE, verify: bool = True,
+                 timeout: Tuple[float, float] = GATEWAY_TIMEOUT,
+                 endpoint_timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_retries: int = GATEWAY_MAX_RETRIES, backoff_base: float = GATEWAY_BACKOFF_BASE,
+                 backoff_max: float = GATEWAY_BACKOFF_MAX, headers: Optional[Dict[str, str]] = None,
+                 name: str = 'http'):
+        super().__init__(base_url, verify, timeout, endpoint_timeouts, max_retries, backoff_base, backoff_max, name)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout_for(path))
+        kwargs.setdefault('verify', self.verify)
+        key = f"{method} {endpoint_name(path)}"
+        stats = self._endpoint_stats(key)
+
+        attempt = 0
+        first_started = time.perf_counter()
+        while True:
+            started = time.perf_counter()
+            response = None
+            error = None
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+                status = response.status_code
+            except (requests.ConnectionError, requests.Timeout) as e:
+                status = None
+                error = e
+            self._record_attempt(stats, time.perf_counter() - started, status)
+
+            delay = self._retry_delay(stats, method, path, attempt, status, response, error)
+            if delay is not None:
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            if metrics_registry.enabled or tracing():
+                size = len(response.content) if response is not None and not kwargs.get('stream') else None
+                self._record_stage(key, first_started, status, size)
+            if response is None:
+                raise error
+            return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+# Shared client for the IBKR Client Portal Gateway (self-signed certificate)
+gateway_client = HttpClient(BASE_API_URL, verify=False, endpoint_timeouts=GATEWAY_ENDPOINT_TIMEOUTS, name='gateway')
+
+# Shared client for the NocoDB REST API
+nocodb_client = HttpClient(NOCODB_BASE_URL, headers={"xc-token": NOCODB_API_TOKEN or ""}, name='nocodb')
+
+# Shared client for the n8n order webhook (requests go to the webhook URL itself)
+n8n_client = HttpClient(N8N_WEBHOOK_URL, name='n8n')
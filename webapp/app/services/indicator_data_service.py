@@ -0,0 +1,123 @@
+import gzip
+import hashlib
+import logging
+from typing import Dict, Optional, Sequence
+from ..config import (
+    INDICATOR_DATA_BARS, INDICATOR_DATA_MAX_BARS, INDICATOR_DATA_PRECISION, INDICATOR_DATA_MAX_PRECISION,
+    INDICATOR_DATA_GZIP_MIN_BYTES, INDICATOR_DATA_CACHE_MAX_BYTES
+)
+from ..models.bar_series import BarSeries, FIELDS
+from ..utils.chart_cache import ChartCache, series_digest
+from ..utils.columnar import MIME_TYPES, available_formats, encode
+from ..utils.indicator_graph import IndicatorGraph
+from ..utils.metrics import instrument, stage
+from ..utils.scanner import INDICATOR_FIELDS
+from .market_data_service import MarketDataService
+
+logger = logging.getLogger(__name__)
+
+# Every column name a request can select; bb_middle repeats sma_20 so it is only sent on request
+DATA_FIELDS = ('date',) + FIELDS + tuple(INDICATOR_FIELDS)
+DEFAULT_FIELDS = tuple(name for name in DATA_FIELDS if name != 'bb_middle')
+
+# Encoded bodies by ETag (plus '.gz' for the compressed copy)
+indicator_data_cache = ChartCache(INDICATOR_DATA_CACHE_MAX_BYTES)
+
+
+class IndicatorDataError(ValueError):
+    pass
+
+
+class IndicatorDataService:
+    @staticmethod
+    def columns(series: BarSeries, fields: Sequence[str] = DEFAULT_FIELDS, last: Optional[int] = None):
+        """The selected OHLCV and indicator columns, trimmed to the last bars
+
+        Indicators are computed over the whole series before trimming, so
+        their values match the chart's; one IndicatorGraph pass computes
+        only the nodes the fields need.
+        """
+        graph = IndicatorGraph.from_series(series)
+        start = -last if last else 0
+        columns = {}
+        for name in fields:
+            if name == 'date':
+                values = series.dates
+            elif name in FIELDS:
+                values = getattr(series, name)
+            else:
+                values = graph[INDICATOR_FIELDS[name]]
+            columns[name] = values[start:]
+        return columns
+
+    @staticmethod
+    def etag(conid, period: str, bar: str, series: BarSeries, fields: Sequence[str], last: int,
+             data_format: str, precision: int) -> str:
+        """Version of one response: the instrument and data range plus everything that shapes the body
+
+        Also the body cache key, so it must tell apart instruments whose
+        latest bars happen to look the same. precision only rounds JSON, so
+        the binary formats ignore it and share one version across precisions.
+        """
+        if data_format != 'json':
+            precision = None
+        digest = hashlib.sha1(series_digest(series).encode())
+        digest.update(f"{conid}|{period}|{bar}|{','.join(fields)}|{last}|{data_format}|{precision}".encode())
+        return digest.hexdigest()[:20]
+
+    @staticmethod
+    @instrument('indicator_data.get', payload=lambda result: len(result['body'] or b''))
+    def get_indicator_data(conid, period='1y', bar='1d', last=INDICATOR_DATA_BARS, fields=None,
+                           data_format='json', precision=INDICATOR_DATA_PRECISION, etags=(), compress=False):
+        """Encoded indicator columns for a conid's latest bars, as an alternative to a rendered chart
+
+        Returns {'etag', 'body', 'encoding', 'mime_type', 'rows'}. body is
+        None when etag is in etags (the caller's If-None-Match), in which
+        case nothing is computed or encoded. With compress, bodies of at
+        least INDICATOR_DATA_GZIP_MIN_BYTES are gzipped. Encoded bodies are
+        cached by ETag, so repeat requests for unchanged bars skip the
+        indicator pass as well.
+        """
+        fields = tuple(fields or DEFAULT_FIELDS)
+        unknown = [name for name in fields if name not in DATA_FIELDS]
+        if unknown:
+            raise IndicatorDataError(f"Unknown fields: {', '.join(unknown)}; available: {', '.join(DATA_FIELDS)}")
+        if data_format not in available_formats():
+            raise IndicatorDataError(f"Unsupported data format: {data_format}; available: {', '.join(available_formats())}")
+        if not 1 <= last <= INDICATOR_DATA_MAX_BARS:
+            raise IndicatorDataError(f"last must be between 1 and {INDICATOR_DATA_MAX_BARS}")
+        if not 0 <= precision <= INDICATOR_DATA_MAX_PRECISION:
+            raise IndicatorDataError(f"precision must be between 0 and {INDICATOR_DATA_MAX_PRECISION}")
+
+        series = MarketDataService.get_bar_series(conid, period, bar)
+        if not len(series):
+            raise IndicatorDataError(f"No historical data for {conid}")
+
+        etag = IndicatorDataService.etag(conid, period, bar, series, fields, last, data_format, precision)
+        result = {'etag': etag, 'body': None, 'encoding': None, 'mime_type': MIME_TYPES[data_format],
+                  'rows': min(last, len(series))}
+        if etag in etags:
+            return result
+
+        body = indicator_data_cache.get(etag)
+        if body is None:
+            with stage('indicator_data.compute'):
+                columns = IndicatorDataService.columns(series, fields, last)
+            meta = {'conid': str(conid), 'symbol': series.symbol, 'bar': bar}
+            with stage('indicator_data.encode'):
+                body = encode(columns, meta, data_format, precision)
+            indicator_data_cache.put(etag, body)
+
+        if compress and len(body) >= INDICATOR_DATA_GZIP_MIN_BYTES:
+            compressed = indicator_data_cache.get(f"{etag}.gz")
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6)
+                indicator_data_cache.put(f"{etag}.gz", compressed)
+            result['body'], result['encoding'] = compressed, 'gzip'
+        else:
+            result['body'] = body
+        return result
+
+    @staticmethod
+    def cache_stats() -> Dict[str, int]:
+        return indicator_data_cache.stats()
@@ -1,26 +1,321 @@
 import requests
 import logging
-from ..config import BASE_API_URL, MARKET_DATA_FIELDS, PRICE_ADJUSTMENT_PERCENT
+import re
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from ..config import (
+    MARKET_DATA_FIELDS, PRICE_ADJUSTMENT_PERCENT, QUOTE_CACHE_TTL,
+    SNAPSHOT_PRIME_RETRIES, SNAPSHOT_PRIME_DELAY,
+    SNAPSHOT_CHUNK_SIZE, SNAPSHOT_MAX_CONCURRENCY, SNAPSHOT_RATE_LIMIT,
+    BAR_STORE_DIR, BAR_STORE_REFRESH_SECONDS, STREAM_ENABLED, STREAM_MAX_QUOTE_AGE
+)
+from ..models.bar_series import BarSeries
+from ..utils.bar_store import BarStore
+from ..utils.metrics import instrument
+from ..utils.quote_cache import QuoteCache
+from ..utils.quote_table import QuoteTable
+from ..utils.timeframes import calculate_timeframe_indicators
+from ..utils.rate_limiter import RateLimiter
+from .http_client import gateway_client
 
 logger = logging.getLogger(__name__)
 
+quote_cache = QuoteCache(QUOTE_CACHE_TTL)
+snapshot_rate_limiter = RateLimiter(SNAPSHOT_RATE_LIMIT)
+bar_store = BarStore(BAR_STORE_DIR)
+
+# Snapshot field codes and the typed names they are reported under
+SNAPSHOT_FIELDS = {
+    '31': ('last_price', 'price'),
+    '84': ('bid', 'price'),
+    '86': ('ask', 'price'),
+    '7059': ('last_size', 'size'),
+    '88': ('bid_size', 'size'),
+    '85': ('ask_size', 'size'),
+    '70': ('high', 'price'),
+    '71': ('low', 'price'),
+    '7295': ('open', 'price'),
+    '7296': ('close', 'price'),
+    '87': ('volume', 'size'),
+    '55': ('symbol', 'text'),
+}
+
+_SIZE_SUFFIXES = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+
+# Latest tick per conid, written by MarketDataStream when it is running
+live_quotes = QuoteTable(name for name, kind in SNAPSHOT_FIELDS.values() if kind != 'text')
+
+# Snapshot prices may carry a status prefix, e.g. "C" for the previous close
+_PRICE_PREFIX = re.compile(r'^[A-Za-z]+')
+
+def parse_price(value):
+    """Parse a snapshot price field, returning None when it is empty"""
+    if value in (None, ''):
+        return None
+    try:
+        return float(_PRICE_PREFIX.sub('', str(value)).replace(',', ''))
+    except ValueError:
+        return None
+
+# Seconds per unit of the gateway's history period strings, e.g. "5d", "1y", "30min"
+_PERIOD_UNITS = {'min': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400, 'm': 30 * 86400, 'y': 365 * 86400}
+_PERIOD_PATTERN = re.compile(r'^(\d+)\s*(min|h|d|w|m|y)$', re.IGNORECASE)
+
+def period_seconds(period):
+    """Approximate length in seconds of a history period or bar size string"""
+    match = _PERIOD_PATTERN.match(str(period).strip())
+    if not match:
+        raise ValueError(f"Unrecognised period: {period}")
+    return int(match.group(1)) * _PERIOD_UNITS[match.group(2).lower()]
+
+def covering_period(seconds):
+    """Smallest gateway period string that spans the given number of seconds"""
+    if seconds <= 86400:
+        return f"{max(1, -(-int(seconds) // 3600))}h"
+    return f"{-(-int(seconds) // 86400)}d"
+
+def start_stream():
+    """Start the market data stream that fills live_quotes; safe to call more than once"""
+    # Imported here: the stream module imports live_quotes from this one
+    from .market_data_stream import market_data_stream
+    market_data_stream.start()
+
+def parse_size(value):
+    """Parse a snapshot size field such as "1,200" or "1.2K", returning None when empty"""
+    if value in (None, ''):
+        return None
+    text = str(value).replace(',', '').strip()
+    multiplier = _SIZE_SUFFIXES.get(text[-1:].upper(), 1)
+    if multiplier != 1:
+        text = text[:-1]
+    try:
+        return float(text) * multiplier
+    except ValueError:
+        return None
+
+def decode_snapshot(data, fields=MARKET_DATA_FIELDS):
+    """Map a raw snapshot's numeric field codes to typed, named values"""
+    decoded = {}
+    for code in fields.split(','):
+        name, kind = SNAPSHOT_FIELDS.get(code, (code, 'text'))
+        value = data.get(code)
+        if kind == 'price':
+            decoded[name] = parse_price(value)
+        elif kind == 'size':
+            decoded[name] = parse_size(value)
+        else:
+            decoded[name] = value
+    return decoded
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
 class MarketDataService:
     @staticmethod
+    def _fetch_snapshot(conids, fields=MARKET_DATA_FIELDS):
+        """One rate-limited snapshot request for at most SNAPSHOT_CHUNK_SIZE conids"""
+        snapshot_rate_limiter.acquire()
+        params = {
+            'conids': ','.join(map(str, conids)),
+            'fields': fields
+        }
+        response = gateway_client.get("/iserver/marketdata/snapshot", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    @instrument('market_data.get_live_market_data')
     def get_live_market_data(conids):
         """Get live market data for specified conids"""
         try:
-            url = f"{BASE_API_URL}/iserver/marketdata/snapshot"
+            conids = [str(c) for c in conids]
+            if len(conids) <= SNAPSHOT_CHUNK_SIZE:
+                return MarketDataService._fetch_snapshot(conids)
+
+            # Large lists are split into gateway-sized requests run concurrently
+            with ThreadPoolExecutor(max_workers=SNAPSHOT_MAX_CONCURRENCY) as pool:
+                results = pool.map(MarketDataService._fetch_snapshot, _chunks(conids, SNAPSHOT_CHUNK_SIZE))
+                return [item for chunk in results for item in chunk]
+        except requests.RequestException as e:
+            logger.error(f"Error fetching live market data: {str(e)}")
+            raise
+
+    @staticmethod
+    @instrument('market_data.get_bulk_snapshots')
+    def get_bulk_snapshots(conids, fields=MARKET_DATA_FIELDS, max_age=None, chunk_size=SNAPSHOT_CHUNK_SIZE):
+        """Fetch snapshots for a large universe in concurrent, rate-limited chunks
+
+        Returns {'quotes': {conid: typed fields + age}, 'chunks': per-chunk
+        latency and errors, 'failed': conids whose chunk failed}. A failing
+        chunk does not discard the others.
+        """
+        conids = list(dict.fromkeys(str(c) for c in conids))
+        started = time.perf_counter()
+
+        def run_chunk(chunk):
+            chunk_started = time.perf_counter()
+            try:
+                quotes = MarketDataService.get_quotes(chunk, fields, max_age=max_age)
+                error = None
+            except Exception as e:
+                quotes = {}
+                error = str(e)
+            return chunk, quotes, error, time.perf_counter() - chunk_started
+
+        result = {'quotes': {}, 'chunks': [], 'failed': []}
+        with ThreadPoolExecutor(max_workers=SNAPSHOT_MAX_CONCURRENCY) as pool:
+            for chunk, quotes, error, elapsed in pool.map(run_chunk, _chunks(conids, chunk_size)):
+                result['chunks'].append({
+                    'conids': len(chunk),
+                    'latency_ms': round(elapsed * 1000, 3),
+                    'cached': sum(1 for quote in quotes.values() if quote['cached']),
+                    'error': error
+                })
+                if error:
+                    result['failed'].extend(chunk)
+                    continue
+                for conid, quote in quotes.items():
+                    typed = decode_snapshot(quote['data'], fields)
+                    typed['age'] = quote['age']
+                    typed['complete'] = quote['complete']
+                    result['quotes'][conid] = typed
+
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        if result['failed']:
+            logger.error(f"Bulk snapshot failed for {len(result['failed'])} of {len(conids)} conids")
+        return result
+
+    @staticmethod
+    @instrument('market_data.get_quotes')
+    def get_quotes(conids, fields=MARKET_DATA_FIELDS, max_age=None, force=False):
+        """Get snapshots per conid through the short-TTL quote cache
+
+        Returns {conid: {'data', 'fetched_at', 'age', 'cached', 'complete'}}.
+        """
+        def fetch(missing):
+            return MarketDataService._fetch_snapshot(missing, fields)
+
+        try:
+            return quote_cache.get_many(conids, fields, fetch, max_age=max_age, force=force)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching live market data: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_quote(conid, fields=MARKET_DATA_FIELDS, max_age=None, force=False):
+        """Get a single conid's snapshot through the quote cache"""
+        return MarketDataService.get_quotes([conid], fields, max_age, force)[str(conid)]
+
+    @staticmethod
+    @instrument('market_data.prime_snapshots')
+    def prime_snapshots(conids, fields=MARKET_DATA_FIELDS, retries=SNAPSHOT_PRIME_RETRIES, delay=SNAPSHOT_PRIME_DELAY):
+        """Warm gateway subscriptions so later snapshots return populated fields
+
+        The first snapshot for a conid starts the subscription and usually
+        comes back empty; conids are re-requested until every field is
+        present or the retries run out. Returns the conids still incomplete.
+        """
+        pending = [str(c) for c in conids]
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                time.sleep(delay)
+            quotes = MarketDataService.get_quotes(pending, fields, force=True)
+            pending = [conid for conid, quote in quotes.items() if not quote['complete']]
+        if pending:
+            logger.warning(f"Snapshots still incomplete after priming: {pending}")
+        return pending
+
+    @staticmethod
+    @instrument('market_data.get_historical_data')
+    def get_historical_data(conid, period='1y', bar='1d', outside_rth=False):
+        """Get historical OHLCV bars for a conid"""
+        try:
             params = {
-                'conids': ','.join(map(str, conids)),
-                'fields': MARKET_DATA_FIELDS
+                'conid': conid,
+                'period': period,
+                'bar': bar,
+                'outsideRth': str(outside_rth).lower()
             }
-            response = requests.get(url, params=params, verify=False)
+            response = gateway_client.get("/iserver/marketdata/history", params=params)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-            logger.error(f"Error fetching live market data: {str(e)}")
+            logger.error(f"Error fetching historical data for {conid}: {str(e)}")
             raise
 
+    @staticmethod
+    @instrument('market_data.get_bar_series', payload=lambda series: sum(column.nbytes for column in series.columns().values()))
+    def get_bar_series(conid, period='1y', bar='1d', outside_rth=False, max_age=BAR_STORE_REFRESH_SECONDS):
+        """Get historical bars through the local bar store
+
+        Only bars newer than the last stored one are requested from the
+        gateway, and not at all when the store was refreshed within
+        max_age seconds. A period reaching back before the range the store
+        covers is fetched in full and merged in front of the stored bars.
+        Returns the requested period as a BarSeries read from the store.
+        """
+        key_bar = f"{bar}-ext" if outside_rth else bar
+        meta = bar_store.meta(conid, key_bar)
+        now = time.time()
+        span = period_seconds(period)
+        since = None
+
+        if meta['last'] is None or meta['since'] is None or now - span < meta['since'] / 1e9:
+            fetch_period, since = period, int((now - span) * 1e9)
+        elif meta['updated_at'] is None or now - meta['updated_at'] > max_age:
+            # Re-request the stored last bar too: it may have been captured mid-period
+            gap = now - meta['last'] / 1e9 + period_seconds(bar)
+            fetch_period = period if gap >= span else covering_period(gap)
+        else:
+            fetch_period = None
+
+        if fetch_period:
+            history = MarketDataService.get_historical_data(conid, fetch_period, bar, outside_rth)
+            written = bar_store.append(conid, key_bar, BarSeries.from_ibkr_history(history), since=since)
+            logger.info(f"Fetched {fetch_period} of {bar} bars for {conid}; {written} new or updated")
+
+        series = bar_store.read(conid, key_bar, start=np.datetime64(int((now - span) * 1e9), 'ns'))
+        if series.symbol is None:
+            series.symbol = str(conid)
+        return series
+
+    @staticmethod
+    @instrument('market_data.get_timeframe_indicators')
+    def get_timeframe_indicators(conid, timeframes=('1d', '1w'), period='2y', bar='1d', outside_rth=False):
+        """Bars and indicators for several timeframes from one base history read
+
+        The base bars come from get_bar_series; coarser timeframes are
+        resampled from them, and each timeframe's indicators are cached.
+        """
+        series = MarketDataService.get_bar_series(conid, period, bar, outside_rth)
+        return calculate_timeframe_indicators(series, timeframes, base_timeframe=bar)
+
+    @staticmethod
+    def get_streamed_price(conid, side, max_age=STREAM_MAX_QUOTE_AGE):
+        """get_optimal_order_price from the last streamed tick, or None when there is no fresh one
+
+        With STREAM_ENABLED the first lookup starts the stream, and a conid
+        without a row is subscribed on its miss, so its later orders are
+        priced from ticks instead of snapshots.
+        """
+        if not STREAM_ENABLED:
+            return None
+        start_stream()
+        tick = live_quotes.last(conid, 'last_price', max_age=max_age)
+        if tick is None:
+            return None
+        current_price, age = tick
+        return {
+            'current_price': current_price,
+            'adjusted_price': MarketDataService.calculate_adjusted_price(current_price, side),
+            'adjustment_percent': PRICE_ADJUSTMENT_PERCENT * 100,
+            'quote_age': age,
+            'quote_cached': True
+        }
+
     @staticmethod
     def calculate_adjusted_price(current_price, side, adjustment_percent=PRICE_ADJUSTMENT_PERCENT):
         """Calculate adjusted price based on order side"""
@@ -33,15 +328,23 @@ class MarketDataService:
         return current_price
 
     @staticmethod
+    @instrument('market_data.get_optimal_order_price')
     def get_optimal_order_price(conid, side):
-        """Get optimal order price based on current market data"""
+        """Get optimal order price from the streamed tick, else from a snapshot"""
         try:
-            market_data = MarketDataService.get_live_market_data([conid])
-            if not market_data:
+            streamed = MarketDataService.get_streamed_price(conid, side)
+            if streamed is not None:
+                return streamed
+            quote = MarketDataService.get_quote(conid)
+            # Field 31 is last price; an empty field means the subscription is not warm yet
+            current_price = parse_price(quote['data'].get('31'))
+            if current_price is None:
+                MarketDataService.prime_snapshots([conid])
+                quote = MarketDataService.get_quote(conid)
+                current_price = parse_price(quote['data'].get('31'))
+            if current_price is None:
+                logger.error(f"No last price available for {conid}")
                 return None
-
-            # Extract current price from market data
-            current_price = float(market_data[0].get('31', 0))  # Field 31 is last price
             
             # Calculate adjusted price based on order side
             adjusted_price = MarketDataService.calculate_adjusted_price(current_price, side)
@@ -49,7 +352,9 @@ class MarketDataService:
             return {
                 'current_price': current_price,
                 'adjusted_price': adjusted_price,
-                'adjustment_percent': PRICE_ADJUSTMENT_PERCENT * 100
+                'adjustment_percent': PRICE_ADJUSTMENT_PERCENT * 100,
+                'quote_age': quote['age'],
+                'quote_cached': quote['cached']
             }
         except Exception as e:
             logger.error(f"Error calculating optimal order price: {str(e)}")
@@ -0,0 +1,301 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+import aiohttp
+from ..config import (
+    MARKET_DATA_FIELDS, STREAM_URL, STREAM_BAR_SECONDS, STREAM_HEARTBEAT,
+    STREAM_RECONNECT_BASE, STREAM_RECONNECT_MAX
+)
+from ..models.quote import Quote
+from ..utils.async_runner import runner
+from ..utils.indicator_state import IndicatorState
+from .market_data_service import SNAPSHOT_FIELDS, live_quotes, parse_price, parse_size
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBE_TOPIC = 'smd'
+UNSUBSCRIBE_TOPIC = 'umd'
+
+
+def decode_tick(message: Dict, fields: str = MARKET_DATA_FIELDS) -> Dict[str, float]:
+    """Named numeric values of the subscribed fields present in one tick message
+
+    Ticks carry only the fields that changed since the previous one.
+    """
+    values = {}
+    for code in fields.split(','):
+        if code not in message:
+            continue
+        name, kind = SNAPSHOT_FIELDS.get(code, (code, 'text'))
+        if kind == 'price':
+            values[name] = parse_price(message[code])
+        elif kind == 'size':
+            values[name] = parse_size(message[code])
+    return values
+
+
+class _TickBars:
+    """Aggregates one conid's trade ticks into fixed-length OHLCV bars"""
+
+    __slots__ = ('seconds', 'bucket', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.bucket = None
+
+    def add(self, price: float, size: float, timestamp: float) -> Optional[Quote]:
+        """Add a trade; returns the completed previous bar when this tick starts a new one"""
+        bucket = int(timestamp // self.seconds)
+        completed = None
+        if self.bucket is not None and bucket > self.bucket:
+            completed = self.forming()
+        if self.bucket is None or bucket > self.bucket:
+            self.bucket = bucket
+            self.open = self.high = self.low = price
+            self.volume = 0.0
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.volume += size or 0.0
+        return completed
+
+    def forming(self) -> Optional[Quote]:
+        if self.bucket is None:
+            return None
+        date = datetime.fromtimestamp(self.bucket * self.seconds, timezone.utc)
+        return Quote(date, self.open, self.high, self.low, self.close, self.volume)
+
+
+class MarketDataStream:
+    """Streams ticks from the Client Portal websocket into the live quote table
+
+    Every subscribed conid gets a 'smd' subscription for the configured
+    fields. Ticks update live_quotes, which MarketDataService reads to
+    price orders without a snapshot call; conids looked up there but not
+    yet streamed are subscribed automatically. Conids registered with
+    track_indicators() also have their trades aggregated into
+    bar_seconds bars, each completed bar fed to an IndicatorState and
+    passed to listeners.
+
+    The connection lives on the shared async loop. When it drops, the
+    stream reconnects with jittered exponential backoff and resubscribes
+    everything.
+    """
+
+    def __init__(self, url: str = STREAM_URL, fields: str = MARKET_DATA_FIELDS, table=live_quotes,
+                 bar_seconds: int = STREAM_BAR_SECONDS, heartbeat: float = STREAM_HEARTBEAT,
+                 reconnect_base: float = STREAM_RECONNECT_BASE, reconnect_max: float = STREAM_RECONNECT_MAX,
+                 verify: bool = False, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.fields = fields
+        self.table = table
+        self.bar_seconds = bar_seconds
+        self.heartbeat = heartbeat
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+        self.verify = verify
+        self.headers = dict(headers or {})
+
+        self._active = set()
+        self._bars = {}
+        self._states = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._ws = None
+        self._task = None
+        self._stopping = False
+        self.connected = threading.Event()
+        self.connects = 0
+        self.messages = 0
+        self.ticks = 0
+        self.last_message_at = None
+
+    # Subscriptions
+
+    def _subscribe_message(self, conid: str) -> str:
+        return f"{SUBSCRIBE_TOPIC}+{conid}+{json.dumps({'fields': self.fields.split(',')})}"
+
+    def subscribe(self, conids: Iterable):
+        """Stream these conids from now on, across reconnects"""
+        with self._lock:
+            new = [str(c) for c in conids if str(c) not in self._active]
+            self._active.update(new)
+        if new:
+            self._send([self._subscribe_message(conid) for conid in new])
+
+    def unsubscribe(self, conids: Iterable):
+        with self._lock:
+            gone = [str(c) for c in conids if str(c) in self._active]
+            self._active.difference_update(gone)
+            for conid in gone:
+                self._bars.pop(conid, None)
+                self._states.pop(conid, None)
+        # Without its row, a later lookup misses and subscribes the conid again
+        for conid in gone:
+            self.table.remove(conid)
+        if gone:
+            self._send([f"{UNSUBSCRIBE_TOPIC}+{conid}+{{}}" for conid in gone])
+
+    @property
+    def subscriptions(self) -> List[str]:
+        with self._lock:
+            return sorted(self._active)
+
+    def _send(self, messages: List[str]):
+        """Queue messages on the open connection from any thread
+
+        Without a connection there is nothing to do: connecting subscribes
+        every active conid.
+        """
+        if self._ws is None:
+            return
+        loop = runner.loop
+
+        def send():
+            if self._ws is not None:
+                loop.create_task(self._send_now(self._ws, messages))
+        loop.call_soon_threadsafe(send)
+
+    @staticmethod
+    async def _send_now(ws, messages: List[str]):
+        try:
+            for message in messages:
+                await ws.send_str(message)
+        except (aiohttp.ClientError, ConnectionError, RuntimeError) as e:
+            # The reconnect resubscribes whatever did not get through
+            logger.warning(f"Market data stream send failed: {str(e)}")
+
+    # Indicators
+
+    def track_indicators(self, conid, history: Iterable[Quote] = ()):
+        """Feed this conid's streamed bars to an IndicatorState warmed up with history"""
+        conid = str(conid)
+        state = IndicatorState.from_quotes(history)
+        with self._lock:
+            self._states[conid] = state
+            self._bars[conid] = _TickBars(self.bar_seconds)
+        self.subscribe([conid])
+        return state
+
+    def add_listener(self, listener: Callable[[str, Quote, Dict], None]):
+        """Call listener(conid, bar, indicators) for every completed streamed bar"""
+        self._listeners.append(listener)
+
+    def indicators(self, conid, live: bool = True) -> Optional[Dict]:
+        """Latest indicator values; live includes the bar that is still forming"""
+        conid = str(conid)
+        with self._lock:
+            state = self._states.get(conid)
+            if state is None:
+                return None
+            forming = self._bars[conid].forming() if live else None
+            return state.preview(forming) if forming is not None else state.latest
+
+    # Connection
+
+    def start(self):
+        """Connect on the shared async loop; safe to call more than once"""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self.table.on_miss = self.subscribe
+        self._task = asyncio.run_coroutine_threadsafe(self._run(), runner.loop)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        if self.table.on_miss == self.subscribe:
+            self.table.on_miss = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                self._task.result(timeout)
+            except BaseException:
+                pass
+            self._task = None
+        self.connected.clear()
+
+    async def _run(self):
+        failures = 0
+        async with aiohttp.ClientSession(headers=self.headers) as session:
+            while not self._stopping:
+                try:
+                    async with session.ws_connect(self.url, ssl=None if self.verify else False,
+                                                  heartbeat=None, autoping=True) as ws:
+                        self._ws = ws
+                        self.connects += 1
+                        self.connected.set()
+                        logger.info(f"Market data stream connected to {self.url}")
+                        with self._lock:
+                            active = sorted(self._active)
+                        await self._send_now(ws, [self._subscribe_message(conid) for conid in active])
+                        keepalive = asyncio.ensure_future(self._keepalive(ws))
+                        try:
+                            async for message in ws:
+                                if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                                    self._on_message(message.data)
+                                    failures = 0
+                                elif message.type == aiohttp.WSMsgType.ERROR:
+                                    break
+                        finally:
+                            keepalive.cancel()
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    logger.warning(f"Market data stream error: {str(e)}")
+                finally:
+                    self._ws = None
+                    self.connected.clear()
+
+                if self._stopping:
+                    break
+                delay = random.uniform(0, min(self.reconnect_max, self.reconnect_base * (2 ** failures)))
+                failures += 1
+                logger.warning(f"Market data stream disconnected, reconnecting in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _keepalive(self, ws):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            await self._send_now(ws, ['tic'])
+
+    def _on_message(self, data):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        self.messages += 1
+        self.last_message_at = time.time()
+        if not isinstance(message, dict) or not str(message.get('topic', '')).startswith(f"{SUBSCRIBE_TOPIC}+"):
+            return
+
+        conid = str(message.get('conid') or message['topic'].split('+', 1)[1])
+        if conid not in self._active:
+            # Sent before the gateway processed our unsubscribe
+            return
+        timestamp = message['_updated'] / 1000.0 if message.get('_updated') else self.last_message_at
+        values = decode_tick(message, self.fields)
+        self.table.update(conid, values, timestamp)
+        self.ticks += 1
+
+        price = values.get('last_price')
+        if price is None or conid not in self._bars:
+            return
+        with self._lock:
+            bars = self._bars.get(conid)
+            if bars is None:
+                return
+            completed = bars.add(price, values.get('last_size'), timestamp)
+            if completed is None:
+                return
+            latest = self._states[conid].update(completed)
+        for listener in self._listeners:
+            try:
+                listener(conid, completed, latest)
+            except Exception as e:
+                logger.error(f"Market data stream listener failed: {str(e)}")
+
+
+market_data_stream = MarketDataStream()
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import requests
+from .http_client import nocodb_client
+
+logger = logging.getLogger(__name__)
+
+
+class NocoDBWriteBehindQueue:
+    """Batched, journaled write-behind queue for NocoDB table inserts
+
+    enqueue() appends the record to a local append-only journal and returns
+    immediately. A background thread sends pending records to NocoDB's bulk
+    insert endpoint when batch_size records are waiting or every
+    flush_interval seconds, and appends an ack line to the journal once a
+    batch is stored. Unacknowledged records are replayed on start, so
+    nothing is lost while NocoDB is down or across restarts.
+    """
+
+    def __init__(self, table_id: Optional[str], journal_path: str, batch_size: int = 50,
+                 flush_interval: float = 2.0, max_backoff: float = 60.0, client=nocodb_client):
+        self.table_id = table_id
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.client = client
+
+        self._pending = []
+        self._next_seq = 1
+        self._condition = threading.Condition()
+        self._journal_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._failures = 0
+        self.written = 0
+
+    def start(self):
+        """Replay the journal and start the flush thread; safe to call more than once"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._replay()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="nocodb-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, record: Dict):
+        """Journal a record for insertion and return without waiting for NocoDB"""
+        self.start()
+        with self._condition:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._append_journal({'seq': seq, 'record': record})
+            self._pending.append((seq, record))
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wake the flush thread and wait until the queue drains; True if it did"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._pending and time.monotonic() < deadline:
+                # Re-notify each round: a wake-up sent while the thread is mid-send is lost
+                self._condition.notify()
+                self._condition.wait(timeout=min(0.05, max(deadline - time.monotonic(), 0)))
+            return not self._pending
+
+    def stop(self, timeout: float = 10.0):
+        """Flush what can be flushed and stop the background thread"""
+        self.flush(timeout)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {'pending': len(self._pending), 'written': self.written, 'consecutive_failures': self._failures}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._failures or len(self._pending) < self.batch_size:
+                    self._condition.wait(timeout=self._wait_time())
+                if self._stopping and not self._pending:
+                    return
+                batch = self._pending[:self.batch_size]
+            if not batch:
+                continue
+
+            if self._send(batch):
+                with self._condition:
+                    del self._pending[:len(batch)]
+                    self.written += len(batch)
+                    self._failures = 0
+                    self._append_journal({'ack': batch[-1][0]})
+                    if not self._pending:
+                        self._compact_journal()
+                    self._condition.notify_all()
+            else:
+                with self._condition:
+                    self._failures += 1
+                    if self._stopping:
+                        return
+
+    def _wait_time(self) -> float:
+        if not self._failures:
+            return self.flush_interval
+        return min(self.max_backoff, self.flush_interval * (2 ** self._failures))
+
+    def _send(self, batch: List) -> bool:
+        if not self.table_id:
+            logger.error("NocoDB orders table configuration is incomplete; keeping records in the journal")
+            return False
+        try:
+            response = self.client.post(f"/api/v2/tables/{self.table_id}/records", json=[record for _, record in batch])
+            response.raise_for_status()
+            logger.info(f"Saved {len(batch)} records to NocoDB table {self.table_id}")
+            return True
+        except requests.RequestException as e:
+            error_msg = f"Error saving records to NocoDB: {str(e)}"
+            if e.response is not None:
+                error_msg += f" - Response: {e.response.text}"
+            logger.error(error_msg)
+            return False
+
+    def _append_journal(self, entry: Dict):
+        with self._journal_lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _compact_journal(self):
+        """Drop the journal once every record in it has been acknowledged"""
+        with self._journal_lock:
+            try:
+                os.truncate(self.journal_path, 0)
+            except OSError as e:
+                logger.error(f"Error compacting NocoDB journal: {str(e)}")
+
+    def _replay(self):
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.journal_path):
+            return
+
+        records = {}
+        acked = 0
+        with open(self.journal_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    continue
+                if 'ack' in entry:
+                    acked = max(acked, entry['ack'])
+                else:
+                    records[entry['seq']] = entry['record']
+
+        self._pending = sorted((seq, record) for seq, record in records.items() if seq > acked)
+        self._next_seq = max(records, default=acked) + 1
+        if self._pending:
+            logger.info(f"Replaying {len(self._pending)} unsaved NocoDB records from {self.journal_path}")
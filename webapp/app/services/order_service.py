@@ -1,17 +1,33 @@
 import requests
 import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 from ..config import (
-    BASE_API_URL, ACCOUNT_ID, NOCODB_BASE_URL, NOCODB_API_TOKEN,
-    NOCODB_ORDERS_TABLE_ID, DEFAULT_TIF
+    ACCOUNT_ID, NOCODB_BASE_URL, NOCODB_API_TOKEN,
+    NOCODB_ORDERS_TABLE_ID, DEFAULT_TIF,
+    NOCODB_WRITE_BATCH_SIZE, NOCODB_WRITE_FLUSH_INTERVAL, NOCODB_JOURNAL_PATH,
+    ORDER_BATCH_MAX_PER_REQUEST, ORDER_BATCH_CONCURRENCY, ORDER_MAX_REPLY_ROUNDS
 )
-from .market_data_service import MarketDataService
+from .http_client import gateway_client, nocodb_client
+from ..utils.metrics import instrument
+from .market_data_service import MarketDataService, parse_price
+from .nocodb_writer import NocoDBWriteBehindQueue
+from .order_tracker import order_tracker
 
 logger = logging.getLogger(__name__)
 
+order_writer = NocoDBWriteBehindQueue(
+    NOCODB_ORDERS_TABLE_ID if NOCODB_BASE_URL and NOCODB_API_TOKEN else None,
+    NOCODB_JOURNAL_PATH,
+    batch_size=NOCODB_WRITE_BATCH_SIZE,
+    flush_interval=NOCODB_WRITE_FLUSH_INTERVAL
+)
+
 class OrderService:
     @staticmethod
+    @instrument('orders.place_order')
     def place_order(conid, order_type, price, quantity, side, tif=DEFAULT_TIF):
         """Place an order with price management"""
         try:
@@ -34,11 +50,7 @@ class OrderService:
             }
 
             logger.info(f"Placing order: {data}")
-            response = requests.post(
-                f"{BASE_API_URL}/iserver/account/{ACCOUNT_ID}/orders",
-                json=data,
-                verify=False
-            )
+            response = gateway_client.post(f"/iserver/account/{ACCOUNT_ID}/orders", json=data)
 
             if response.status_code != 200:
                 logger.error(f"Failed to place order: {response.text}")
@@ -46,10 +58,13 @@ class OrderService:
 
             result = response.json()
             
-            # Save order to NocoDB if response contains order details
+            # Queue the order for NocoDB if response contains order details
             if len(result) > 0:
                 order_response = result[0]
-                OrderService.save_order_to_nocodb(
+                if 'order_id' in order_response:
+                    order_tracker.track(order_response['order_id'], conid, side, quantity, price,
+                                        order_response.get('order_status', 'Submitted'))
+                OrderService.queue_order_for_nocodb(
                     order_data=order_response,
                     conid=conid,
                     order_type=order_type,
@@ -66,22 +81,176 @@ class OrderService:
             return {"error": str(e)}, 500
 
     @staticmethod
-    def save_order_to_nocodb(order_data, conid, order_type, price, quantity, side, tif):
-        """Save order details to NocoDB"""
-        if not all([NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_ORDERS_TABLE_ID]):
-            logger.error("NocoDB orders table configuration is incomplete.")
-            raise ValueError("NocoDB orders table configuration is incomplete")
+    @instrument('orders.place_orders')
+    def place_orders(orders, auto_confirm=True):
+        """Place many orders, including bracket legs, with one price lookup
 
-        url = f"{NOCODB_BASE_URL}/api/v2/tables/{NOCODB_ORDERS_TABLE_ID}/records"
-        headers = {
-            "xc-token": NOCODB_API_TOKEN,
-            "Content-Type": "application/json"
-        }
+        Each order is a dict with conid, order_type, quantity, side and
+        optionally price, tif, aux_price, c_oid and parent_c_oid (the c_oid
+        of its bracket parent). Orders without a parent get the market-
+        adjusted price from a single snapshot of every conid; bracket
+        children keep their own stop/target prices. A bracket is always
+        sent in one request, and brackets and standalone orders are packed
+        into as few gateway requests as ORDER_BATCH_MAX_PER_REQUEST allows.
+        Confirmation questions are answered when auto_confirm is set.
+
+        Returns one result dict per input order, in input order.
+        """
+        orders = [dict(order) for order in orders]
+        for order in orders:
+            order.setdefault('tif', DEFAULT_TIF)
+            order.setdefault('c_oid', f"batch-{uuid.uuid4().hex[:16]}")
+
+        # One snapshot call prices every entry order
+        entry_conids = [order['conid'] for order in orders if not order.get('parent_c_oid')]
+        try:
+            quotes = MarketDataService.get_quotes(entry_conids) if entry_conids else {}
+            # Field 31 is last price; cold subscriptions are primed together and re-read once
+            cold = [conid for conid, quote in quotes.items() if parse_price(quote['data'].get('31')) is None]
+            if cold:
+                MarketDataService.prime_snapshots(cold)
+                quotes.update(MarketDataService.get_quotes(cold))
+        except Exception as e:
+            logger.error(f"Error fetching prices for order batch: {str(e)}")
+            quotes = {}
+        for order in orders:
+            if order.get('parent_c_oid'):
+                continue
+            quote = quotes.get(str(order['conid']))
+            current_price = parse_price(quote['data'].get('31')) if quote else None
+            if current_price is not None:
+                order['price'] = MarketDataService.calculate_adjusted_price(current_price, order['side'])
 
+        requests_payloads = OrderService._pack_order_groups(orders)
+        logger.info(f"Placing {len(orders)} orders in {len(requests_payloads)} gateway requests")
+
+        def submit(group):
+            return group, OrderService._submit_orders(group, auto_confirm)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=ORDER_BATCH_CONCURRENCY) as pool:
+            for group, replies in pool.map(submit, requests_payloads):
+                for order, reply in OrderService._match_replies(group, replies):
+                    results[order['c_oid']] = OrderService._record_result(order, reply)
+
+        return [results[order['c_oid']] for order in orders]
+
+    @staticmethod
+    def _pack_order_groups(orders):
+        """Group bracket legs with their parent, then pack groups into requests"""
+        groups = {}
+        for order in orders:
+            root = order.get('parent_c_oid') or order['c_oid']
+            groups.setdefault(root, []).append(order)
+
+        packed = []
+        current = []
+        for group in groups.values():
+            if current and len(current) + len(group) > ORDER_BATCH_MAX_PER_REQUEST:
+                packed.append(current)
+                current = []
+            current = current + group
+        if current:
+            packed.append(current)
+        return packed
+
+    @staticmethod
+    def _gateway_order(order):
         payload = {
-            "order_id": str(order_data["order_id"]),
+            "conid": order['conid'],
+            "orderType": order['order_type'],
+            "quantity": order['quantity'],
+            "side": order['side'],
+            "tif": order['tif'],
+            "cOID": order['c_oid']
+        }
+        if order.get('price') is not None:
+            payload["price"] = order['price']
+        if order.get('aux_price') is not None:
+            payload["auxPrice"] = order['aux_price']
+        if order.get('parent_c_oid'):
+            payload["parentId"] = order['parent_c_oid']
+        return payload
+
+    @staticmethod
+    @instrument('orders.submit_batch')
+    def _submit_orders(group, auto_confirm):
+        """POST one orders request and answer confirmation questions; returns the final replies"""
+        try:
+            response = gateway_client.post(
+                f"/iserver/account/{ACCOUNT_ID}/orders",
+                json={"orders": [OrderService._gateway_order(order) for order in group]}
+            )
+            if response.status_code != 200:
+                logger.error(f"Failed to place orders: {response.text}")
+                return {"error": response.text, "status_code": response.status_code}
+            replies = response.json()
+
+            for _ in range(ORDER_MAX_REPLY_ROUNDS):
+                questions = [reply for reply in replies if 'id' in reply and 'message' in reply]
+                if not questions or not auto_confirm:
+                    break
+                answered = [reply for reply in replies if reply not in questions]
+                for question in questions:
+                    logger.info(f"Confirming order reply {question['id']}: {question.get('message')}")
+                    reply_response = gateway_client.post(f"/iserver/reply/{question['id']}", json={"confirmed": True})
+                    if reply_response.status_code != 200:
+                        logger.error(f"Failed to confirm order reply: {reply_response.text}")
+                        answered.append({"error": reply_response.text, "id": question['id']})
+                        continue
+                    answered.extend(reply_response.json())
+                replies = answered
+            return replies
+        except requests.RequestException as e:
+            logger.error(f"Error placing orders: {str(e)}")
+            return {"error": str(e), "status_code": 500}
+
+    @staticmethod
+    def _match_replies(group, replies):
+        """Pair each order with its gateway reply by cOID, falling back to position"""
+        if isinstance(replies, dict):
+            return [(order, replies) for order in group]
+        by_c_oid = {reply.get('local_order_id'): reply for reply in replies if reply.get('local_order_id')}
+        unmatched = iter([reply for reply in replies if not reply.get('local_order_id')])
+        return [(order, by_c_oid.get(order['c_oid']) or next(unmatched, {"error": "No reply for order"}))
+                for order in group]
+
+    @staticmethod
+    def _record_result(order, reply):
+        result = {
+            "c_oid": order['c_oid'],
+            "conid": order['conid'],
+            "side": order['side'],
+            "quantity": order['quantity'],
+            "price": order.get('price'),
+            "order_id": reply.get('order_id'),
+            "status": reply.get('order_status'),
+            "error": reply.get('error'),
+            "reply": reply
+        }
+        if reply.get('order_id'):
+            order_tracker.track(reply['order_id'], order['conid'], order['side'], order['quantity'],
+                                order.get('price'), reply.get('order_status', 'Submitted'))
+            OrderService.queue_order_for_nocodb(
+                order_data=reply,
+                conid=order['conid'],
+                order_type=order['order_type'],
+                price=order.get('price') or 0,
+                quantity=order['quantity'],
+                side=order['side'],
+                tif=order['tif']
+            )
+        elif not result['error']:
+            result['error'] = reply.get('message') or "Order not acknowledged"
+        return result
+
+    @staticmethod
+    def build_order_record(order_data, conid, order_type, price, quantity, side, tif):
+        """Build the NocoDB orders table row for a gateway order reply"""
+        return {
+            "order_id": str(order_data.get("order_id", order_data.get("id", ""))),
             "conid": str(conid),
-            "status": order_data["order_status"],
+            "status": order_data.get("order_status", "PendingConfirmation"),
             "order_type": order_type,
             "price": float(price),
             "quantity": int(quantity),
@@ -91,8 +260,32 @@ class OrderService:
             "order_details": json.dumps(order_data)
         }
 
+    @staticmethod
+    @instrument('orders.queue_for_nocodb')
+    def queue_order_for_nocodb(order_data, conid, order_type, price, quantity, side, tif):
+        """Hand order details to the write-behind queue without waiting for NocoDB"""
+        try:
+            order_writer.enqueue(OrderService.build_order_record(
+                order_data, conid, order_type, price, quantity, side, tif
+            ))
+        except Exception as e:
+            # Persistence problems must never fail an order the broker accepted
+            logger.error(f"Error queuing order for NocoDB: {str(e)}")
+
+    @staticmethod
+    @instrument('orders.save_to_nocodb')
+    def save_order_to_nocodb(order_data, conid, order_type, price, quantity, side, tif):
+        """Save order details to NocoDB synchronously"""
+        if not all([NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_ORDERS_TABLE_ID]):
+            logger.error("NocoDB orders table configuration is incomplete.")
+            raise ValueError("NocoDB orders table configuration is incomplete")
+
+        path = f"/api/v2/tables/{NOCODB_ORDERS_TABLE_ID}/records"
+
+        payload = OrderService.build_order_record(order_data, conid, order_type, price, quantity, side, tif)
+
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = nocodb_client.post(path, json=payload)
             response.raise_for_status()
             logger.info(f"Saved order {order_data.get('orderId')} to NocoDB")
         except requests.RequestException as e:
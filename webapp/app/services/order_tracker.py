@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import requests
+from ..config import ORDER_CHECK_INTERVAL, ORDER_FAST_POLL_INTERVAL, ORDER_FAST_POLL_WINDOW, ORDER_MISSING_POLLS
+from .http_client import gateway_client, n8n_client
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {'Filled', 'Cancelled', 'ApiCancelled', 'Inactive'}
+
+
+class TrackedOrder:
+    __slots__ = ('order_id', 'conid', 'side', 'quantity', 'price', 'submitted_at',
+                 'status', 'filled_quantity', 'avg_price', 'missing_polls')
+
+    def __init__(self, order_id, conid=None, side=None, quantity=None, price=None, status='Submitted'):
+        self.order_id = str(order_id)
+        self.conid = conid
+        self.side = side
+        self.quantity = quantity
+        self.price = price
+        self.submitted_at = time.time()
+        self.status = status
+        self.filled_quantity = 0.0
+        self.avg_price = None
+        self.missing_polls = 0
+
+    def as_dict(self) -> Dict:
+        return {
+            'order_id': self.order_id,
+            'conid': self.conid,
+            'side': self.side,
+            'quantity': self.quantity,
+            'price': self.price,
+            'status': self.status,
+            'filled_quantity': self.filled_quantity,
+            'avg_price': self.avg_price,
+            'submitted_at': self.submitted_at
+        }
+
+
+class OrderTracker:
+    """Tracks open orders with one batched, adaptively paced live-orders poll
+
+    Orders registered with track() are polled together through the gateway's
+    /iserver/account/orders endpoint: every ORDER_FAST_POLL_INTERVAL seconds
+    while any order is younger than ORDER_FAST_POLL_WINDOW, then at
+    ORDER_CHECK_INTERVAL for resting orders. Fills and status changes are
+    posted to the n8n webhook and passed to local listeners as soon as a
+    poll sees them.
+    """
+
+    def __init__(self, fast_interval: float = ORDER_FAST_POLL_INTERVAL, fast_window: float = ORDER_FAST_POLL_WINDOW,
+                 slow_interval: float = ORDER_CHECK_INTERVAL, client=gateway_client, webhook_client=n8n_client):
+        self.fast_interval = fast_interval
+        self.fast_window = fast_window
+        self.slow_interval = slow_interval
+        self.client = client
+        self.webhook_client = webhook_client
+
+        self._orders = {}
+        self._listeners = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._webhooks = None
+        self.polls = 0
+
+    def track(self, order_id, conid=None, side=None, quantity=None, price=None, status='Submitted'):
+        """Start tracking a submitted order and switch to fast polling"""
+        with self._condition:
+            self._orders[str(order_id)] = TrackedOrder(order_id, conid, side, quantity, price, status)
+            self._ensure_started()
+            self._condition.notify()
+
+    def untrack(self, order_id):
+        with self._condition:
+            self._orders.pop(str(order_id), None)
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Register a callable that receives every emitted event"""
+        self._listeners.append(callback)
+
+    def open_orders(self) -> List[Dict]:
+        with self._condition:
+            return [order.as_dict() for order in self._orders.values()]
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._condition:
+            webhooks, self._webhooks = self._webhooks, None
+        if webhooks is not None:
+            webhooks.shutdown(wait=True)
+
+    def next_interval(self) -> float:
+        """Fast while any order is fresh, slow once every order is resting"""
+        with self._condition:
+            if not self._orders:
+                return self.slow_interval
+            newest = max(order.submitted_at for order in self._orders.values())
+        return self.fast_interval if time.time() - newest < self.fast_window else self.slow_interval
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="order-tracker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._orders and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling live orders: {str(e)}")
+            with self._condition:
+                if self._stopping:
+                    return
+                self._condition.wait(timeout=self.next_interval())
+
+    def poll(self) -> List[Dict]:
+        """Fetch all live orders in one call and emit events for changes"""
+        try:
+            response = self.client.get("/iserver/account/orders")
+            response.raise_for_status()
+            live = response.json()
+        except requests.RequestException as e:
+            logger.error(f"Error fetching live orders: {str(e)}")
+            return []
+
+        self.polls += 1
+        rows = live.get('orders', []) if isinstance(live, dict) else live or []
+        by_id = {str(row.get('orderId')): row for row in rows}
+        events = []
+
+        with self._condition:
+            for order_id, order in list(self._orders.items()):
+                row = by_id.get(order_id)
+                if row is None:
+                    order.missing_polls += 1
+                    if order.missing_polls >= ORDER_MISSING_POLLS:
+                        logger.warning(f"Order {order_id} no longer reported by the gateway; untracking")
+                        del self._orders[order_id]
+                    continue
+                order.missing_polls = 0
+                events.extend(self._apply(order, row))
+                if order.status in TERMINAL_STATUSES:
+                    del self._orders[order_id]
+
+        for event in events:
+            self._emit(event)
+        return events
+
+    def _apply(self, order: TrackedOrder, row: Dict) -> List[Dict]:
+        events = []
+        status = row.get('status') or order.status
+        filled = float(row.get('filledQuantity') or 0)
+        avg_price = row.get('avgPrice')
+
+        if order.conid is None:
+            order.conid = row.get('conid')
+        if filled > order.filled_quantity:
+            order.avg_price = float(avg_price) if avg_price not in (None, '') else order.avg_price
+            events.append(self._event('fill', order, status, fill_quantity=filled - order.filled_quantity,
+                                      filled_quantity=filled))
+            order.filled_quantity = filled
+        if status != order.status:
+            events.append(self._event('status_change', order, status, previous_status=order.status))
+            order.status = status
+        return events
+
+    @staticmethod
+    def _event(kind: str, order: TrackedOrder, status: str, **extra) -> Dict:
+        event = order.as_dict()
+        event.update({'event': kind, 'status': status, 'detected_at': time.time()})
+        event.update(extra)
+        return event
+
+    def _emit(self, event: Dict):
+        logger.info(f"Order {event['order_id']} {event['event']}: {event['status']}")
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Order event listener failed: {str(e)}")
+        if self.webhook_client is not None:
+            self._webhook_pool().submit(self._post_webhook, event)
+
+    def _webhook_pool(self) -> ThreadPoolExecutor:
+        """The webhook executor, created on first use and again after stop() shut it down"""
+        with self._condition:
+            if self._webhooks is None:
+                self._webhooks = ThreadPoolExecutor(max_workers=2, thread_name_prefix="order-webhook")
+            return self._webhooks
+
+    def _post_webhook(self, event: Dict):
+        try:
+            response = self.webhook_client.post("", json=event)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Error sending order event to n8n: {str(e)}")
+
+
+order_tracker = OrderTracker()
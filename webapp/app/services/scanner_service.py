@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from ..config import SCANNER_BARS, SCANNER_MAX_RESULTS, SCANNER_CACHE_ROWS
+from ..utils.metrics import instrument
+from ..utils.scanner import Panel, scan
+from .market_data_service import bar_store
+
+logger = logging.getLogger(__name__)
+
+
+class _PanelCache:
+    """Keeps loaded rows and the last panel so repeat scans skip unchanged symbols
+
+    A row is reused while the store's bar count and last timestamp for its
+    conid are unchanged; the panel (and its computed indicators) is reused
+    when no row changed at all. At most max_rows rows are kept, least
+    recently used first out.
+    """
+
+    def __init__(self, max_rows=SCANNER_CACHE_ROWS):
+        self.max_rows = max_rows
+        self._rows = OrderedDict()
+        self._panel_key = None
+        self._panel = None
+        self._lock = threading.Lock()
+
+    def load(self, conids, bars, bar):
+        series_by_conid = {}
+        versions = []
+        missing = []
+        for conid in dict.fromkeys(str(c) for c in conids):
+            meta = bar_store.meta(conid, bar)
+            if not meta['count']:
+                missing.append(conid)
+                continue
+            version = (meta['count'], meta['last'])
+            key = (conid, bar, bars)
+            with self._lock:
+                row = self._rows.get(key)
+                if row is not None:
+                    self._rows.move_to_end(key)
+            if row is None or row[0] != version:
+                row = (version, bar_store.read_tail(conid, bar, bars))
+                with self._lock:
+                    self._rows[key] = row
+                    self._rows.move_to_end(key)
+                    while len(self._rows) > self.max_rows:
+                        self._rows.popitem(last=False)
+            series_by_conid[conid] = row[1]
+            versions.append((conid, version))
+
+        panel_key = (bar, bars, tuple(versions))
+        with self._lock:
+            if panel_key == self._panel_key:
+                return self._panel, missing
+        panel = Panel.from_series(series_by_conid, bars)
+        with self._lock:
+            self._panel_key, self._panel = panel_key, panel
+        return panel, missing
+
+
+panel_cache = _PanelCache()
+
+
+class ScannerService:
+    @staticmethod
+    def load_panel(conids, bars=SCANNER_BARS, bar='1d'):
+        """Load the latest bars of every conid from the local bar store into one panel
+
+        Only stored history is read; conids with nothing stored are listed
+        as missing rather than fetched, so a scan never waits on the gateway.
+        """
+        return panel_cache.load(conids, bars, bar)
+
+    @staticmethod
+    @instrument('scanner.run_scan')
+    def run_scan(conids, filter_expression=None, rank_expression=None, ascending=False,
+                 limit=50, columns=('close', 'rsi'), bars=SCANNER_BARS, bar='1d'):
+        """Scan a universe on local indicators and return ranked hits"""
+        started = time.perf_counter()
+        panel, missing = ScannerService.load_panel(conids, bars, bar)
+        loaded = time.perf_counter()
+        hits = scan(panel, filter_expression, rank_expression, ascending,
+                    min(limit or SCANNER_MAX_RESULTS, SCANNER_MAX_RESULTS), columns)
+        finished = time.perf_counter()
+        logger.info(f"Scanned {len(panel)} symbols in {(finished - started) * 1000:.1f}ms: {len(hits)} hits")
+        return {
+            'hits': hits,
+            'scanned': len(panel),
+            'skipped': panel.skipped,
+            'missing': missing,
+            'load_ms': round((loaded - started) * 1000, 3),
+            'scan_ms': round((finished - loaded) * 1000, 3)
+        }
@@ -1,104 +1,498 @@
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.io as pio
 import io
-from decimal import Decimal
-from ..models.quote import Quote
-from ..utils.indicators import calculate_indicators
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+import numpy as np
+from ..config import (
+    CHART_CACHE_MAX_BYTES, CHART_CACHE_DIR, CHART_CACHE_DISK_MAX_BYTES,
+    CHART_RENDER_POOL_SIZE, CHART_RENDER_QUEUE_SIZE, CHART_RENDER_TIMEOUT,
+    CHART_BATCH_WORKERS, CHART_MAX_POINTS, CHART_DECIMATION, CHART_RENDERER, CHART_IMAGE_QUALITY
+)
+from ..models.bar_series import BarSeries
+from ..models.chart_job import ChartJob, ChartResult
+from ..utils.chart_cache import ChartCache, chart_cache_key
+from ..utils.chart_renderers import ChartRenderer, encode_image, get_renderer, normalize_format, register_renderer
+from ..utils.decimation import (
+    bucket_size, bucket_starts, bucket_sums, extreme_indices, gap_breaks, lttb_indices, minmax_indices,
+    ohlc_buckets
+)
+from ..utils.indicator_graph import IndicatorGraph, legacy_nodes
+from ..utils.lazy_import import LazyModule
+from ..utils.metrics import instrument, stage
+from ..utils.render_pool import RenderPool
 import logging
 
 logger = logging.getLogger(__name__)
 
-class TechnicalChartService:
-    @staticmethod
-    def generate_chart(df, symbol, width=1920, height=2048):
-        """Generate technical analysis chart with improved visualization"""
-        try:
-            # Convert DataFrame to Quote objects
-            quotes = [
-                Quote(
-                    date=row['Date'].to_pydatetime(),
-                    open=Decimal(str(row['Open'])),
-                    high=Decimal(str(row['High'])),
-                    low=Decimal(str(row['Low'])),
-                    close=Decimal(str(row['Close'])),
-                    volume=Decimal(str(row['Volume']))
-                )
-                for _, row in df.iterrows()
-            ]
-
-            # Calculate indicators
-            indicators_dict = calculate_indicators(quotes)
-            processed_indicators = TechnicalChartService.process_indicators(indicators_dict, df)
-
-            # Create figure with subplots
-            fig = make_subplots(
+# Plotly takes several hundred milliseconds and tens of MB to import; load it
+# on first chart use so workers that only place orders never pay for it
+go = LazyModule('plotly.graph_objects')
+pio = LazyModule('plotly.io')
+plotly_subplots = LazyModule('plotly.subplots')
+_pil_image = LazyModule('PIL.Image')
+
+_prewarm_thread = None
+
+chart_cache = ChartCache(CHART_CACHE_MAX_BYTES, CHART_CACHE_DIR, CHART_CACHE_DISK_MAX_BYTES)
+render_pool = (
+    RenderPool(CHART_RENDER_POOL_SIZE, CHART_RENDER_QUEUE_SIZE, CHART_RENDER_TIMEOUT)
+    if CHART_RENDER_POOL_SIZE > 0 else None
+)
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+def _get_batch_executor():
+    """Process pool used by generate_charts, created on first use"""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(
+                max_workers=CHART_BATCH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _batch_executor
+
+def _render_chart_job(df, symbol, width, height, image_format, renderer='plotly', quality=None):
+    """Batch worker: compute indicators, prepare the chart and render it in this process"""
+    started = time.perf_counter()
+    chart = TechnicalChartService.prepare_chart(df, symbol)
+    built = time.perf_counter()
+    if renderer == PlotlyRenderer.name:
+        image = PlotlyRenderer.to_image(TechnicalChartService.figure_from_chart(chart), width, height,
+                                        image_format, quality, use_pool=False)
+    else:
+        image = get_renderer(renderer).render(chart, width, height, image_format, quality)
+    rendered = time.perf_counter()
+    return image, {
+        'figure_seconds': built - started,
+        'render_seconds': rendered - built
+    }
+
+# Traces of the figure skeleton in the order they are added; build_figure
+# fills them by position from chart_arrays
+SKELETON_TRACES = (
+    'candles', 'sma_20', 'sma_50', 'sma_200', 'bb_upper', 'bb_lower', 'st_up', 'st_down',
+    'volume', 'histogram', 'macd_line', 'signal_line', 'rsi', 'obv', 'atr'
+)
+
+_skeleton = None
+_skeleton_lock = threading.Lock()
+
+def _figure_skeleton():
+    """Styled 7-panel figure with empty traces, built once per process
+
+    make_subplots and per-trace validation dominate figure construction;
+    copying this skeleton and assigning data arrays avoids both.
+    """
+    global _skeleton
+    with _skeleton_lock:
+        if _skeleton is None:
+            fig = plotly_subplots.make_subplots(
                 rows=7, cols=1,
                 shared_xaxes=True,
                 vertical_spacing=0.03,
-                subplot_titles=(
-                    f"{symbol} Price",
-                    "SuperTrend",
-                    "Volume (M)",
-                    "MACD",
-                    "RSI",
-                    f"OBV ({processed_indicators['obv_unit']})",
-                    "ATR"
-                ),
+                subplot_titles=("Price", "SuperTrend", "Volume (M)", "MACD", "RSI", "OBV", "ATR"),
                 row_heights=[0.35, 0.15, 0.1, 0.15, 0.15, 0.1, 0.1],
                 specs=[[{"secondary_y": True}]] * 7
             )
+            TechnicalChartService.add_price_chart(fig)
+            TechnicalChartService.add_supertrend(fig)
+            TechnicalChartService.add_volume(fig)
+            TechnicalChartService.add_macd(fig)
+            TechnicalChartService.add_rsi(fig)
+            TechnicalChartService.add_obv(fig)
+            TechnicalChartService.add_atr(fig)
+            TechnicalChartService.update_layout(fig)
+            _skeleton = fig
+        return _skeleton
+
+# Indicator graph node behind each value of the chart bundle
+CHART_INDICATORS = {
+    'sma_20': 'sma(close,20)',
+    'sma_50': 'sma(close,50)',
+    'sma_200': 'sma(close,200)',
+    'bb_upper': 'bb_upper(close,20,2)',
+    'bb_lower': 'bb_lower(close,20,2)',
+    'st_values': 'st_value(10,3)',
+    'st_direction': 'st_direction(10,3)',
+    'volume': 'volume',
+    'histogram': 'macd_hist(12,26,9)',
+    'macd_line': 'macd(12,26)',
+    'signal_line': 'macd_signal(12,26,9)',
+    'rsi': 'rsi(close,14)',
+    'obv': 'obv',
+    'atr': 'atr(14)',
+}
+
+_OBV_UNITS = ((1e9, 'B'), (1e6, 'M'), (1e3, 'K'))
 
-            # Add price chart
-            TechnicalChartService.add_price_chart(fig, df, processed_indicators, symbol)
-            
-            # Add SuperTrend
-            TechnicalChartService.add_supertrend(fig, df, processed_indicators)
-            
-            # Add Volume
-            TechnicalChartService.add_volume(fig, df, processed_indicators)
-            
-            # Add MACD
-            TechnicalChartService.add_macd(fig, df, processed_indicators)
-            
-            # Add RSI
-            TechnicalChartService.add_rsi(fig, df, processed_indicators)
-            
-            # Add OBV
-            TechnicalChartService.add_obv(fig, df, processed_indicators)
-            
-            # Add ATR
-            TechnicalChartService.add_atr(fig, df, processed_indicators)
-
-            # Update layout
-            TechnicalChartService.update_layout(fig, symbol, df)
+def _obv_scale(obv):
+    """Divisor and unit label that keep the OBV axis readable"""
+    peak = float(np.nanmax(np.abs(obv))) if len(obv) else 0.0
+    for scale, unit in _OBV_UNITS:
+        if peak >= scale:
+            return scale, unit
+    return 1.0, 'shares'
+
+def _two_colour_marker(off, on):
+    """Bar marker drawing 0 values in off and 1 values in on"""
+    return dict(color=[], colorscale=[[0, off], [1, on]], cmin=0, cmax=1)
+
+def _line_indices(values, size, method):
+    """Points of a line trace to keep for a bucket size of size bars
+
+    LTTB needs a gap-free line, so series broken after their warm-up (the
+    SuperTrend legs) always use min/max selection.
+    """
+    if method == 'lttb' and size > 1:
+        finite = np.flatnonzero(~np.isnan(values))
+        if len(finite) == 0:
+            return finite
+        first = finite[0]
+        if len(finite) < len(values) - first:
+            return minmax_indices(values, size)
+        threshold = 2 * len(bucket_starts(len(values) - first, size))
+        return first + lttb_indices(values[first:], threshold)
+    return minmax_indices(values, size)
+
+class PlotlyRenderer(ChartRenderer):
+    """Default backend: fill the Plotly figure skeleton and render it with Kaleido
+
+    Kaleido has no quality setting, so a requested JPEG/WebP quality is
+    applied by rendering PNG and re-encoding it with Pillow.
+    """
+
+    name = 'plotly'
+
+    def render(self, chart, width, height, image_format, quality=None):
+        return self.to_image(TechnicalChartService.figure_from_chart(chart), width, height, image_format, quality)
+
+    @staticmethod
+    def to_image(fig, width, height, image_format, quality=None, use_pool=True):
+        pool = render_pool if use_pool else None
+        if quality and image_format != 'png':
+            png = pool.render(fig, 'png', width, height) if pool is not None else \
+                pio.to_image(fig, format='png', width=width, height=height)
+            return encode_image(_pil_image.open(io.BytesIO(png)), image_format, quality)
+        if pool is not None:
+            return pool.render(fig, image_format, width, height)
+        return pio.to_image(fig, format=image_format, width=width, height=height)
+
+register_renderer(PlotlyRenderer())
+
+def _render_options(image_format, renderer, quality):
+    """Resolve renderer defaults; returns (format, renderer, quality, cache key variant)"""
+    renderer = renderer or CHART_RENDERER
+    quality = CHART_IMAGE_QUALITY if quality is None else quality
+    get_renderer(renderer)
+    variant = '' if renderer == PlotlyRenderer.name and not quality else f"-{renderer}-q{quality or 0}"
+    return normalize_format(image_format), renderer, quality or None, variant
+
+class TechnicalChartService:
+    @staticmethod
+    @instrument('charts.generate_chart', payload=lambda image: image.getbuffer().nbytes)
+    def generate_chart(df, symbol, width=1920, height=2048, image_format='jpeg', use_cache=True,
+                       renderer=None, quality=None):
+        """Generate technical analysis chart with improved visualization
+
+        renderer picks the backend ('plotly' or 'agg', default CHART_RENDERER);
+        quality (1-95) applies to JPEG/WebP output.
+        """
+        try:
+            image_format, renderer, quality, variant = _render_options(image_format, renderer, quality)
+
+            # Convert DataFrame to columnar bars
+            series = BarSeries.from_dataframe(df, symbol)
+
+            # Serve unchanged data straight from the render cache
+            cache_key = chart_cache_key(series, width, height, image_format, variant)
+            if use_cache:
+                cached = chart_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Chart cache hit for {symbol} ({cache_key})")
+                    return io.BytesIO(cached)
+
+            chart = TechnicalChartService.prepare_chart(df, symbol, series)
 
             # Convert to image
-            buf = io.BytesIO()
-            pio.write_image(fig, buf, format='jpeg', width=width, height=height)
-            buf.seek(0)
-            return buf
+            with stage('charts.render'):
+                image = get_renderer(renderer).render(chart, width, height, image_format, quality)
+            if use_cache:
+                chart_cache.put(cache_key, image)
+            return io.BytesIO(image)
 
         except Exception as e:
             logger.error(f"Error generating technical chart: {str(e)}")
             raise
 
     @staticmethod
-    def add_price_chart(fig, df, indicators, symbol):
-        """Add price chart with moving averages and Bollinger Bands"""
-        dates = df['Date']
-        latest = df.iloc[-1]
+    def submit_chart(df, symbol, width=1920, height=2048, image_format='jpeg', use_cache=True, timeout=None,
+                     renderer=None, quality=None):
+        """Build the chart figure and queue it on the render pool
+
+        Returns a Future resolving to a BytesIO so the caller does not block on
+        Kaleido. The pool renders Plotly at Kaleido's default quality; without
+        a configured pool, or for another renderer or quality, the chart is
+        rendered inline and an already-completed Future is returned.
+        """
+        image_format, renderer, quality, variant = _render_options(image_format, renderer, quality)
+        if render_pool is None or variant:
+            future = Future()
+            try:
+                future.set_result(TechnicalChartService.generate_chart(
+                    df, symbol, width, height, image_format, use_cache, renderer, quality
+                ))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        series = BarSeries.from_dataframe(df, symbol)
+        cache_key = chart_cache_key(series, width, height, image_format, variant)
+        if use_cache:
+            cached = chart_cache.get(cache_key)
+            if cached is not None:
+                future = Future()
+                future.set_result(io.BytesIO(cached))
+                return future
+
+        fig = TechnicalChartService.build_figure(df, symbol, series)
+        image_future = render_pool.submit(fig, image_format, width, height, timeout=timeout)
+
+        result = Future()
+
+        def _done(f):
+            try:
+                image = f.result()
+            except Exception as e:
+                logger.error(f"Error rendering technical chart for {symbol}: {str(e)}")
+                result.set_exception(e)
+                return
+            if use_cache:
+                chart_cache.put(cache_key, image)
+            result.set_result(io.BytesIO(image))
+
+        image_future.add_done_callback(_done)
+        return result
+
+    @staticmethod
+    def generate_charts(jobs, width=1920, height=2048, image_format='jpeg', use_cache=True,
+                        renderer=None, quality=None):
+        """Generate charts for many symbols in parallel
+
+        Yields a ChartResult per job in completion order. A failing symbol is
+        reported in its result and does not stop the rest of the batch.
+        """
+        image_format, renderer, quality, variant = _render_options(image_format, renderer, quality)
+        executor = _get_batch_executor()
+        pending = {}
+        for job in jobs:
+            if not isinstance(job, ChartJob):
+                job = ChartJob(*job)
+            submitted = time.perf_counter()
+            try:
+                series = BarSeries.from_dataframe(job.df, job.symbol)
+                cache_key = chart_cache_key(series, width, height, image_format, variant)
+                cached = chart_cache.get(cache_key) if use_cache else None
+                if cached is not None:
+                    yield ChartResult(job.symbol, job.timeframe, image=cached, cached=True,
+                                      timings={'total_seconds': time.perf_counter() - submitted}, index=job.index)
+                    continue
+                future = executor.submit(_render_chart_job, job.df, job.symbol, width, height, image_format,
+                                         renderer, quality)
+            except Exception as e:
+                logger.error(f"Error queuing chart for {job.symbol}: {str(e)}")
+                yield ChartResult(job.symbol, job.timeframe, error=str(e), index=job.index)
+                continue
+            pending[future] = (job, cache_key, submitted)
+
+        for future in as_completed(pending):
+            job, cache_key, submitted = pending[future]
+            try:
+                image, timings = future.result()
+            except Exception as e:
+                logger.error(f"Error generating technical chart for {job.symbol}: {str(e)}")
+                yield ChartResult(job.symbol, job.timeframe, error=str(e),
+                                  timings={'total_seconds': time.perf_counter() - submitted}, index=job.index)
+                continue
+            if use_cache:
+                chart_cache.put(cache_key, image)
+            timings['total_seconds'] = time.perf_counter() - submitted
+            yield ChartResult(job.symbol, job.timeframe, image=image, timings=timings, index=job.index)
+
+    @staticmethod
+    @instrument('charts.build_figure')
+    def build_figure(df, symbol, series=None, indicators=None):
+        """Compute indicators (unless given) and fill a copy of the 7-panel figure skeleton
+
+        Long series are decimated to about CHART_MAX_POINTS buckets first,
+        so the figure and the JSON handed to Kaleido stay small.
+        """
+        chart = TechnicalChartService.prepare_chart(df, symbol, series, indicators)
+        return TechnicalChartService.figure_from_chart(chart)
+
+    @staticmethod
+    @instrument('charts.prepare_chart')
+    def prepare_chart(df, symbol, series=None, indicators=None):
+        """Renderer-independent chart data: decimated traces plus title text"""
+        if series is None:
+            series = BarSeries.from_dataframe(df, symbol)
+
+        # Calculate indicators, reusing any the caller already has
+        with stage('charts.indicators'):
+            processed_indicators = TechnicalChartService.process_indicators(indicators, df, series)
+
+        return {
+            'symbol': symbol,
+            'subtitle': (
+                f"Open: {series.open[-1]:.2f} | High: {series.high[-1]:.2f} | "
+                f"Low: {series.low[-1]:.2f} | Close: {series.close[-1]:.2f}"
+            ),
+            'obv_unit': processed_indicators['obv_unit'],
+            'traces': TechnicalChartService.chart_arrays(series, processed_indicators)
+        }
+
+    @staticmethod
+    def process_indicators(indicators, df, series=None):
+        """Complete float64 indicator bundle for the chart panels, keyed as chart_arrays expects
+
+        indicators is an optional calculate_indicators-style result whose
+        values are reused as they are; everything else (volume, OBV, or
+        the whole set) comes from one IndicatorGraph pass over the bars.
+        Volume is in millions and OBV is scaled to the unit in obv_unit.
+        """
+        if series is None:
+            series = BarSeries.from_dataframe(df)
+        graph = IndicatorGraph.from_series(series)
+        if indicators:
+            graph.preload(legacy_nodes(indicators))
+
+        processed = {
+            key: np.asarray(value, dtype=np.float64)
+            for key, value in zip(CHART_INDICATORS, graph.compute(CHART_INDICATORS.values()).values())
+        }
+        processed['volume'] = processed['volume'] / 1e6
+        obv = processed.pop('obv')
+        scale, unit = _obv_scale(obv)
+        processed['obv_normalized'] = obv / scale
+        processed['obv_unit'] = unit
+        return processed
+
+    @staticmethod
+    def figure_from_chart(chart):
+        """Copy the prebuilt skeleton and only swap in the data arrays"""
+        fig = go.Figure(_figure_skeleton())
+        with fig.batch_update():
+            for trace, name in zip(fig.data, SKELETON_TRACES):
+                trace.update(chart['traces'][name])
+            fig.data[0].name = f"{chart['symbol']} Price"
+            fig.layout.annotations[0].text = f"{chart['symbol']} Price"
+            fig.layout.annotations[5].text = f"OBV ({chart['obv_unit']})"
+            fig.layout.title.text = f"{chart['symbol']} <br><sup>{chart['subtitle']}</sup>"
+        return fig
 
+    @staticmethod
+    def chart_arrays(series, indicators, max_points=CHART_MAX_POINTS, method=CHART_DECIMATION):
+        """Decimated trace data for every skeleton trace, keyed by SKELETON_TRACES name
+
+        Candles are merged into buckets of equal bar count, volume is summed
+        and the MACD histogram keeps each bucket's largest bar, all drawn at
+        the bucket's first date. Lines keep their visible shape through
+        min/max (or LTTB) point selection. Bar colours are computed over whole
+        arrays as 0/1 values mapped through each trace's two-colour
+        colorscale, which Plotly validates far faster than colour strings.
+        """
+        dates = series.dates
+        size = bucket_size(len(series), max_points)
+        starts = bucket_starts(len(series), size)
+        bucket_dates = dates[starts]
+
+        open_, high, low, close = ohlc_buckets(series.open, series.high, series.low, series.close, size)
+        up = np.asarray(close) >= np.asarray(open_)
+        histogram = np.asarray(indicators['histogram'], dtype=np.float64)
+        histogram = histogram[extreme_indices(histogram, size)]
+
+        def line(values):
+            values = np.asarray(values, dtype=np.float64)
+            indices = _line_indices(values, size, method)
+            breaks = gap_breaks(values, indices)
+            return {
+                'x': np.insert(dates[indices], breaks, dates[indices[breaks]]),
+                'y': np.insert(values[indices], breaks, np.nan)
+            }
+
+        st_values = np.asarray(indicators['st_values'], dtype=np.float64)
+        st_direction = np.asarray(indicators['st_direction'], dtype=np.float64)
+
+        return {
+            'candles': {'x': bucket_dates, 'open': open_, 'high': high, 'low': low, 'close': close},
+            'sma_20': line(indicators['sma_20']),
+            'sma_50': line(indicators['sma_50']),
+            'sma_200': line(indicators['sma_200']),
+            'bb_upper': line(indicators['bb_upper']),
+            'bb_lower': line(indicators['bb_lower']),
+            'st_up': line(np.where(st_direction == 1, st_values, np.nan)),
+            'st_down': line(np.where(st_direction == -1, st_values, np.nan)),
+            'volume': {
+                'x': bucket_dates,
+                'y': bucket_sums(indicators['volume'], size),
+                'marker': {'color': up.astype(np.int8)}
+            },
+            'histogram': {
+                'x': bucket_dates,
+                'y': histogram,
+                'marker': {'color': (histogram > 0).astype(np.int8)}
+            },
+            'macd_line': line(indicators['macd_line']),
+            'signal_line': line(indicators['signal_line']),
+            'rsi': line(indicators['rsi']),
+            'obv': line(indicators['obv_normalized']),
+            'atr': line(indicators['atr']),
+        }
+
+    @staticmethod
+    def prewarm(background=True):
+        """Import Plotly and start Kaleido ahead of the first chart request
+
+        Kaleido launches its renderer process on first use, which otherwise
+        lands on the first chart request. Returns the warm-up thread when
+        run in the background.
+        """
+        global _prewarm_thread
+
+        def warm():
+            started = time.perf_counter()
+            try:
+                if render_pool is not None:
+                    render_pool.start(wait=True)
+                else:
+                    pio.to_image(go.Figure(), format='png', width=16, height=16)
+                logger.info(f"Chart renderer warmed up in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                logger.error(f"Error warming up chart renderer: {str(e)}")
+
+        if not background:
+            warm()
+            return None
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(target=warm, name="chart-prewarm", daemon=True)
+            _prewarm_thread.start()
+        return _prewarm_thread
+
+    @staticmethod
+    def cache_stats():
+        """Return render cache hit/miss counters"""
+        return chart_cache.stats()
+
+    @staticmethod
+    def add_price_chart(fig):
+        """Add price chart with moving averages and Bollinger Bands"""
         # Candlestick chart
         fig.add_trace(
             go.Candlestick(
-                x=dates,
-                open=df['Open'],
-                high=df['High'],
-                low=df['Low'],
-                close=df['Close'],
-                name=f'{symbol} Price',
+                x=[], open=[], high=[], low=[], close=[],
+                name='Price',
                 increasing_line_color='green',
                 decreasing_line_color='red'
             ),
@@ -107,51 +501,26 @@ class TechnicalChartService:
 
         # Moving averages
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['sma_20'],
-                mode='lines',
-                name='SMA 20',
-                line=dict(color='blue')
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='SMA 20', line=dict(color='blue')),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['sma_50'],
-                mode='lines',
-                name='SMA 50',
-                line=dict(color='rgb(47,203,13)', width=2)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='SMA 50', line=dict(color='rgb(47,203,13)', width=2)),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['sma_200'],
-                mode='lines',
-                name='SMA 200',
-                line=dict(color='rgb(240,130,21)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='SMA 200', line=dict(color='rgb(240,130,21)', width=1)),
             row=1, col=1
         )
 
         # Bollinger Bands
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['bb_upper'],
-                mode='lines',
-                name='BB Upper',
-                line=dict(color='rgb(33,150,243)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='BB Upper', line=dict(color='rgb(33,150,243)', width=1)),
             row=1, col=1
         )
         fig.add_trace(
             go.Scatter(
-                x=dates,
-                y=indicators['bb_lower'],
+                x=[], y=[],
                 mode='lines',
                 name='BB Lower',
                 line=dict(color='rgb(33,150,243)', width=1),
@@ -162,100 +531,46 @@ class TechnicalChartService:
         )
 
     @staticmethod
-    def add_supertrend(fig, df, indicators):
+    def add_supertrend(fig):
         """Add SuperTrend indicator"""
-        dates = df['Date']
-        st_up = [v if d == 1 else None for v, d in zip(indicators['st_values'], indicators['st_direction'])]
-        st_down = [v if d == -1 else None for v, d in zip(indicators['st_values'], indicators['st_direction'])]
-
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=st_up,
-                mode='lines',
-                name='SuperTrend Up',
-                line=dict(color='rgb(0,128,0)')
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='SuperTrend Up', line=dict(color='rgb(0,128,0)')),
             row=2, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=st_down,
-                mode='lines',
-                name='SuperTrend Down',
-                line=dict(color='rgb(128,0,0)')
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='SuperTrend Down', line=dict(color='rgb(128,0,0)')),
             row=2, col=1
         )
 
     @staticmethod
-    def add_volume(fig, df, indicators):
+    def add_volume(fig):
         """Add volume chart"""
-        dates = df['Date']
-        colors = ['green' if df['Close'][i] >= df['Open'][i] else 'red' for i in range(len(df))]
-
         fig.add_trace(
-            go.Bar(
-                x=dates,
-                y=indicators['volume'],
-                name='Volume',
-                marker_color=colors
-            ),
+            go.Bar(x=[], y=[], name='Volume', marker=_two_colour_marker('red', 'green')),
             row=3, col=1
         )
 
     @staticmethod
-    def add_macd(fig, df, indicators):
+    def add_macd(fig):
         """Add MACD indicator"""
-        dates = df['Date']
-
         fig.add_trace(
-            go.Bar(
-                x=dates,
-                y=indicators['histogram'],
-                name='MACD Histogram',
-                marker_color=[
-                    'rgb(34,171,148)' if h > 0 else 'rgb(255,82,82)'
-                    for h in indicators['histogram']
-                ]
-            ),
+            go.Bar(x=[], y=[], name='MACD Histogram', marker=_two_colour_marker('rgb(255,82,82)', 'rgb(34,171,148)')),
             row=4, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['macd_line'],
-                mode='lines',
-                name='MACD',
-                line=dict(color='rgb(33,150,243)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='MACD', line=dict(color='rgb(33,150,243)', width=1)),
             row=4, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['signal_line'],
-                mode='lines',
-                name='Signal',
-                line=dict(color='rgb(255,109,0)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='Signal', line=dict(color='rgb(255,109,0)', width=1)),
             row=4, col=1
         )
 
     @staticmethod
-    def add_rsi(fig, df, indicators):
+    def add_rsi(fig):
         """Add RSI indicator"""
-        dates = df['Date']
-
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['rsi'],
-                mode='lines',
-                name='RSI',
-                line=dict(color='rgb(126,87,194)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='RSI', line=dict(color='rgb(126,87,194)', width=1)),
             row=5, col=1
         )
         fig.add_hline(y=70, line_dash="dash", line_color="rgb(120,123,134)", line_width=1, row=5, col=1)
@@ -263,46 +578,27 @@ class TechnicalChartService:
         fig.add_hrect(y0=30, y1=70, fillcolor="rgba(126,87,194,0.1)", line_width=0, row=5, col=1)
 
     @staticmethod
-    def add_obv(fig, df, indicators):
+    def add_obv(fig):
         """Add OBV indicator"""
-        dates = df['Date']
-
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['obv_normalized'],
-                mode='lines',
-                name='OBV',
-                line=dict(color='rgb(33,150,243)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='OBV', line=dict(color='rgb(33,150,243)', width=1)),
             row=6, col=1
         )
 
     @staticmethod
-    def add_atr(fig, df, indicators):
+    def add_atr(fig):
         """Add ATR indicator"""
-        dates = df['Date']
-
         fig.add_trace(
-            go.Scatter(
-                x=dates,
-                y=indicators['atr'],
-                mode='lines',
-                name='ATR',
-                line=dict(color='rgb(128,25,34)', width=1)
-            ),
+            go.Scatter(x=[], y=[], mode='lines', name='ATR', line=dict(color='rgb(128,25,34)', width=1)),
             row=7, col=1
         )
 
     @staticmethod
-    def update_layout(fig, symbol, df):
-        """Update chart layout"""
-        latest = df.iloc[-1]
-        latest_ohlc = f"Open: {latest['Open']:.2f} | High: {latest['High']:.2f} | Low: {latest['Low']:.2f} | Close: {latest['Close']:.2f}"
-
+    def update_layout(fig):
+        """Update chart layout; the title text is filled in per chart"""
         fig.update_layout(
             title=dict(
-                text=f'{symbol} <br><sup>{latest_ohlc}</sup>',
+                text='',
                 x=0.5,
                 xanchor='center',
                 font=dict(size=20)
@@ -327,4 +623,4 @@ class TechnicalChartService:
 
         # Hide secondary y-axis titles
         for i in range(1, 8):
-            fig.update_yaxes(showgrid=False, title_text="", row=i, col=1, secondary_y=True) 
\ No newline at end of file
+            fig.update_yaxes(showgrid=False, title_text="", row=i, col=1, secondary_y=True)
@@ -0,0 +1,75 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Optional
+from ..config import ASYNC_CALL_TIMEOUT
+
+
+class AsyncRunner:
+    """One event loop on a daemon thread, shared by every sync caller
+
+    Flask request threads hand coroutines to run() and block only their own
+    thread; the loop keeps all async clients, their connection pools and
+    concurrency limits in one place. The caller's context variables (e.g.
+    the metrics trace) are carried into the coroutine.
+    """
+
+    def __init__(self, name: str = 'async-services'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._loop, ready), name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run(loop, ready):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = ASYNC_CALL_TIMEOUT) -> Any:
+        """Run a coroutine on the shared loop and wait for its result"""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncRunner.run() called from its own event loop; await the coroutine instead")
+        # The task is created in a copy of this thread's context
+        future = contextvars.copy_context().run(asyncio.run_coroutine_threadsafe, coro, loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+
+runner = AsyncRunner()
+
+
+def blocking(fn: Callable[..., Awaitable]) -> Callable[..., Any]:
+    """Sync wrapper for a coroutine function, running it on the shared loop"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return runner.run(fn(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,151 @@
+import functools
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+from .scanner import ExpressionFields, as_mask, compile_expression
+
+METRICS = ('total_return', 'pnl', 'max_drawdown', 'trades', 'turnover', 'exposure')
+SUMMARY_METRICS = ('total_return', 'median_return', 'pnl', 'max_drawdown', 'mean_drawdown', 'trades',
+                   'turnover', 'exposure', 'winning_share')
+
+
+class BacktestError(ValueError):
+    pass
+
+
+def parameter_grid(grid: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+    """Every combination of the grid's values, varying the last key fastest
+
+    Neighbouring combinations then share their leading parameters, and so
+    most of their indicator nodes.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def format_template(template: str, params: Dict[str, Any]) -> str:
+    """Fill {name} placeholders of an expression or node template from params"""
+    try:
+        return template.format(**params)
+    except (KeyError, IndexError) as e:
+        raise BacktestError(f"Template {template!r} uses a parameter that is not in the grid: {e}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compiled(expression: str):
+    return compile_expression(expression)
+
+
+def check_templates(entry: str, exit: str, aliases: Optional[Dict[str, str]], params: Dict[str, Any]):
+    """Raise BacktestError/ScanExpressionError for templates that cannot run with params"""
+    for template in (entry, exit):
+        _compiled(format_template(template, params))
+    for node in (aliases or {}).values():
+        format_template(node, params)
+
+
+def _shift(values: np.ndarray, fill=np.nan) -> np.ndarray:
+    out = np.empty(values.shape, dtype=np.float64)
+    out[..., :1] = fill
+    out[..., 1:] = values[..., :-1]
+    return out
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value forward along the last axis"""
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[-1]))
+    np.maximum.accumulate(index, axis=-1, out=index)
+    return np.take_along_axis(values, index, axis=-1)
+
+
+def simulate(open_, high, low, close, entry, exit, adjust: Callable, adjustment_percent: float,
+             capital: float = 1.0) -> Dict[str, np.ndarray]:
+    """Long-only fills for entry/exit signals, vectorized over (symbols, bars) columns
+
+    A signal on a bar's close sets the target position: entry long, exit
+    flat, exit winning when both fire. While the position differs from
+    the target, a limit order is worked on the next bar at
+    adjust(previous close, side, adjustment_percent), the price the live
+    order path would send. It fills when the bar's range reaches the
+    limit, at the open when the bar gaps through it. Equity is fully
+    invested while long.
+
+    Returns one value per symbol for each name in METRICS.
+    """
+    shape = np.shape(close)
+    entry = np.broadcast_to(as_mask(entry), shape)
+    exit = np.broadcast_to(as_mask(exit), shape)
+
+    target = np.nan_to_num(_ffill(np.where(exit, 0.0, np.where(entry, 1.0, np.nan))))
+    wanted = _shift(target)
+    buy_limit = _shift(adjust(close, 'BUY', adjustment_percent))
+    sell_limit = _shift(adjust(close, 'SELL', adjustment_percent))
+    # A fill in the wanted direction sets the position; other bars carry it
+    filled = np.where((wanted == 1.0) & (low <= buy_limit), 1.0,
+                      np.where((wanted == 0.0) & (high >= sell_limit), 0.0, np.nan))
+    position = np.nan_to_num(_ffill(filled))
+    held = _shift(position, 0.0)
+    bought = position > held
+    sold = position < held
+
+    prev_close = _shift(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = held * (close / prev_close - 1.0)
+        returns = np.where(bought, close / np.minimum(open_, buy_limit) - 1.0, returns)
+        returns = np.where(sold, np.maximum(open_, sell_limit) / prev_close - 1.0, returns)
+    equity = np.cumprod(1.0 + np.nan_to_num(returns), axis=-1)
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity, axis=-1)
+    fills = bought | sold
+    # Each fill trades the whole equity; turnover is traded value over average equity
+    traded = np.where(fills, _shift(equity, 1.0), 0.0).sum(axis=-1)
+
+    return {
+        'total_return': equity[..., -1] - 1.0,
+        'pnl': capital * (equity[..., -1] - 1.0),
+        'max_drawdown': drawdown.max(axis=-1),
+        'trades': fills.sum(axis=-1),
+        'turnover': traded / equity.mean(axis=-1),
+        'exposure': position.mean(axis=-1),
+    }
+
+
+def run_backtest(fields: ExpressionFields, entry: str, exit: str, adjust: Callable, adjustment_percent: float,
+                 params: Optional[Dict[str, Any]] = None, aliases: Optional[Dict[str, str]] = None,
+                 capital: float = 1.0) -> Dict[str, np.ndarray]:
+    """Evaluate entry/exit expressions with params filled in and simulate them
+
+    Expressions use the scanner language; aliases name extra indicator
+    nodes, and both may contain {param} placeholders, e.g. entry
+    "crosses_above(st_dir, 0) and rsi < {rsi_low}" with aliases
+    {"st_dir": "st_direction({period},{multiplier})"}. Nodes are computed
+    on the fields' graph, so runs sharing it share indicators.
+    """
+    params = params or {}
+    scoped = fields.with_aliases({name: format_template(node, params) for name, node in (aliases or {}).items()})
+    entry_mask = _compiled(format_template(entry, params))(scoped)
+    exit_mask = _compiled(format_template(exit, params))(scoped)
+    return simulate(scoped['open'], scoped['high'], scoped['low'], scoped['close'], entry_mask, exit_mask,
+                    adjust, adjustment_percent, capital)
+
+
+def summarize(metrics: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Aggregate one run's per-symbol metrics"""
+    total_return = metrics['total_return']
+    return {
+        'total_return': float(total_return.mean()),
+        'median_return': float(np.median(total_return)),
+        'pnl': float(metrics['pnl'].sum()),
+        'max_drawdown': float(metrics['max_drawdown'].max()),
+        'mean_drawdown': float(metrics['max_drawdown'].mean()),
+        'trades': int(metrics['trades'].sum()),
+        'turnover': float(metrics['turnover'].mean()),
+        'exposure': float(metrics['exposure'].mean()),
+        'winning_share': float((total_return > 0).mean()),
+    }
+
+
+def per_symbol(symbols: Sequence[str], metrics: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    return [
+        dict({'symbol': symbol}, **{name: metrics[name][row].item() for name in METRICS})
+        for row, symbol in enumerate(symbols)
+    ]
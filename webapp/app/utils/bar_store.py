@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+import numpy as np
+from ..models.bar_series import BarSeries, FIELDS
+from .timeframes import is_timeframe
+
+logger = logging.getLogger(__name__)
+
+# Per-column dtypes of the raw files; dates are epoch nanoseconds
+COLUMN_DTYPES = {'dates': np.dtype('<i8')}
+COLUMN_DTYPES.update({field: np.dtype('<f8') for field in FIELDS})
+META_FILE = 'meta.json'
+EMPTY_META = {'count': 0, 'first': None, 'last': None, 'since': None, 'updated_at': None, 'symbol': None}
+
+# Suffix of the bar keys that include bars outside regular trading hours
+EXTENDED_SUFFIX = '-ext'
+
+
+class BarStoreKeyError(ValueError):
+    pass
+
+
+class BarStore:
+    """Local columnar store of historical bars keyed by conid and bar size
+
+    Each (conid, bar) pair is a directory holding one raw little-endian
+    file per column and a meta.json with the committed bar count. Reads
+    memory-map the columns and binary-search the date range, so a range
+    query touches only the pages it returns. append() writes bars newer
+    than the last stored one (replacing the last bar when it is re-sent,
+    since the current period's bar keeps changing) and commits the new
+    count atomically; bytes past the count from an interrupted append are
+    ignored and overwritten by the next one. Bars older than the first
+    stored one are merged in front by rewriting the columns.
+
+    Conids and bar sizes come from requests, so keys must be a numeric
+    conid and a bar size such as "1d" or "5min-ext"; anything else raises
+    BarStoreKeyError rather than touching a path outside root.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _dir(self, conid, bar: str) -> str:
+        conid, bar = str(conid), str(bar)
+        if not (conid.isascii() and conid.isdigit()):
+            raise BarStoreKeyError(f"Invalid conid: {conid}")
+        if not is_timeframe(bar[:-len(EXTENDED_SUFFIX)] if bar.endswith(EXTENDED_SUFFIX) else bar):
+            raise BarStoreKeyError(f"Invalid bar size: {bar}")
+        root = os.path.realpath(self.root)
+        directory = os.path.realpath(os.path.join(root, conid, bar))
+        if os.path.commonpath([root, directory]) != root:
+            raise BarStoreKeyError(f"Invalid bar store key: {conid}/{bar}")
+        return directory
+
+    def _lock(self, conid, bar: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((str(conid), bar), threading.Lock())
+
+    def _read_meta(self, directory: str) -> Dict:
+        try:
+            with open(os.path.join(directory, META_FILE)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return dict(EMPTY_META)
+        if meta['count'] and meta.get('first') is None:
+            # Stores written before first was recorded
+            meta['first'] = int(np.fromfile(os.path.join(directory, 'dates'), dtype=COLUMN_DTYPES['dates'], count=1)[0])
+        return dict(EMPTY_META, **meta)
+
+    def _write_meta(self, directory: str, meta: Dict):
+        path = os.path.join(directory, META_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def meta(self, conid, bar: str) -> Dict:
+        """Return {'count', 'first', 'last', 'since', 'updated_at', 'symbol'}
+
+        first and last are the stored bars' dates and since the start of
+        the earliest range fetched in full, all epoch nanoseconds; the
+        store holds every bar the gateway had from since to last.
+        """
+        with self._lock(conid, bar):
+            return self._read_meta(self._dir(conid, bar))
+
+    def last_timestamp(self, conid, bar: str) -> Optional[np.datetime64]:
+        last = self.meta(conid, bar)['last']
+        return None if last is None else np.datetime64(last, 'ns')
+
+    def read(self, conid, bar: str, start=None, end=None) -> BarSeries:
+        """Return stored bars with start <= date <= end as a memory-mapped BarSeries"""
+        directory = self._dir(conid, bar)
+        with self._lock(conid, bar):
+            meta = self._read_meta(directory)
+            count = meta['count']
+            if not count:
+                return BarSeries([], [], [], [], [], [], symbol=meta['symbol'])
+            columns = {
+                name: np.memmap(os.path.join(directory, name), dtype=dtype, mode='r', shape=(count,))
+                for name, dtype in COLUMN_DTYPES.items()
+            }
+
+        dates = columns['dates']
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, 'ns').astype(np.int64), side='left')
+        hi = count if end is None else np.searchsorted(dates, np.datetime64(end, 'ns').astype(np.int64), side='right')
+        return BarSeries(
+            dates[lo:hi].view('datetime64[ns]'),
+            *(columns[field][lo:hi] for field in FIELDS),
+            symbol=meta['symbol']
+        )
+
+    def read_tail(self, conid, bar: str, count: int) -> BarSeries:
+        """Return the last count stored bars using plain reads, cheaper than mapping for short tails"""
+        directory = self._dir(conid, bar)
+        with self._lock(conid, bar):
+            meta = self._read_meta(directory)
+            stored = meta['count']
+            count = min(count, stored)
+            columns = {}
+            for name, dtype in COLUMN_DTYPES.items():
+                with open(os.path.join(directory, name), 'rb') as f:
+                    f.seek((stored - count) * dtype.itemsize)
+                    columns[name] = np.fromfile(f, dtype=dtype, count=count)
+        return BarSeries(
+            columns['dates'].view('datetime64[ns]'),
+            *(columns[field] for field in FIELDS),
+            symbol=meta['symbol']
+        )
+
+    def append(self, conid, bar: str, series: BarSeries, since=None) -> int:
+        """Store the bars of series outside the stored range; returns how many were written
+
+        since is the start of the range series was requested for, in epoch
+        nanoseconds; pass it when the series is a full fetch of that range
+        so meta's since can move back to it.
+        """
+        directory = self._dir(conid, bar)
+        incoming = series.dates.astype(np.int64)
+        with self._lock(conid, bar):
+            os.makedirs(directory, exist_ok=True)
+            meta = self._read_meta(directory)
+            count = meta['count']
+            older = start = 0
+            if meta['last'] is not None:
+                older = int(np.searchsorted(incoming, meta['first'], side='left'))
+                start = int(np.searchsorted(incoming, meta['last'], side='left'))
+                if older:
+                    self._prepend(directory, meta, series, older)
+                    count += older
+                if start < len(incoming) and incoming[start] == meta['last']:
+                    # The stored last bar was still forming; overwrite it
+                    count -= 1
+
+            if start < len(incoming):
+                new = {'dates': incoming[start:]}
+                new.update({field: getattr(series, field)[start:] for field in FIELDS})
+                for name, dtype in COLUMN_DTYPES.items():
+                    path = os.path.join(directory, name)
+                    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                        f.seek(count * dtype.itemsize)
+                        f.write(np.ascontiguousarray(new[name], dtype=dtype).tobytes())
+                        f.truncate()
+                        f.flush()
+                        os.fsync(f.fileno())
+                count += len(incoming) - start
+                meta['last'] = int(incoming[-1])
+            if meta['first'] is None or older:
+                meta['first'] = int(incoming[0]) if len(incoming) else None
+
+            written = older + max(len(incoming) - start, 0)
+            covered = [value for value in (meta['since'], meta['first'], since) if value is not None]
+            meta.update({
+                'count': count,
+                'since': int(min(covered)) if covered and count else None,
+                'updated_at': time.time(),
+                'symbol': series.symbol or meta['symbol']
+            })
+            self._write_meta(directory, meta)
+            if written:
+                logger.info(f"Stored {written} {bar} bars for {conid} ({meta['count']} total)")
+            return written
+
+    def _prepend(self, directory: str, meta: Dict, series: BarSeries, older: int):
+        """Rewrite the columns with series' first older bars in front of the stored ones"""
+        # Mark the store empty while the columns are replaced, so an interrupted rewrite is refetched
+        self._write_meta(directory, dict(meta, count=0, first=None, last=None, since=None))
+        head = {'dates': series.dates[:older].astype(np.int64)}
+        head.update({field: getattr(series, field)[:older] for field in FIELDS})
+        for name, dtype in COLUMN_DTYPES.items():
+            path = os.path.join(directory, name)
+            stored = np.fromfile(path, dtype=dtype, count=meta['count'])
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(np.ascontiguousarray(head[name], dtype=dtype).tobytes())
+                f.write(stored.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+    def delete(self, conid, bar: str):
+        directory = self._dir(conid, bar)
+        with self._lock(conid, bar):
+            for name in list(COLUMN_DTYPES) + [META_FILE]:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from ..models.bar_series import BarSeries
+
+logger = logging.getLogger(__name__)
+
+
+def series_digest(series: BarSeries) -> str:
+    """Fingerprint of a series' data range
+
+    The bar count and the last bar (timestamp and OHLCV) identify the data
+    range; a revised last bar therefore yields a new digest.
+    """
+    digest = hashlib.sha1()
+    digest.update(str(len(series)).encode())
+    if len(series):
+        digest.update(series.dates[-1:].tobytes())
+        for column in series.columns().values():
+            digest.update(column[-1:].tobytes())
+    return digest.hexdigest()[:16]
+
+
+def safe_name(text) -> str:
+    """text with everything but letters and digits replaced by "_", for file and entry names"""
+    return ''.join(c if c.isalnum() else '_' for c in str(text or ''))
+
+
+def chart_cache_key(series: BarSeries, width: int, height: int, image_format: str, variant: str = '') -> str:
+    """Build a content-addressed key for a rendered chart"""
+    symbol = safe_name(series.symbol)
+    return f"{symbol}-{series_digest(series)}-{width}x{height}{variant}.{image_format}"
+
+
+class ChartCache:
+    """Size-bounded LRU cache of rendered chart images with an optional disk tier"""
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached image bytes or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store image bytes in memory and, if configured, on disk"""
+        with self._lock:
+            self._store(key, data)
+        self._write_disk(key, data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+    def _store(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = os.path.join(self.disk_dir, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Error reading cached chart {key}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, data: bytes):
+        if not self.disk_dir:
+            return
+        path = os.path.join(self.disk_dir, key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            if self.disk_max_bytes:
+                self._prune_disk()
+        except OSError as e:
+            logger.error(f"Error writing cached chart {key}: {str(e)}")
+
+    def _prune_disk(self):
+        """Remove least recently used files until the disk tier fits its budget"""
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,90 @@
+import importlib.util
+import json
+from typing import Any, Dict
+import numpy as np
+from .lazy_import import LazyModule
+
+msgpack = LazyModule('msgpack')
+pa = LazyModule('pyarrow')
+
+MIME_TYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/x-msgpack',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+# Formats that need an optional dependency
+_FORMAT_MODULES = {'msgpack': 'msgpack', 'arrow': 'pyarrow'}
+
+_NS_PER_DAY = 86_400 * 10 ** 9
+
+
+def available_formats():
+    return sorted(
+        name for name in MIME_TYPES
+        if name not in _FORMAT_MODULES or importlib.util.find_spec(_FORMAT_MODULES[name]) is not None
+    )
+
+
+def _epoch_ms(dates: np.ndarray) -> np.ndarray:
+    return dates.astype('datetime64[ms]').view(np.int64)
+
+
+def _rows(columns: Dict[str, np.ndarray]) -> int:
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def _json_column(values: np.ndarray, precision: int) -> list:
+    if values.dtype.kind == 'M':
+        # Daily bars print as dates, intraday bars to the second
+        ns = values.astype('datetime64[ns]').view(np.int64)
+        return np.datetime_as_string(values, unit='s' if (ns % _NS_PER_DAY).any() else 'D').tolist()
+    rounded = np.round(values, precision)
+    return np.where(np.isnan(rounded), None, rounded.astype(object)).tolist()
+
+
+def encode_json(columns: Dict[str, np.ndarray], meta: Dict[str, Any], precision: int = 4) -> bytes:
+    """Trimmed JSON: one list per column, floats rounded to precision decimals, NaN as null"""
+    payload = dict(meta, rows=_rows(columns), columns={
+        name: _json_column(values, precision) for name, values in columns.items()
+    })
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def encode_msgpack(columns: Dict[str, np.ndarray], meta: Dict[str, Any]) -> bytes:
+    """msgpack map whose columns are raw little-endian buffers
+
+    Each column is {"dtype": "<f8" | "<i8", "data": bytes}; dates are
+    epoch milliseconds, so a client can wrap data in a Float64Array or
+    BigInt64Array (numpy.frombuffer) without parsing numbers.
+    """
+    encoded = {}
+    for name, values in columns.items():
+        values = _epoch_ms(values) if values.dtype.kind == 'M' else values
+        values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+        encoded[name] = {'dtype': values.dtype.str, 'data': values.tobytes()}
+    return msgpack.packb(dict(meta, rows=_rows(columns), columns=encoded), use_bin_type=True)
+
+
+def encode_arrow(columns: Dict[str, np.ndarray], meta: Dict[str, Any]) -> bytes:
+    """Arrow IPC stream holding one record batch, with meta in the schema metadata"""
+    table = pa.table({
+        name: values.astype('datetime64[ms]') if values.dtype.kind == 'M' else values
+        for name, values in columns.items()
+    })
+    table = table.replace_schema_metadata({key: str(value) for key, value in meta.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(columns: Dict[str, np.ndarray], meta: Dict[str, Any], data_format: str, precision: int = 4) -> bytes:
+    """Encode equal-length columns in one of MIME_TYPES' formats"""
+    if data_format == 'json':
+        return encode_json(columns, meta, precision)
+    if data_format not in available_formats():
+        raise ValueError(f"Unsupported data format: {data_format}")
+    if data_format == 'msgpack':
+        return encode_msgpack(columns, meta)
+    return encode_arrow(columns, meta)
@@ -0,0 +1,121 @@
+import math
+import numpy as np
+
+
+def bucket_size(count: int, max_points: int) -> int:
+    """Bars per bucket so that count bars fit in max_points buckets; 1 means no decimation"""
+    if max_points <= 0 or count <= max_points:
+        return 1
+    return math.ceil(count / max_points)
+
+
+def bucket_starts(count: int, size: int) -> np.ndarray:
+    return np.arange(0, count, size)
+
+
+def _padded(values: np.ndarray, size: int, fill: float) -> np.ndarray:
+    """Reshape to (buckets, size), padding the last bucket with fill"""
+    buckets = math.ceil(len(values) / size)
+    padded = np.full(buckets * size, fill)
+    padded[:len(values)] = values
+    return padded.reshape(buckets, size)
+
+
+def minmax_indices(values, size: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each bucket, in time order
+
+    Keeping both extremes of every bucket preserves the visible envelope
+    of a line drawn at roughly one bucket per pixel. NaN values are never
+    selected, so leading indicator warm-up periods simply drop out.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if size <= 1:
+        return np.flatnonzero(~np.isnan(values))
+
+    offsets = bucket_starts(len(values), size)
+    lows = _padded(values, size, np.nan)
+    highs = lows.copy()
+    lows[np.isnan(lows)] = np.inf
+    highs[np.isnan(highs)] = -np.inf
+    pairs = np.sort(np.stack([lows.argmin(axis=1), highs.argmax(axis=1)], axis=1), axis=1)
+    indices = (pairs + offsets[:, None]).ravel()
+    indices = indices[np.concatenate(([True], np.diff(indices) != 0))]
+    return indices[~np.isnan(values[indices])]
+
+
+def extreme_indices(values, size: int) -> np.ndarray:
+    """Index of the largest absolute value in each bucket, for bar panels such as a MACD histogram"""
+    values = np.asarray(values, dtype=np.float64)
+    if size <= 1:
+        return np.arange(len(values))
+    magnitude = np.abs(_padded(values, size, np.nan))
+    magnitude[np.isnan(magnitude)] = -1.0
+    return magnitude.argmax(axis=1) + bucket_starts(len(values), size)
+
+
+def bucket_sums(values, size: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if size <= 1:
+        return values
+    return np.add.reduceat(np.nan_to_num(values), bucket_starts(len(values), size))
+
+
+def ohlc_buckets(open_, high, low, close, size: int):
+    """Aggregate candles per bucket: first open, highest high, lowest low, last close"""
+    if size <= 1:
+        return open_, high, low, close
+    starts = bucket_starts(len(close), size)
+    ends = np.append(starts[1:], len(close)) - 1
+    return (
+        np.asarray(open_)[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        np.asarray(close)[ends]
+    )
+
+
+def lttb_indices(values, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsample of a gap-free series, as indices
+
+    Picks, in each bucket, the point forming the largest triangle with the
+    previously kept point and the next bucket's average. Slower than
+    minmax_indices since it walks the buckets in order.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    count = len(y)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    x = np.arange(count, dtype=np.float64)
+    every = (count - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = count - 1
+    sums_x = np.add.reduceat(x[:count - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:count - 1], edges[:-1])
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    anchor = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - avg_x[bucket + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[bucket + 1] - ay))
+        anchor = lo + int(area.argmax())
+        selected[bucket + 1] = anchor
+    selected[-1] = count - 1
+    return selected
+
+
+def gap_breaks(values, indices: np.ndarray) -> np.ndarray:
+    """Positions in indices preceded by a NaN in values since the previous kept index
+
+    Inserting a NaN at these positions keeps a decimated line broken where
+    the original was, e.g. a SuperTrend leg that only covers part of a bucket.
+    """
+    missing = np.cumsum(np.isnan(np.asarray(values, dtype=np.float64)))
+    if len(indices) < 2:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(missing[indices[1:]] - missing[indices[:-1]] > 0) + 1
@@ -0,0 +1,234 @@
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import numpy as np
+from ..models.bar_series import BarSeries, FIELDS
+from . import vectorized_indicators as vi
+
+# Indicator nodes are named like calls, e.g. "sma(close,20)" or "atr(14)".
+# Each kind declares which nodes it reads; IndicatorGraph computes every
+# node at most once per series and shares it with all of its dependents.
+_KINDS: Dict[str, Tuple[Callable[..., List[str]], Callable[..., Any]]] = {}
+
+
+class UnknownIndicatorError(KeyError):
+    pass
+
+
+def indicator(kind: str, deps: Callable[..., List[str]] = lambda *args: []):
+    """Register a node kind: deps(*args) names its inputs, the function gets (inputs, *args)"""
+    def register(fn):
+        _KINDS[kind] = (deps, fn)
+        return fn
+    return register
+
+
+def parse_node(name: str) -> Tuple[str, tuple]:
+    """Split "kind(a,b)" into ("kind", (a, b)), converting numeric arguments"""
+    name = name.replace(' ', '')
+    if '(' not in name:
+        return name, ()
+    kind, _, rest = name.partition('(')
+    args = []
+    for arg in rest.rstrip(')').split(','):
+        try:
+            args.append(int(arg))
+        except ValueError:
+            try:
+                args.append(float(arg))
+            except ValueError:
+                args.append(arg)
+    return kind, tuple(args)
+
+
+@functools.lru_cache(maxsize=None)
+def _plan(name: str) -> Tuple[Callable[..., Any], tuple, tuple]:
+    """Function, arguments and dependency names of a node, resolved once per name"""
+    kind, args = parse_node(name)
+    if kind not in _KINDS:
+        raise UnknownIndicatorError(f"Unknown indicator {name!r}")
+    deps, fn = _KINDS[kind]
+    return fn, args, tuple(deps(*args))
+
+
+def node_name(kind: str, *args) -> str:
+    return f"{kind}({','.join(str(arg) for arg in args)})" if args else kind
+
+
+@indicator('sma', lambda source, period: [source])
+def _sma(inputs, source, period):
+    return vi.sma(inputs[0], period)
+
+
+@indicator('var', lambda source, period: [source, node_name('sma', source, period)])
+def _var(inputs, source, period):
+    values, mean = inputs
+    return vi.rolling_variance(values, period, mean)
+
+
+@indicator('std', lambda source, period: [node_name('var', source, period)])
+def _std(inputs, source, period):
+    return np.sqrt(inputs[0])
+
+
+@indicator('bb_upper', lambda source, period, k: [node_name('sma', source, period), node_name('std', source, period)])
+def _bb_upper(inputs, source, period, k):
+    middle, std = inputs
+    return middle + k * std
+
+
+@indicator('bb_lower', lambda source, period, k: [node_name('sma', source, period), node_name('std', source, period)])
+def _bb_lower(inputs, source, period, k):
+    middle, std = inputs
+    return middle - k * std
+
+
+@indicator('ema', lambda source, period: [source])
+def _ema(inputs, source, period):
+    return vi.ema(inputs[0], period)
+
+
+@indicator('macd', lambda fast, slow: [node_name('ema', 'close', fast), node_name('ema', 'close', slow)])
+def _macd(inputs, fast, slow):
+    fast_ema, slow_ema = inputs
+    return fast_ema - slow_ema
+
+
+@indicator('macd_signal', lambda fast, slow, signal: [node_name('macd', fast, slow)])
+def _macd_signal(inputs, fast, slow, signal):
+    return vi.macd_signal(inputs[0], signal)
+
+
+@indicator('macd_hist', lambda fast, slow, signal: [node_name('macd', fast, slow),
+                                                    node_name('macd_signal', fast, slow, signal)])
+def _macd_hist(inputs, fast, slow, signal):
+    macd_line, signal_line = inputs
+    return macd_line - signal_line
+
+
+@indicator('rsi', lambda source, period: [source])
+def _rsi(inputs, source, period):
+    return vi.rsi(inputs[0], period)
+
+
+@indicator('true_range', lambda: ['high', 'low', 'close'])
+def _true_range(inputs):
+    return vi.true_range(*inputs)
+
+
+@indicator('atr', lambda period: ['true_range'])
+def _atr(inputs, period):
+    return vi.atr_from_true_range(inputs[0], period)
+
+
+@indicator('supertrend', lambda period, multiplier: ['high', 'low', 'close', node_name('atr', period)])
+def _supertrend(inputs, period, multiplier):
+    high, low, close, atr_values = inputs
+    return vi.supertrend_from_atr(high, low, close, atr_values, period, multiplier)
+
+
+@indicator('st_value', lambda period, multiplier: [node_name('supertrend', period, multiplier)])
+def _st_value(inputs, period, multiplier):
+    return inputs[0]['supertrend']
+
+
+@indicator('st_direction', lambda period, multiplier: [node_name('supertrend', period, multiplier)])
+def _st_direction(inputs, period, multiplier):
+    return inputs[0]['direction']
+
+
+@indicator('obv', lambda: ['close', 'volume'])
+def _obv(inputs):
+    return vi.obv(*inputs)
+
+
+class IndicatorGraph:
+    """Lazily evaluated indicator nodes over one set of OHLCV columns
+
+    Columns may be 1-D series or (symbols, bars) panels. Looking up a node
+    computes its dependencies first and memoizes every result, so e.g.
+    the Bollinger middle band and SMA 20 are one rolling mean, and ATR 14
+    and the SuperTrend's ATR 10 share one true range.
+    """
+
+    def __init__(self, columns: Dict[str, Any]):
+        self._values: Dict[str, Any] = {field: np.asarray(columns[field], dtype=np.float64) for field in FIELDS}
+        self.computed: List[str] = []
+
+    @classmethod
+    def from_series(cls, series: BarSeries) -> 'IndicatorGraph':
+        return cls(series.columns())
+
+    @classmethod
+    def from_columns(cls, open_, high, low, close, volume) -> 'IndicatorGraph':
+        return cls(dict(zip(FIELDS, (open_, high, low, close, volume))))
+
+    def preload(self, values: Dict[str, Any]):
+        """Seed nodes computed elsewhere so they are not computed again"""
+        for name, value in values.items():
+            self._values.setdefault(name.replace(' ', ''), value)
+
+    def __contains__(self, name: str) -> bool:
+        return name.replace(' ', '') in self._values
+
+    def __getitem__(self, name: str):
+        name = name.replace(' ', '')
+        if name in self._values:
+            return self._values[name]
+
+        fn, args, deps = _plan(name)
+        value = fn([self[dep] for dep in deps], *args)
+        self._values[name] = value
+        self.computed.append(name)
+        return value
+
+    def compute(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Compute just the requested nodes (and what they depend on)"""
+        return {name: self[name] for name in names}
+
+
+# Node behind every value of the calculate_indicators result
+LEGACY_LAYOUT = {
+    ('sma_20',): 'sma(close,20)',
+    ('sma_50',): 'sma(close,50)',
+    ('sma_200',): 'sma(close,200)',
+    ('bb', 'sma'): 'sma(close,20)',
+    ('bb', 'upper_band'): 'bb_upper(close,20,2)',
+    ('bb', 'lower_band'): 'bb_lower(close,20,2)',
+    ('supertrend', 'supertrend'): 'st_value(10,3)',
+    ('supertrend', 'direction'): 'st_direction(10,3)',
+    ('macd', 'macd'): 'macd(12,26)',
+    ('macd', 'signal'): 'macd_signal(12,26,9)',
+    ('macd', 'histogram'): 'macd_hist(12,26,9)',
+    ('rsi',): 'rsi(close,14)',
+    ('atr',): 'atr(14)',
+}
+
+
+def legacy_nodes(indicators: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a calculate_indicators-style result back onto node names, for IndicatorGraph.preload"""
+    nodes = {}
+    for path, name in LEGACY_LAYOUT.items():
+        value = indicators
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            nodes[name] = value
+    return nodes
+
+
+def compute_indicators(open_, high, low, close, volume) -> Dict[str, Any]:
+    """Calculate all technical indicators from OHLCV column arrays
+
+    Columns may also be (symbols, bars) panels; every indicator is computed
+    along the last axis, so each row matches a one-symbol calculation.
+    """
+    graph = IndicatorGraph.from_columns(open_, high, low, close, volume)
+    result: Dict[str, Any] = {}
+    for path, name in LEGACY_LAYOUT.items():
+        target = result
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = graph[name]
+    return result
@@ -0,0 +1,253 @@
+import math
+from collections import deque
+from typing import List, Dict, Any, Optional
+from ..models.quote import Quote
+
+SNAPSHOT_VERSION = 1
+
+
+class _RollingWindow:
+    """Fixed-size window keeping a running sum and sum of squares"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.since_resum = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.period:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        # Re-sum once per window length so float drift cannot build up
+        self.since_resum += 1
+        if self.since_resum >= self.period:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+            self.since_resum = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.period
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.period if self.full else None
+
+    def std(self) -> Optional[float]:
+        if not self.full:
+            return None
+        mean = self.total / self.period
+        return math.sqrt(max(self.total_sq / self.period - mean * mean, 0.0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'period': self.period, 'values': list(self.values), 'total': self.total,
+            'total_sq': self.total_sq, 'since_resum': self.since_resum
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> '_RollingWindow':
+        window = cls(data['period'])
+        window.values.extend(data['values'])
+        window.total = data['total']
+        window.total_sq = data['total_sq']
+        window.since_resum = data['since_resum']
+        return window
+
+
+class _Ema:
+    """Exponential moving average seeded with the SMA of the first period values"""
+
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        self.period = period
+        self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = None
+
+    def push(self, value: float) -> Optional[float]:
+        self.count += 1
+        if self.count < self.period:
+            self.seed_sum += value
+        elif self.count == self.period:
+            self.value = (self.seed_sum + value) / self.period
+        else:
+            self.value += (value - self.value) * self.alpha
+        return self.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'period': self.period, 'alpha': self.alpha, 'count': self.count,
+            'seed_sum': self.seed_sum, 'value': self.value
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> '_Ema':
+        ema = cls(data['period'], data['alpha'])
+        ema.count = data['count']
+        ema.seed_sum = data['seed_sum']
+        ema.value = data['value']
+        return ema
+
+
+class IndicatorState:
+    """Streaming counterpart of calculate_indicators
+
+    Each update() consumes one bar and returns the latest value of every
+    indicator in constant time, matching the last element of the batch
+    calculation over the same bars.
+    """
+
+    SMA_PERIODS = (20, 50, 200)
+    BB_PERIOD, BB_STD_DEV = 20, 2
+    SUPERTREND_PERIOD, SUPERTREND_MULTIPLIER = 10, 3
+    MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+    RSI_PERIOD = 14
+    ATR_PERIOD = 14
+
+    def __init__(self):
+        self.bars = 0
+        self.prev_close = None
+        self.sma = {period: _RollingWindow(period) for period in self.SMA_PERIODS}
+        self.atr_tr = _RollingWindow(self.ATR_PERIOD)
+        self.st_tr = _RollingWindow(self.SUPERTREND_PERIOD)
+        self.ema_fast = _Ema(self.MACD_FAST)
+        self.ema_slow = _Ema(self.MACD_SLOW)
+        self.ema_signal = _Ema(self.MACD_SIGNAL)
+        self.rsi_gain = _Ema(self.RSI_PERIOD, alpha=1.0 / self.RSI_PERIOD)
+        self.rsi_loss = _Ema(self.RSI_PERIOD, alpha=1.0 / self.RSI_PERIOD)
+        self.st_value = None
+        self.st_direction = 0
+        self.latest = None
+
+    @classmethod
+    def from_quotes(cls, quotes: List[Quote]) -> 'IndicatorState':
+        """Build a state warmed up with the given history"""
+        state = cls()
+        for quote in quotes:
+            state.update(quote)
+        return state
+
+    def update(self, quote: Quote) -> Dict[str, Any]:
+        """Consume one completed bar and return the latest indicator values"""
+        close = float(quote.close)
+        high = float(quote.high)
+        low = float(quote.low)
+
+        for window in self.sma.values():
+            window.push(close)
+
+        change = None
+        if self.prev_close is not None:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            self.atr_tr.push(tr)
+            self.st_tr.push(tr)
+            change = close - self.prev_close
+
+        # MACD
+        fast = self.ema_fast.push(close)
+        slow = self.ema_slow.push(close)
+        macd_line = fast - slow if fast is not None and slow is not None else None
+        signal = self.ema_signal.push(macd_line) if macd_line is not None else None
+        histogram = macd_line - signal if signal is not None else None
+
+        # RSI
+        rsi = None
+        if change is not None:
+            avg_gain = self.rsi_gain.push(max(change, 0.0))
+            avg_loss = self.rsi_loss.push(max(-change, 0.0))
+            if avg_loss is not None:
+                rsi = 100.0 if avg_loss == 0.0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        # SuperTrend
+        if self.bars == self.SUPERTREND_PERIOD:
+            self.st_value, self.st_direction = close, 1
+        elif self.bars > self.SUPERTREND_PERIOD:
+            mid = (high + low) / 2.0
+            band = self.SUPERTREND_MULTIPLIER * self.st_tr.mean()
+            if self.st_direction == 1:
+                if close < self.st_value:
+                    self.st_value, self.st_direction = mid + band, -1
+                else:
+                    self.st_value = max(mid - band, self.st_value)
+            else:
+                if close > self.st_value:
+                    self.st_value, self.st_direction = mid - band, 1
+                else:
+                    self.st_value = min(mid + band, self.st_value)
+
+        bb_window = self.sma[self.BB_PERIOD]
+        bb_mid = bb_window.mean()
+        bb_std = bb_window.std()
+
+        self.bars += 1
+        self.prev_close = close
+        self.latest = {
+            'sma_20': self.sma[20].mean(),
+            'sma_50': self.sma[50].mean(),
+            'sma_200': self.sma[200].mean(),
+            'bb': {
+                'sma': bb_mid,
+                'upper_band': bb_mid + self.BB_STD_DEV * bb_std if bb_mid is not None else None,
+                'lower_band': bb_mid - self.BB_STD_DEV * bb_std if bb_mid is not None else None
+            },
+            'supertrend': {'supertrend': self.st_value, 'direction': self.st_direction},
+            'macd': {'macd': macd_line, 'signal': signal, 'histogram': histogram},
+            'rsi': rsi,
+            'atr': self.atr_tr.mean()
+        }
+        return self.latest
+
+    def preview(self, quote: Quote) -> Dict[str, Any]:
+        """Indicator values if quote closed the next bar, without consuming it
+
+        Used for live ticks of a bar that is still forming.
+        """
+        return IndicatorState.restore(self.snapshot()).update(quote)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of the state"""
+        return {
+            'version': SNAPSHOT_VERSION,
+            'bars': self.bars,
+            'prev_close': self.prev_close,
+            'sma': {str(period): window.snapshot() for period, window in self.sma.items()},
+            'atr_tr': self.atr_tr.snapshot(),
+            'st_tr': self.st_tr.snapshot(),
+            'ema_fast': self.ema_fast.snapshot(),
+            'ema_slow': self.ema_slow.snapshot(),
+            'ema_signal': self.ema_signal.snapshot(),
+            'rsi_gain': self.rsi_gain.snapshot(),
+            'rsi_loss': self.rsi_loss.snapshot(),
+            'st_value': self.st_value,
+            'st_direction': self.st_direction,
+            'latest': self.latest
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'IndicatorState':
+        """Rebuild a state from snapshot()"""
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported indicator state snapshot version: {data.get('version')}")
+
+        state = cls()
+        state.bars = data['bars']
+        state.prev_close = data['prev_close']
+        state.sma = {int(period): _RollingWindow.restore(window) for period, window in data['sma'].items()}
+        state.atr_tr = _RollingWindow.restore(data['atr_tr'])
+        state.st_tr = _RollingWindow.restore(data['st_tr'])
+        state.ema_fast = _Ema.restore(data['ema_fast'])
+        state.ema_slow = _Ema.restore(data['ema_slow'])
+        state.ema_signal = _Ema.restore(data['ema_signal'])
+        state.rsi_gain = _Ema.restore(data['rsi_gain'])
+        state.rsi_loss = _Ema.restore(data['rsi_loss'])
+        state.st_value = data['st_value']
+        state.st_direction = data['st_direction']
+        state.latest = data['latest']
+        return state
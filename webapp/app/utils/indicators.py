@@ -1,6 +1,13 @@
 from decimal import Decimal
 from typing import List, Dict, Any
 from ..models.quote import Quote
+from ..models.bar_series import BarSeries
+from .indicator_graph import compute_indicators
+
+# Indicator calculation modes: float64 NumPy engine, or the original Decimal
+# loops kept as the reference implementation
+MODE_VECTORIZED = 'vectorized'
+MODE_DECIMAL = 'decimal'
 
 def calculate_sma(quotes: List[Quote], period: int) -> List[Decimal]:
     """Calculate Simple Moving Average"""
@@ -73,14 +80,14 @@ def calculate_supertrend(quotes: List[Quote], period: int, multiplier: int) -> D
                 
                 if direction[i-1] == 1:
                     if close < supertrend[i-1]:
-                        supertrend.append(basic_lower)
+                        supertrend.append(basic_upper)
                         direction.append(-1)
                     else:
                         supertrend.append(max(basic_lower, supertrend[i-1]))
                         direction.append(1)
                 else:
                     if close > supertrend[i-1]:
-                        supertrend.append(basic_upper)
+                        supertrend.append(basic_lower)
                         direction.append(1)
                     else:
                         supertrend.append(min(basic_upper, supertrend[i-1]))
@@ -103,8 +110,9 @@ def calculate_macd(quotes: List[Quote], fast_period: int, slow_period: int, sign
         else:
             macd_line.append(fast_ema[i] - slow_ema[i])
     
-    signal_line = calculate_ema([Quote(quotes[i].date, Decimal('0'), Decimal('0'), Decimal('0'), macd_line[i], Decimal('0')) 
-                               for i in range(len(quotes)) if macd_line[i] is not None], signal_period)
+    signal_values = calculate_ema_values([value for value in macd_line if value is not None], signal_period)
+    # Re-align the signal line with the full series
+    signal_line = [None] * (len(quotes) - len(signal_values)) + signal_values
     
     histogram = []
     for i in range(len(quotes)):
@@ -182,27 +190,44 @@ def calculate_atr(quotes: List[Quote], period: int) -> List[Decimal]:
 
 def calculate_ema(quotes: List[Quote], period: int) -> List[Decimal]:
     """Calculate Exponential Moving Average"""
-    if len(quotes) < period:
-        return [None] * len(quotes)
+    return calculate_ema_values([quote.close for quote in quotes], period)
+
+def calculate_ema_values(values: List[Decimal], period: int) -> List[Decimal]:
+    """Calculate Exponential Moving Average of a plain value list"""
+    if len(values) < period:
+        return [None] * len(values)
     
     multiplier = Decimal('2') / Decimal(period + 1)
-    ema_values = []
+    ema_values = [None] * (period - 1)
     
     # Calculate first EMA using SMA
-    sma = sum(quote.close for quote in quotes[:period]) / Decimal(period)
+    sma = sum(values[:period]) / Decimal(period)
     ema_values.append(sma)
     
-    for i in range(1, len(quotes)):
-        if i < period:
-            ema_values.append(None)
-        else:
-            ema = (quotes[i].close - ema_values[-1]) * multiplier + ema_values[-1]
-            ema_values.append(ema)
+    for value in values[period:]:
+        ema = (value - ema_values[-1]) * multiplier + ema_values[-1]
+        ema_values.append(ema)
     
     return ema_values
 
-def calculate_indicators(quotes: List[Quote]) -> Dict[str, Any]:
-    """Calculate all technical indicators"""
+def calculate_series_indicators(series: BarSeries) -> Dict[str, Any]:
+    """Calculate all technical indicators for a BarSeries with the vectorized engine"""
+    return compute_indicators(
+        series.open, series.high, series.low, series.close, series.volume
+    )
+
+def calculate_indicators(quotes: List[Quote], mode: str = MODE_VECTORIZED) -> Dict[str, Any]:
+    """Calculate all technical indicators
+
+    The vectorized mode returns float64 arrays with NaN where a value is not
+    yet defined; the decimal mode is the reference implementation and returns
+    lists of Decimal with None in the same positions.
+    """
+    if mode == MODE_VECTORIZED:
+        return calculate_series_indicators(BarSeries.from_quotes(quotes))
+    if mode != MODE_DECIMAL:
+        raise ValueError(f"Unknown indicator mode: {mode}")
+
     return {
         'sma_20': calculate_sma(quotes, 20),
         'sma_50': calculate_sma(quotes, 50),
@@ -0,0 +1,219 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from ..config import METRICS_ENABLED, METRICS_LATENCY_BUCKETS, METRICS_PAYLOAD_BUCKETS
+
+# Spans of the request being traced, or None when tracing is off for it
+_trace = ContextVar('metrics_trace', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total')
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+class StageMetrics:
+    __slots__ = ('latency', 'payload', 'errors')
+
+    def __init__(self):
+        self.latency = Histogram(METRICS_LATENCY_BUCKETS)
+        self.payload = Histogram(METRICS_PAYLOAD_BUCKETS)
+        self.errors = 0
+
+
+class MetricsRegistry:
+    """Latency, error and payload-size metrics per named stage
+
+    Stages are recorded by the instrument() decorator and the stage()
+    context manager. When disabled, both reduce to a flag check unless
+    the current request is being traced.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, name: str) -> StageMetrics:
+        stage = self._stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self._stages.setdefault(name, StageMetrics())
+        return stage
+
+    def observe(self, name: str, seconds: float, error: bool = False, payload_bytes: Optional[int] = None):
+        trace = _trace.get()
+        if trace is not None:
+            trace.append({'stage': name, 'ms': round(seconds * 1000, 3), 'error': error,
+                          'bytes': payload_bytes})
+        if not self.enabled:
+            return
+        stage = self._stage(name)
+        with self._lock:
+            stage.latency.observe(seconds)
+            if error:
+                stage.errors += 1
+            if payload_bytes is not None:
+                stage.payload.observe(payload_bytes)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-stage count, error count, mean latency and payload totals"""
+        with self._lock:
+            return {
+                name: {
+                    'count': stage.latency.count,
+                    'errors': stage.errors,
+                    'avg_ms': round(stage.latency.total / stage.latency.count * 1000, 3) if stage.latency.count else 0.0,
+                    'payload_bytes': stage.payload.total
+                }
+                for name, stage in self._stages.items()
+            }
+
+    def render_prometheus(self) -> str:
+        """Text exposition format 0.0.4"""
+        lines = [
+            '# HELP webapp_stage_duration_seconds Latency of instrumented service stages',
+            '# TYPE webapp_stage_duration_seconds histogram'
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for name, stage in stages:
+                lines.extend(_histogram_lines('webapp_stage_duration_seconds', name, stage.latency))
+            lines.extend([
+                '# HELP webapp_stage_errors_total Instrumented stages that raised or returned an error',
+                '# TYPE webapp_stage_errors_total counter'
+            ])
+            lines.extend(f'webapp_stage_errors_total{{stage="{_escape(name)}"}} {stage.errors}' for name, stage in stages)
+            lines.extend([
+                '# HELP webapp_stage_payload_bytes Payload size handled by instrumented stages',
+                '# TYPE webapp_stage_payload_bytes histogram'
+            ])
+            for name, stage in stages:
+                if stage.payload.count:
+                    lines.extend(_histogram_lines('webapp_stage_payload_bytes', name, stage.payload))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(metric: str, name: str, histogram: Histogram) -> List[str]:
+    label = f'stage="{_escape(name)}"'
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+    lines.append(f'{metric}_sum{{{label}}} {histogram.total:.6f}')
+    lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+    return lines
+
+
+registry = MetricsRegistry(METRICS_ENABLED)
+
+
+def instrument(name: str, payload: Optional[Callable] = None):
+    """Decorator recording a function's latency, errors and optionally the size of its result
+
+    payload receives the return value and returns its size in bytes. A
+    return value shaped like ({"error": ...}, status) counts as an error.
+    Coroutine functions are timed until they complete, not until they
+    return a coroutine.
+    """
+    def record(started, result):
+        size = None
+        if payload is not None and result is not None:
+            try:
+                size = payload(result)
+            except Exception:
+                size = None
+        registry.observe(name, time.perf_counter() - started, error=_is_error_result(result), payload_bytes=size)
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not registry.enabled and _trace.get() is None:
+                    return await fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception:
+                    registry.observe(name, time.perf_counter() - started, error=True)
+                    raise
+                record(started, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled and _trace.get() is None:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                registry.observe(name, time.perf_counter() - started, error=True)
+                raise
+            record(started, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _is_error_result(result) -> bool:
+    return (isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], dict)
+            and 'error' in result[0])
+
+
+@contextmanager
+def stage(name: str):
+    """Context manager recording the latency and errors of a block"""
+    if not registry.enabled and _trace.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        registry.observe(name, time.perf_counter() - started, error=True)
+        raise
+    registry.observe(name, time.perf_counter() - started)
+
+
+def tracing() -> bool:
+    return _trace.get() is not None
+
+
+def start_trace():
+    """Collect spans for the current context (request) until end_trace is called"""
+    return _trace.set([])
+
+
+def end_trace(token) -> List[Dict]:
+    spans = _trace.get() or []
+    _trace.reset(token)
+    return spans
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class QuoteCache:
+    """Short-TTL cache of market data snapshots keyed by conid and field set
+
+    Concurrent requests for the same conid share one upstream call: the
+    first caller fetches, later callers wait on its result. Snapshots that
+    are missing some of the requested fields (the gateway returns these
+    until a subscription is warm) are kept for inspection but never
+    counted as fresh.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def is_complete(data: Dict, fields: str) -> bool:
+        return all(data.get(field) not in (None, '') for field in fields.split(','))
+
+    def _entry(self, data: Dict, fetched_at: float, cached: bool, fields: str) -> Dict:
+        return {
+            'data': data,
+            'fetched_at': fetched_at,
+            'age': time.time() - fetched_at,
+            'cached': cached,
+            'complete': self.is_complete(data, fields)
+        }
+
+    def _claim(self, conids: Iterable, fields: str, max_age: Optional[float], force: bool):
+        """Split conids into fresh cache hits, in-flight fetches to wait on and conids to fetch"""
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+        results = {}
+        waiting = {}
+        to_fetch = []
+
+        with self._lock:
+            for conid in dict.fromkeys(str(c) for c in conids):
+                key = (conid, fields)
+                entry = self._entries.get(key)
+                if (not force and entry is not None and now - entry[1] <= max_age
+                        and self.is_complete(entry[0], fields)):
+                    self.hits += 1
+                    results[conid] = self._entry(entry[0], entry[1], True, fields)
+                elif key in self._inflight:
+                    self.coalesced += 1
+                    waiting[conid] = self._inflight[key]
+                else:
+                    self.misses += 1
+                    self._inflight[key] = Future()
+                    to_fetch.append(conid)
+        return results, waiting, to_fetch
+
+    def _fail(self, to_fetch: List[str], fields: str, error: Exception):
+        with self._lock:
+            for conid in to_fetch:
+                self._inflight.pop((conid, fields)).set_exception(error)
+
+    def _store(self, to_fetch: List[str], fields: str, snapshots, results: Dict[str, Dict]):
+        fetched_at = time.time()
+        by_conid = {str(item.get('conid')): item for item in snapshots or []}
+        with self._lock:
+            for conid in to_fetch:
+                data = by_conid.get(conid, {})
+                self._entries[(conid, fields)] = (data, fetched_at)
+                self._inflight.pop((conid, fields)).set_result((data, fetched_at))
+                results[conid] = self._entry(data, fetched_at, False, fields)
+
+    def get_many(self, conids: Iterable, fields: str, fetch: Callable[[List], List[Dict]],
+                 max_age: Optional[float] = None, force: bool = False) -> Dict[str, Dict]:
+        """Return a freshness-annotated snapshot per conid, fetching only what is stale
+
+        fetch receives the list of conids to request and returns the gateway's
+        snapshot list, whose items carry a 'conid' key.
+        """
+        results, waiting, to_fetch = self._claim(conids, fields, max_age, force)
+
+        if to_fetch:
+            try:
+                snapshots = fetch(to_fetch)
+            except Exception as e:
+                self._fail(to_fetch, fields, e)
+                raise
+            self._store(to_fetch, fields, snapshots, results)
+
+        for conid, future in waiting.items():
+            data, fetched_at = future.result()
+            results[conid] = self._entry(data, fetched_at, False, fields)
+
+        return results
+
+    async def get_many_async(self, conids: Iterable, fields: str, fetch: Callable[[List], Awaitable[List[Dict]]],
+                             max_age: Optional[float] = None, force: bool = False) -> Dict[str, Dict]:
+        """get_many for coroutines: fetch is awaited, and in-flight fetches are awaited without blocking
+
+        Shares entries and in-flight fetches with get_many, so sync and async
+        callers coalesce onto the same upstream call.
+        """
+        results, waiting, to_fetch = self._claim(conids, fields, max_age, force)
+
+        if to_fetch:
+            try:
+                snapshots = await fetch(to_fetch)
+            except BaseException as e:
+                # Cancellation too: waiters on these conids must not hang
+                self._fail(to_fetch, fields, e if isinstance(e, Exception) else RuntimeError("Snapshot fetch cancelled"))
+                raise
+            self._store(to_fetch, fields, snapshots, results)
+
+        for conid, future in waiting.items():
+            data, fetched_at = await asyncio.wrap_future(future)
+            results[conid] = self._entry(data, fetched_at, False, fields)
+
+        return results
+
+    def peek(self, conid, fields: str) -> Optional[Dict]:
+        """Return the cached snapshot regardless of age, without fetching"""
+        with self._lock:
+            entry = self._entries.get((str(conid), fields))
+        return self._entry(entry[0], entry[1], True, fields) if entry else None
+
+    def invalidate(self, conid=None):
+        with self._lock:
+            if conid is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == str(conid)]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'entries': len(self._entries)
+            }
@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+
+class QuoteTable:
+    """Latest streamed quote per conid in one float64 array
+
+    Rows are conids, columns are the named numeric fields; a field not yet
+    seen is NaN. Ticks only carry the fields that changed, so update()
+    writes just those cells and stamps the row. Lookups are a dict probe
+    and a few array reads under a lock, a few microseconds, which is what
+    lets order pricing skip the snapshot round trip.
+
+    on_miss, when set, is called with [conid] whenever a conid without a
+    row is looked up (the stream uses it to subscribe).
+    """
+
+    def __init__(self, columns: Iterable[str], capacity: int = 64):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._values = np.full((capacity, len(self.columns)), np.nan)
+        self._updated_at = np.full(capacity, np.nan)
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.on_miss: Optional[Callable[[List[str]], None]] = None
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, conid) -> bool:
+        return str(conid) in self._rows
+
+    def _row(self, conid: str) -> int:
+        row = self._rows.get(conid)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._values):
+                # Double the capacity; rows keep their index
+                self._values = np.concatenate((self._values, np.full(self._values.shape, np.nan)))
+                self._updated_at = np.concatenate((self._updated_at, np.full(self._updated_at.shape, np.nan)))
+            self._rows[conid] = row
+        return row
+
+    def update(self, conid, values: Dict[str, float], timestamp: Optional[float] = None):
+        """Write the given fields of one conid; names that are not columns are ignored"""
+        cells = [(self._column_index[name], value) for name, value in values.items()
+                 if name in self._column_index and value is not None]
+        with self._lock:
+            row = self._row(str(conid))
+            for column, value in cells:
+                self._values[row, column] = value
+            self._updated_at[row] = time.time() if timestamp is None else timestamp
+            self.updates += 1
+
+    def remove(self, conid):
+        """Drop a conid's row, so its next lookup is a miss again; the last row moves into the gap"""
+        with self._lock:
+            row = self._rows.pop(str(conid), None)
+            if row is None:
+                return
+            last = len(self._rows)
+            if row != last:
+                moved = next(key for key, index in self._rows.items() if index == last)
+                self._rows[moved] = row
+                self._values[row] = self._values[last]
+                self._updated_at[row] = self._updated_at[last]
+            self._values[last] = np.nan
+            self._updated_at[last] = np.nan
+
+    def _missing(self, conid: str):
+        if self.on_miss is not None:
+            self.on_miss([conid])
+        return None
+
+    def last(self, conid, column: str = 'last_price', max_age: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """(value, age) of one field, or None when absent or older than max_age seconds"""
+        conid = str(conid)
+        index = self._column_index[column]
+        with self._lock:
+            row = self._rows.get(conid)
+            if row is not None:
+                value = self._values[row, index].item()
+                updated_at = self._updated_at[row].item()
+        if row is None:
+            return self._missing(conid)
+        age = time.time() - updated_at
+        if value != value or (max_age is not None and age > max_age):
+            return None
+        return value, age
+
+    def get(self, conid, max_age: Optional[float] = None) -> Optional[Dict[str, Optional[float]]]:
+        """All fields of one conid plus updated_at and age, or None when absent or stale"""
+        conid = str(conid)
+        with self._lock:
+            row = self._rows.get(conid)
+            if row is not None:
+                values = self._values[row].tolist()
+                updated_at = self._updated_at[row].item()
+        if row is None:
+            return self._missing(conid)
+        age = time.time() - updated_at
+        if max_age is not None and age > max_age:
+            return None
+        quote = {name: (None if value != value else value) for name, value in zip(self.columns, values)}
+        quote['updated_at'] = updated_at
+        quote['age'] = age
+        return quote
+
+    def arrays(self) -> Dict[str, object]:
+        """Copy of the whole table: conids, a (conids, columns) value array and update times"""
+        with self._lock:
+            count = len(self._rows)
+            return {
+                'conids': list(self._rows),
+                'columns': self.columns,
+                'values': self._values[:count].copy(),
+                'updated_at': self._updated_at[:count].copy()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._values[:] = np.nan
+            self._updated_at[:] = np.nan
@@ -0,0 +1,211 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render queue is at capacity and the caller will not wait"""
+
+
+class RenderTimeout(Exception):
+    """Raised when a render job exceeds its timeout"""
+
+
+def _warm_up(pio):
+    """Render a trivial figure so Kaleido's browser is started before the first job"""
+    import plotly.graph_objects as go
+    pio.to_image(go.Figure(go.Scatter(x=[0, 1], y=[0, 1])), format='png', width=16, height=16)
+
+
+def _render_worker(conn):
+    """Renderer process: keep Kaleido warm and render figure JSON on request"""
+    import plotly.io as pio
+    try:
+        _warm_up(pio)
+    except Exception as e:
+        logger.error(f"Render worker warm-up failed: {str(e)}")
+    conn.send((True, None))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        fig_json, image_format, width, height = job
+        try:
+            image = pio.to_image(pio.from_json(fig_json), format=image_format, width=width, height=height)
+            conn.send((True, image))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {str(e)}"))
+
+
+class _RenderJob:
+    __slots__ = ('fig_json', 'image_format', 'width', 'height', 'timeout', 'future')
+
+    def __init__(self, fig_json, image_format, width, height, timeout, future):
+        self.fig_json = fig_json
+        self.image_format = image_format
+        self.width = width
+        self.height = height
+        self.timeout = timeout
+        self.future = future
+
+
+class _RendererSlot:
+    """One dispatcher thread driving one warm renderer process"""
+
+    def __init__(self, pool: 'RenderPool', index: int):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"chart-render-{index}", daemon=True)
+
+    def start(self):
+        self._spawn()
+        self.thread.start()
+
+    def _spawn(self):
+        parent_conn, child_conn = self.pool.context.Pipe()
+        self.process = self.pool.context.Process(
+            target=_render_worker, args=(child_conn,), name=f"chart-renderer-{self.index}", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def _wait_ready(self, timeout: float) -> bool:
+        """Consume the worker's warm-up message"""
+        if self.conn.poll(timeout):
+            self.conn.recv()
+            return True
+        return False
+
+    def _kill(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+
+    def _run(self):
+        if not self._wait_ready(self.pool.job_timeout):
+            logger.error(f"Chart renderer {self.index} did not warm up in {self.pool.job_timeout}s")
+        self.ready.set()
+
+        while True:
+            job = self.pool.jobs.get()
+            if job is None:
+                break
+            try:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._execute(job)
+            finally:
+                self.pool.jobs.task_done()
+
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def _execute(self, job: _RenderJob):
+        try:
+            self.conn.send((job.fig_json, job.image_format, job.width, job.height))
+            if not self.conn.poll(job.timeout):
+                raise RenderTimeout(f"Render exceeded {job.timeout}s")
+            ok, payload = self.conn.recv()
+        except Exception as e:
+            # A hung or dead renderer is replaced so the slot keeps serving
+            logger.error(f"Chart renderer {self.index} failed: {str(e)}")
+            self._kill()
+            self._spawn()
+            self._wait_ready(self.pool.job_timeout)
+            job.future.set_exception(e)
+            return
+
+        if ok:
+            job.future.set_result(payload)
+        else:
+            job.future.set_exception(RuntimeError(payload))
+
+
+class RenderPool:
+    """Fixed pool of warm Kaleido renderer processes fed from a bounded queue"""
+
+    def __init__(self, size: int, max_queue: int, job_timeout: float):
+        self.size = size
+        self.job_timeout = job_timeout
+        self.context = multiprocessing.get_context('spawn')
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.slots = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self, wait: bool = False):
+        """Start the renderer processes; safe to call more than once
+
+        With wait=True, block until every renderer has finished warming up.
+        """
+        with self._lock:
+            if not self._started:
+                self.slots = [_RendererSlot(self, i) for i in range(self.size)]
+                for slot in self.slots:
+                    slot.start()
+                self._started = True
+                logger.info(f"Started chart render pool with {self.size} workers")
+            slots = list(self.slots)
+        if wait:
+            for slot in slots:
+                slot.ready.wait()
+
+    def submit(self, fig, image_format='jpeg', width=1920, height=2048,
+               block=True, queue_timeout: Optional[float] = None, timeout: Optional[float] = None) -> Future:
+        """Queue a figure for rendering and return a Future of the image bytes
+
+        When the queue is full the call waits up to queue_timeout seconds (or
+        fails immediately if block is False) and raises RenderQueueFull.
+        """
+        self.start()
+        future = Future()
+        job = _RenderJob(
+            fig.to_json(), image_format, width, height,
+            timeout if timeout is not None else self.job_timeout, future
+        )
+        try:
+            self.jobs.put(job, block=block, timeout=queue_timeout)
+        except queue.Full:
+            raise RenderQueueFull(f"Render queue is full ({self.jobs.maxsize} jobs pending)")
+        return future
+
+    def render(self, fig, image_format='jpeg', width=1920, height=2048, timeout: Optional[float] = None) -> bytes:
+        """Render a figure through the pool and wait for the result"""
+        return self.submit(fig, image_format, width, height, timeout=timeout).result()
+
+    def pending(self) -> int:
+        return self.jobs.qsize()
+
+    def shutdown(self):
+        """Stop all renderer processes after the queued jobs finish"""
+        with self._lock:
+            if not self._started:
+                return
+            for _ in self.slots:
+                self.jobs.put(None)
+            for slot in self.slots:
+                slot.thread.join()
+            self.slots = []
+            self._started = False
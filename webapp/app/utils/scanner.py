@@ -0,0 +1,333 @@
+import ast
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+from ..models.bar_series import BarSeries, FIELDS
+from .indicator_graph import IndicatorGraph
+
+# Names an expression can use, mapped to indicator graph nodes
+INDICATOR_FIELDS = {
+    'sma_20': 'sma(close,20)',
+    'sma_50': 'sma(close,50)',
+    'sma_200': 'sma(close,200)',
+    'bb_middle': 'sma(close,20)',
+    'bb_upper': 'bb_upper(close,20,2)',
+    'bb_lower': 'bb_lower(close,20,2)',
+    'supertrend': 'st_value(10,3)',
+    'st_direction': 'st_direction(10,3)',
+    'macd': 'macd(12,26)',
+    'macd_signal': 'macd_signal(12,26,9)',
+    'macd_hist': 'macd_hist(12,26,9)',
+    'rsi': 'rsi(close,14)',
+    'atr': 'atr(14)',
+    'obv': 'obv',
+}
+
+
+class ScanExpressionError(ValueError):
+    pass
+
+
+class Panel:
+    """Latest bars of many symbols as (symbols, bars) arrays, plus their indicators
+
+    Every row holds the same number of bars, aligned by position from the
+    most recent bar back; symbols with fewer bars are left out and listed
+    in skipped.
+    """
+
+    def __init__(self, symbols: List[str], columns: Dict[str, np.ndarray], last_dates: np.ndarray,
+                 skipped: Optional[List[str]] = None):
+        self.symbols = symbols
+        self.columns = columns
+        self.last_dates = last_dates
+        self.skipped = skipped or []
+        self._fields = None
+
+    @classmethod
+    def from_series(cls, series_by_symbol: Dict[str, BarSeries], bars: int) -> 'Panel':
+        symbols = [symbol for symbol, series in series_by_symbol.items() if len(series) >= bars]
+        skipped = [symbol for symbol, series in series_by_symbol.items() if len(series) < bars]
+        columns = {field: np.empty((len(symbols), bars)) for field in FIELDS}
+        last_dates = np.empty(len(symbols), dtype='datetime64[ns]')
+        for row, symbol in enumerate(symbols):
+            series = series_by_symbol[symbol]
+            for field in FIELDS:
+                columns[field][row] = getattr(series, field)[-bars:]
+            last_dates[row] = series.dates[-1]
+        return cls(symbols, columns, last_dates, skipped)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def fields(self) -> 'ExpressionFields':
+        """OHLCV and indicator arrays by expression name, each computed once for all symbols on first use"""
+        if self._fields is None:
+            self._fields = ExpressionFields(IndicatorGraph(self.columns))
+        return self._fields
+
+
+class ExpressionFields(Mapping):
+    """Expression names backed by an IndicatorGraph, so an expression only computes the indicators it reads
+
+    aliases adds names for other graph nodes, e.g. {'st_dir': 'st_direction(7,2)'}.
+    """
+
+    def __init__(self, graph: IndicatorGraph, aliases: Optional[Dict[str, str]] = None):
+        self.graph = graph
+        self.aliases = dict(INDICATOR_FIELDS, **(aliases or {}))
+
+    def with_aliases(self, aliases: Dict[str, str]) -> 'ExpressionFields':
+        """Same graph (and already computed nodes) under extra names"""
+        return ExpressionFields(self.graph, dict(self.aliases, **aliases))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name in FIELDS:
+            return self.graph[name]
+        return np.asarray(self.graph[self.aliases[name]], dtype=np.float64)
+
+    def __iter__(self):
+        return iter(FIELDS + tuple(self.aliases))
+
+    def __len__(self) -> int:
+        return len(FIELDS) + len(self.aliases)
+
+
+def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if periods < values.shape[-1]:
+        out[..., periods:] = values[..., :values.shape[-1] - periods]
+    return out
+
+
+def as_mask(values) -> np.ndarray:
+    """Truth value of an expression result; NaN, an indicator still warming up, is false"""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return np.nan_to_num(values, nan=0.0).astype(bool)
+
+
+def _prev(values, periods=1):
+    return _shift(values, int(periods))
+
+
+def _crosses_above(a, b):
+    a, b = np.broadcast_arrays(a, b)
+    return (a > b) & (_shift(a) <= _shift(b))
+
+
+def _crosses_below(a, b):
+    a, b = np.broadcast_arrays(a, b)
+    return (a < b) & (_shift(a) >= _shift(b))
+
+
+def _change(values, periods=1):
+    return values - _shift(values, int(periods))
+
+
+def _pct_change(values, periods=1):
+    previous = _shift(values, int(periods))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values - previous) / previous * 100.0
+
+
+def _highest(values, periods):
+    periods = int(periods)
+    windows = np.lib.stride_tricks.sliding_window_view(values, periods, axis=-1)
+    out = np.full(values.shape, np.nan)
+    out[..., periods - 1:] = windows.max(axis=-1)
+    return out
+
+
+def _lowest(values, periods):
+    periods = int(periods)
+    windows = np.lib.stride_tricks.sliding_window_view(values, periods, axis=-1)
+    out = np.full(values.shape, np.nan)
+    out[..., periods - 1:] = windows.min(axis=-1)
+    return out
+
+
+FUNCTIONS = {
+    'prev': _prev,
+    'crosses_above': _crosses_above,
+    'crosses_below': _crosses_below,
+    'change': _change,
+    'pct_change': _pct_change,
+    'highest': _highest,
+    'lowest': _lowest,
+    'abs': np.abs,
+    'min': np.minimum,
+    'max': np.maximum,
+}
+
+# (min, max) argument count of each function
+_ARITY = {
+    'prev': (1, 2),
+    'crosses_above': (2, 2),
+    'crosses_below': (2, 2),
+    'change': (1, 2),
+    'pct_change': (1, 2),
+    'highest': (2, 2),
+    'lowest': (2, 2),
+    'abs': (1, 1),
+    'min': (2, 2),
+    'max': (2, 2),
+}
+
+# Functions whose second argument is a look-back in bars
+_PERIOD_FUNCTIONS = ('prev', 'change', 'pct_change', 'highest', 'lowest')
+
+_BINARY_OPS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+}
+_COMPARE_OPS = {
+    ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+    ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+
+
+def compile_expression(expression: str) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    """Compile a scan expression into a function of the panel fields
+
+    The language is a safe subset of Python expressions: field names
+    (close, volume, rsi, bb_upper, st_direction, ...), numbers, + - * /,
+    comparisons, and/or/not, and the functions in FUNCTIONS, e.g.
+    "rsi < 30 and crosses_above(st_direction, 0)". Every term is a
+    (symbols, bars) array, so prev() and crosses_above() can look back.
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ScanExpressionError(f"Invalid scan expression {expression!r}: {e.msg}")
+
+    def build(node):
+        if isinstance(node, ast.Expression):
+            return build(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda fields: value
+        if isinstance(node, ast.Name):
+            name = node.id
+            return lambda fields: _field(fields, name)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = build(node.operand)
+            return lambda fields: np.negative(operand(fields))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = build(node.operand)
+            return lambda fields: np.logical_not(as_mask(operand(fields)))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            op, left, right = _BINARY_OPS[type(node.op)], build(node.left), build(node.right)
+            return lambda fields: op(left(fields), right(fields))
+        if isinstance(node, ast.BoolOp):
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            parts = [build(value) for value in node.values]
+
+            def evaluate(fields):
+                result = as_mask(parts[0](fields))
+                for part in parts[1:]:
+                    result = op(result, as_mask(part(fields)))
+                return result
+            return evaluate
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPS for op in node.ops):
+            terms = [build(node.left)] + [build(comparator) for comparator in node.comparators]
+            ops = [_COMPARE_OPS[type(op)] for op in node.ops]
+
+            def evaluate(fields):
+                values = [term(fields) for term in terms]
+                result = ops[0](values[0], values[1])
+                for index in range(1, len(ops)):
+                    result = np.logical_and(result, ops[index](values[index], values[index + 1]))
+                return result
+            return evaluate
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+                and not node.keywords):
+            name = node.func.id
+            fn = FUNCTIONS[name]
+            low, high = _ARITY[name]
+            if not low <= len(node.args) <= high:
+                expected = low if low == high else f"{low} or {high}"
+                raise ScanExpressionError(f"{name}() takes {expected} argument{'s' if high > 1 else ''}, got {len(node.args)} "
+                                          f"in scan expression {expression!r}")
+            args = [build(arg) for arg in node.args]
+            if name in _PERIOD_FUNCTIONS and len(node.args) == 2:
+                return _period_call(name, fn, args[0], _period(node.args[1], name, expression))
+            return lambda fields: fn(*(arg(fields) for arg in args))
+        raise ScanExpressionError(f"Unsupported syntax in scan expression {expression!r}: {ast.dump(node)[:60]}")
+
+    return build(tree)
+
+
+def _period(node, name: str, expression: str) -> int:
+    """A look-back argument, which must be a whole number of bars of at least 1"""
+    value = node.value if isinstance(node, ast.Constant) else None
+    if (isinstance(value, bool) or not isinstance(value, (int, float))
+            or value != int(value) or value < 1):
+        raise ScanExpressionError(f"{name}() needs a whole number of bars >= 1 as its period "
+                                  f"in scan expression {expression!r}")
+    return int(value)
+
+
+def _period_call(name: str, fn: Callable, values: Callable, periods: int):
+    def evaluate(fields):
+        series = values(fields)
+        bars = np.shape(series)[-1] if np.ndim(series) else 0
+        if periods > bars:
+            raise ScanExpressionError(f"{name}() period {periods} exceeds the {bars} bars available")
+        return fn(series, periods)
+    return evaluate
+
+
+def _field(fields: Dict[str, np.ndarray], name: str) -> np.ndarray:
+    try:
+        return fields[name]
+    except KeyError:
+        raise ScanExpressionError(f"Unknown field {name!r}; available: {', '.join(sorted(fields))}")
+
+
+def _latest(values, count: int) -> np.ndarray:
+    """Last-bar value per symbol of an expression result"""
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return np.full(count, values)
+    return values[..., -1]
+
+
+def scan(panel: Panel, filter_expression: Optional[str] = None, rank_expression: Optional[str] = None,
+         ascending: bool = False, limit: Optional[int] = 50, columns: Sequence[str] = ('close', 'rsi')) -> List[Dict[str, Any]]:
+    """Return symbols whose latest bar passes the filter, ordered by the rank expression
+
+    Expressions are evaluated over the whole panel at once. A NaN filter
+    result fails the filter, and symbols whose rank is NaN sort last;
+    columns are reported from the latest bar.
+    """
+    fields = panel.fields
+    count = len(panel)
+    mask = np.ones(count, dtype=bool)
+    if filter_expression:
+        mask = as_mask(_latest(compile_expression(filter_expression)(fields), count))
+    hits = np.flatnonzero(mask)
+
+    rank = None
+    if rank_expression:
+        rank = _latest(compile_expression(rank_expression)(fields), count).astype(np.float64)
+        keys = rank[hits] if ascending else -rank[hits]
+        hits = hits[np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')]
+    if limit is not None:
+        hits = hits[:limit]
+
+    reported = {name: _latest(compile_expression(name)(fields), count) for name in columns}
+    results = []
+    for row in hits:
+        result = {'symbol': panel.symbols[row], 'date': str(panel.last_dates[row])}
+        if rank is not None:
+            result['rank'] = _json_float(rank[row])
+        result.update({name: _json_float(values[row]) for name, values in reported.items()})
+        results.append(result)
+    return results
+
+
+def _json_float(value):
+    value = float(value)
+    return None if np.isnan(value) else value
@@ -0,0 +1,127 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Any
+import numpy as np
+from ..models.bar_series import BarSeries
+from .indicators import calculate_series_indicators
+
+# Timeframe names follow the gateway's bar sizes: "5min", "1h", "1d", "1w", "1m" (month)
+_TIMEFRAME_PATTERN = re.compile(r'^(\d+)\s*(min|h|d|w|m)$', re.IGNORECASE)
+_INTRADAY_NS = {'min': 60 * 10**9, 'h': 3600 * 10**9, 'd': 86400 * 10**9}
+
+# 1970-01-01 was a Thursday; shifting by 3 days makes week buckets start on Monday
+_WEEK_OFFSET_DAYS = 3
+
+
+def is_timeframe(name: str) -> bool:
+    """Whether name is a bar size such as "5min", "1h", "1d", "1w" or "1m" (month)"""
+    return _TIMEFRAME_PATTERN.fullmatch(name) is not None
+
+
+def _bucket_keys(dates: np.ndarray, timeframe: str) -> np.ndarray:
+    """Integer bucket number per bar; bars sharing a number aggregate together"""
+    match = _TIMEFRAME_PATTERN.match(timeframe.strip())
+    if not match:
+        raise ValueError(f"Unrecognised timeframe: {timeframe}")
+    count, unit = int(match.group(1)), match.group(2).lower()
+
+    if unit in _INTRADAY_NS:
+        return dates.astype('datetime64[ns]').astype(np.int64) // (count * _INTRADAY_NS[unit])
+    if unit == 'w':
+        days = dates.astype('datetime64[D]').astype(np.int64) + _WEEK_OFFSET_DAYS
+        return days // (7 * count)
+    return dates.astype('datetime64[M]').astype(np.int64) // count
+
+
+def resample(series: BarSeries, timeframe: str) -> BarSeries:
+    """Aggregate bars into a coarser timeframe
+
+    Each bucket takes the first open, highest high, lowest low, last close
+    and summed volume of its bars, and is labelled with the date of its
+    first bar. Week buckets start on Monday; intraday buckets are aligned
+    to the epoch. The last bucket may be incomplete while it is forming.
+    """
+    if not len(series):
+        return series[0:0]
+
+    keys = _bucket_keys(series.dates, timeframe)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.append(starts[1:], len(keys)) - 1
+    return BarSeries(
+        series.dates[starts],
+        series.open[starts],
+        np.maximum.reduceat(series.high, starts),
+        np.minimum.reduceat(series.low, starts),
+        series.close[ends],
+        np.add.reduceat(series.volume, starts),
+        symbol=series.symbol
+    )
+
+
+class TimeframeCache:
+    """LRU cache of per-timeframe bars and indicators
+
+    Entries are keyed by symbol, timeframe and the base series' length
+    and last bar, so a new or updated bar invalidates them naturally.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(series: BarSeries, timeframe: str):
+        if not len(series):
+            return (series.symbol, timeframe, 0)
+        return (series.symbol, timeframe, len(series), int(series.dates[-1].astype(np.int64)),
+                float(series.close[-1]), float(series.high[-1]), float(series.low[-1]), float(series.volume[-1]))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+timeframe_cache = TimeframeCache()
+
+
+def calculate_timeframe_indicators(series: BarSeries, timeframes: Iterable[str],
+                                   base_timeframe: str = '1d', cache: TimeframeCache = timeframe_cache) -> Dict[str, Dict[str, Any]]:
+    """Resample one base series into every timeframe and compute indicators for each
+
+    The base timeframe uses the series as-is. Returns {timeframe:
+    {'series': BarSeries, 'indicators': dict}}; results are cached per
+    timeframe, so a repeat request for the same bars is served without
+    recomputation.
+    """
+    results = {}
+    for timeframe in dict.fromkeys(timeframes):
+        key = cache.key(series, timeframe) if cache is not None else None
+        entry = cache.get(key) if cache is not None else None
+        if entry is None:
+            bars = series if timeframe == base_timeframe else resample(series, timeframe)
+            entry = {'series': bars, 'indicators': calculate_series_indicators(bars)}
+            if cache is not None:
+                cache.put(key, entry)
+        results[timeframe] = entry
+    return results
@@ -0,0 +1,262 @@
+import math
+from typing import Dict
+import numpy as np
+
+# Longest block the EMA recurrence is evaluated over in closed form before the
+# running value is carried into the next block; keeps decay**-n well inside float64.
+_EMA_MAX_EXPONENT = 230.0
+
+
+def _as_float_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """Rolling window sum along the last axis via cumulative sums, NaN until the window is full"""
+    out = np.full(values.shape, np.nan)
+    if period <= 0 or values.shape[-1] < period:
+        return out
+    # Shift towards zero before accumulating so the cumulative sum stays small
+    offset = values[..., :1]
+    csum = np.cumsum(values - offset, axis=-1)
+    csum = np.concatenate((np.zeros(values.shape[:-1] + (1,)), csum), axis=-1)
+    out[..., period - 1:] = csum[..., period:] - csum[..., :-period] + offset * period
+    return out
+
+
+def _ema_recurrence(values: np.ndarray, alpha: float, seed) -> np.ndarray:
+    """Evaluate y[t] = alpha * x[t] + (1 - alpha) * y[t-1] along the last axis with y[-1] = seed
+
+    seed is a scalar, or an array with one value per row of a 2-D input.
+    """
+    out = np.empty(values.shape)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[...] = values
+        return out
+
+    block = max(1, int(_EMA_MAX_EXPONENT / -math.log(decay)))
+    prev = np.asarray(seed, dtype=np.float64)[..., None]
+    length = values.shape[-1]
+    for start in range(0, length, block):
+        chunk = values[..., start:start + block]
+        steps = np.arange(1, chunk.shape[-1] + 1)
+        weights = decay ** -steps
+        scaled = prev + alpha * np.cumsum(chunk * weights, axis=-1)
+        out[..., start:start + chunk.shape[-1]] = scaled / weights
+        prev = out[..., start + chunk.shape[-1] - 1:start + chunk.shape[-1]]
+    return out
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Calculate Simple Moving Average"""
+    values = _as_float_array(values)
+    return _rolling_sum(values, period) / period
+
+
+def ema(values, period: int) -> np.ndarray:
+    """Calculate Exponential Moving Average seeded with the SMA of the first period"""
+    values = _as_float_array(values)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+
+    seed = values[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = _ema_recurrence(values[..., period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def rolling_variance(values, period: int, mean=None) -> np.ndarray:
+    """Population variance over a rolling window; mean is the window SMA when already computed"""
+    values = _as_float_array(values)
+    if mean is None:
+        mean = sma(values, period)
+    # Centre on the series mean so the sum of squares does not cancel catastrophically
+    centre = values.mean(axis=-1, keepdims=True) if values.shape[-1] else 0.0
+    centred = values - centre
+    mean_sq = _rolling_sum(centred * centred, period) / period
+    centred_mean = mean - centre
+    return np.maximum(mean_sq - centred_mean * centred_mean, 0.0)
+
+
+def bollinger_bands(close, period: int, std_dev: int) -> Dict[str, np.ndarray]:
+    """Calculate Bollinger Bands with a population standard deviation"""
+    close = _as_float_array(close)
+    middle = sma(close, period)
+    std = np.sqrt(rolling_variance(close, period, middle))
+    return {
+        'sma': middle,
+        'upper_band': middle + std_dev * std,
+        'lower_band': middle - std_dev * std
+    }
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """Calculate True Range, NaN for the first bar which has no previous close"""
+    high = _as_float_array(high)
+    low = _as_float_array(low)
+    close = _as_float_array(close)
+
+    tr = np.full(close.shape, np.nan)
+    if close.shape[-1] < 2:
+        return tr
+    prev_close = close[..., :-1]
+    tr[..., 1:] = np.maximum.reduce([
+        high[..., 1:] - low[..., 1:],
+        np.abs(high[..., 1:] - prev_close),
+        np.abs(low[..., 1:] - prev_close)
+    ])
+    return tr
+
+
+def atr(high, low, close, period: int) -> np.ndarray:
+    """Calculate Average True Range as the mean of the last period true ranges"""
+    return atr_from_true_range(true_range(high, low, close), period)
+
+
+def atr_from_true_range(tr: np.ndarray, period: int) -> np.ndarray:
+    """Average True Range from an already computed true_range series"""
+    out = np.full(tr.shape, np.nan)
+    if tr.shape[-1] < 2:
+        return out
+    out[..., 1:] = _rolling_sum(tr[..., 1:], period) / period
+    return out
+
+
+def rsi(close, period: int) -> np.ndarray:
+    """Calculate Relative Strength Index using Wilder smoothing"""
+    close = _as_float_array(close)
+    out = np.full(close.shape, np.nan)
+    if close.shape[-1] < period + 1:
+        return out
+
+    change = np.diff(close, axis=-1)
+    gains = np.maximum(change, 0.0)
+    losses = np.maximum(-change, 0.0)
+
+    alpha = 1.0 / period
+    shape = change.shape[:-1] + (change.shape[-1] - period + 1,)
+    avg_gain = np.empty(shape)
+    avg_loss = np.empty(shape)
+    avg_gain[..., 0] = gains[..., :period].mean(axis=-1)
+    avg_loss[..., 0] = losses[..., :period].mean(axis=-1)
+    avg_gain[..., 1:] = _ema_recurrence(gains[..., period:], alpha, avg_gain[..., 0])
+    avg_loss[..., 1:] = _ema_recurrence(losses[..., period:], alpha, avg_loss[..., 0])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out[..., period:] = np.where(avg_loss == 0.0, 100.0, values)
+    return out
+
+
+def macd(close, fast_period: int, slow_period: int, signal_period: int) -> Dict[str, np.ndarray]:
+    """Calculate MACD indicator"""
+    macd_line = ema(close, fast_period) - ema(close, slow_period)
+    signal_line = macd_signal(macd_line, signal_period)
+    return {
+        'macd': macd_line,
+        'signal': signal_line,
+        'histogram': macd_line - signal_line
+    }
+
+
+def macd_signal(macd_line: np.ndarray, signal_period: int) -> np.ndarray:
+    """EMA of the MACD line, each row starting at its own first defined value"""
+    signal_line = np.full(macd_line.shape, np.nan)
+    if macd_line.shape[-1] == 0:
+        return signal_line
+    lines = macd_line.reshape(-1, macd_line.shape[-1])
+    out = signal_line.reshape(lines.shape)
+    defined = ~np.isnan(lines)
+    first = np.where(defined.any(axis=-1), defined.argmax(axis=-1), -1)
+    # Rows whose MACD starts on the same bar share one EMA pass
+    for start in np.unique(first[first >= 0]):
+        rows = first == start
+        out[rows, start:] = ema(lines[rows, start:], signal_period)
+    return signal_line
+
+
+def obv(close, volume) -> np.ndarray:
+    """Calculate On-Balance Volume, starting at 0 on the first bar"""
+    close = _as_float_array(close)
+    volume = _as_float_array(volume)
+    out = np.zeros(close.shape)
+    if close.shape[-1] < 2:
+        return out
+    signed = np.sign(np.diff(close, axis=-1)) * volume[..., 1:]
+    out[..., 1:] = np.cumsum(signed, axis=-1)
+    return out
+
+
+def supertrend(high, low, close, period: int, multiplier: int) -> Dict[str, np.ndarray]:
+    """Calculate SuperTrend indicator"""
+    return supertrend_from_atr(high, low, close, atr(high, low, close, period), period, multiplier)
+
+
+def supertrend_from_atr(high, low, close, atr_values, period: int, multiplier: int) -> Dict[str, np.ndarray]:
+    """SuperTrend from an already computed ATR(period) series"""
+    high = _as_float_array(high)
+    low = _as_float_array(low)
+    close = _as_float_array(close)
+    n = close.shape[-1]
+
+    values = np.full(close.shape, np.nan)
+    direction = np.zeros(close.shape, dtype=np.int8)
+    if n <= period:
+        return {'supertrend': values, 'direction': direction}
+
+    # Bands are vectorized; only the trailing stop itself is path dependent
+    mid = (high + low) / 2.0
+    band = multiplier * atr_values
+    if close.ndim > 1:
+        return _supertrend_panel(close, mid - band, mid + band, period, values, direction)
+    basic_upper = (mid + band).tolist()
+    basic_lower = (mid - band).tolist()
+    closes = close.tolist()
+
+    st = closes[period]
+    trend = 1
+    values[period] = st
+    direction[period] = trend
+    for i in range(period + 1, n):
+        if trend == 1:
+            if closes[i] < st:
+                st, trend = basic_upper[i], -1
+            else:
+                st = max(basic_lower[i], st)
+        else:
+            if closes[i] > st:
+                st, trend = basic_lower[i], 1
+            else:
+                st = min(basic_upper[i], st)
+        values[i] = st
+        direction[i] = trend
+
+    return {'supertrend': values, 'direction': direction}
+
+
+def _supertrend_panel(close, basic_lower, basic_upper, period, values, direction):
+    """SuperTrend for a (symbols, bars) panel: one step per bar, vectorized across symbols"""
+    # Step over bars in (bars, symbols) layout so each step reads contiguous memory
+    close_t = np.ascontiguousarray(close.T)
+    lower_t = np.ascontiguousarray(basic_lower.T)
+    upper_t = np.ascontiguousarray(basic_upper.T)
+    values_t = np.ascontiguousarray(values.T)
+    direction_t = np.ascontiguousarray(direction.T)
+
+    st = close_t[period].copy()
+    up = np.ones(len(st), dtype=bool)
+    values_t[period] = st
+    direction_t[period] = 1
+    for i in range(period + 1, len(close_t)):
+        price = close_t[i]
+        flip = np.where(up, price < st, price > st)
+        st = np.where(up, np.maximum(lower_t[i], st), np.minimum(upper_t[i], st))
+        up ^= flip
+        # A break down trails from the upper band, a break up from the lower
+        st = np.where(flip, np.where(up, lower_t[i], upper_t[i]), st)
+        values_t[i] = st
+        direction_t[i] = np.where(up, 1, -1)
+    return {'supertrend': values_t.T.copy(), 'direction': direction_t.T.copy()}
+
@@ -0,0 +1,184 @@
+"""Load test the blocking and async order paths against mock upstreams
+
+Each flow is one order as a route would handle it: account lookup, quote
+snapshot, order POST, NocoDB record (queued on the journaled write-behind
+writer, as the routes do) and n8n webhook. The blocking flow makes the
+calls one after another; AsyncOrderService overlaps the independent ones. Flows run on --workers threads (like Flask workers),
+and finally all at once on the event loop, limited only by the
+per-upstream concurrency.
+
+Run from the webapp directory:
+
+    python -m benchmarks.async_load_benchmark --orders 400 --workers 8 --latency 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from app.services import async_market_data_service, async_order_service, market_data_service, order_service
+from app.services.async_http_client import AsyncHttpClient
+from app.services.async_order_service import AsyncOrderService
+from app.services.http_client import HttpClient
+from app.services.market_data_service import MarketDataService
+from app.services.nocodb_writer import NocoDBWriteBehindQueue
+from app.services.order_service import OrderService
+from app.services.order_tracker import OrderTracker
+from app.utils.async_runner import runner
+from app.utils.rate_limiter import RateLimiter
+from .mock_gateway import MockGateway
+
+warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+
+
+def _summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'orders': count,
+        'seconds': round(elapsed, 4),
+        'orders_per_second': round(count / elapsed, 2),
+        'p50_ms': round(latencies[count // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(count - 1, int(count * 0.99))] * 1000, 3)
+    }
+
+
+def _run_threads(flow, count, workers):
+    def timed(i):
+        started = time.perf_counter()
+        flow(i)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(timed, range(count)))
+    return _summary(latencies, time.perf_counter() - started)
+
+
+def _run_gathered(flow, count):
+    async def timed(i):
+        started = time.perf_counter()
+        await flow(i)
+        return time.perf_counter() - started
+
+    async def run_all():
+        return await asyncio.gather(*(timed(i) for i in range(count)))
+
+    started = time.perf_counter()
+    latencies = runner.run(run_all())
+    return _summary(latencies, time.perf_counter() - started)
+
+
+def run(count, workers, latency, concurrency):
+    patched = (
+        (market_data_service, 'gateway_client'), (market_data_service, 'snapshot_rate_limiter'),
+        (market_data_service, 'STREAM_ENABLED'),
+        (order_service, 'gateway_client'), (order_service, 'nocodb_client'), (order_service, 'order_tracker'),
+        (order_service, 'NOCODB_API_TOKEN'), (order_service, 'NOCODB_ORDERS_TABLE_ID'), (order_service, 'order_writer'),
+        (async_market_data_service, 'async_gateway_client'), (async_market_data_service, 'snapshot_rate_limiter'),
+        (async_order_service, 'async_gateway_client'), (async_order_service, 'async_nocodb_client'),
+        (async_order_service, 'async_n8n_client'), (async_order_service, 'order_tracker'),
+        (async_order_service, 'ACCOUNT_ID'), (async_order_service, 'NOCODB_API_TOKEN'),
+        (async_order_service, 'NOCODB_ORDERS_TABLE_ID'),
+    )
+    saved = {(module, name): getattr(module, name) for module, name in patched}
+
+    with MockGateway(latency=latency) as gateway, tempfile.TemporaryDirectory() as tmp:
+        gateway_client = HttpClient(gateway.api_url, pool_size=workers)
+        nocodb_client = HttpClient(gateway.base_url, pool_size=workers)
+        n8n_client = HttpClient(gateway.webhook_url, pool_size=workers)
+        async_clients = {
+            'async_gateway_client': AsyncHttpClient(gateway.api_url, concurrency=concurrency, name='gateway'),
+            'async_nocodb_client': AsyncHttpClient(gateway.base_url, concurrency=concurrency, name='nocodb'),
+            'async_n8n_client': AsyncHttpClient(gateway.webhook_url, concurrency=concurrency, name='n8n'),
+        }
+        tracker = OrderTracker(client=gateway_client, webhook_client=None)
+        # The snapshot rate limit would cap both paths at the same rate; lift it to compare I/O
+        limiter = RateLimiter(1e9)
+        for module in (market_data_service, async_market_data_service):
+            module.snapshot_rate_limiter = limiter
+        market_data_service.gateway_client = gateway_client
+        # Both paths price orders from snapshots, as without a stream connection
+        market_data_service.STREAM_ENABLED = False
+        async_market_data_service.async_gateway_client = async_clients['async_gateway_client']
+        order_service.gateway_client = gateway_client
+        order_service.nocodb_client = nocodb_client
+        writer = NocoDBWriteBehindQueue('bench', os.path.join(tmp, 'orders.journal'), client=nocodb_client)
+        order_service.order_writer = writer
+        for module in (order_service, async_order_service):
+            module.order_tracker = tracker
+            module.NOCODB_API_TOKEN = 'bench'
+            module.NOCODB_ORDERS_TABLE_ID = 'bench'
+        for name, client in async_clients.items():
+            setattr(async_order_service, name, client)
+        async_order_service.ACCOUNT_ID = None
+
+        def blocking_flow(i):
+            conid = 100000 + i
+            accounts = gateway_client.get('/iserver/accounts')
+            accounts.raise_for_status()
+            price = MarketDataService.get_optimal_order_price(conid, 'BUY')
+            response = gateway_client.post(f"/iserver/account/{accounts.json()['selectedAccount']}/orders", json={
+                'orders': [{'conid': conid, 'orderType': 'LMT', 'price': price['adjusted_price'],
+                            'quantity': 1, 'side': 'BUY', 'tif': 'DAY'}]
+            })
+            reply = response.json()[0]
+            tracker.track(reply['order_id'], conid, 'BUY', 1, price['adjusted_price'])
+            OrderService.queue_order_for_nocodb(reply, conid, 'LMT', price['adjusted_price'], 1, 'BUY', 'DAY')
+            n8n_client.post('', json={'event': 'placed', 'order_id': reply['order_id']}).raise_for_status()
+
+        def wrapped_flow(i):
+            result = async_order_service.place_order(200000 + i, 'LMT', None, 1, 'BUY')
+            if isinstance(result, tuple):
+                raise RuntimeError(result[0]['error'])
+
+        async def async_flow(i):
+            result = await AsyncOrderService.place_order(300000 + i, 'LMT', None, 1, 'BUY')
+            if isinstance(result, tuple):
+                raise RuntimeError(result[0]['error'])
+
+        try:
+            results = {
+                'mock_latency_ms': latency * 1000,
+                'workers': workers,
+                'upstream_concurrency': concurrency,
+                'blocking_threads': _run_threads(blocking_flow, count, workers),
+                'async_sync_wrappers_threads': _run_threads(wrapped_flow, count, workers),
+                'async_gathered': _run_gathered(async_flow, count),
+            }
+            writer.stop()
+            results['nocodb_records'] = len(gateway.state.nocodb_records)
+            results['webhook_events'] = len(gateway.state.webhook_events)
+            results['gateway_requests'] = gateway.state.requests
+            results['async_gateway_metrics'] = async_clients['async_gateway_client'].metrics()
+        finally:
+            tracker.stop()
+            writer.stop()
+            for client in async_clients.values():
+                runner.run(client.close())
+            for client in (gateway_client, nocodb_client, n8n_client):
+                client.close()
+            for (module, name), value in saved.items():
+                setattr(module, name, value)
+
+    blocking = results['blocking_threads']['orders_per_second']
+    results['wrapper_speedup'] = round(results['async_sync_wrappers_threads']['orders_per_second'] / blocking, 2)
+    results['gathered_speedup'] = round(results['async_gathered']['orders_per_second'] / blocking, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=8, help='Request threads, as in a threaded Flask server')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mock upstream latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=32, help='Async requests in flight per upstream')
+    args = parser.parse_args()
+    print(json.dumps(run(args.orders, args.workers, args.latency, args.concurrency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
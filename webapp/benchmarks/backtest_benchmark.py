@@ -0,0 +1,84 @@
+"""Time a backtest parameter sweep inline and over the process pool
+
+Builds a panel of --symbols random-walk series, then sweeps SuperTrend
+period x multiplier x RSI entry threshold over every symbol; each
+combination is one vectorized run over the whole panel.
+
+Run from the webapp directory:
+
+    python -m benchmarks.backtest_benchmark --symbols 100 --bars 1000 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+from app.models.bar_series import FIELDS
+from app.services.backtest_service import BacktestService
+from app.utils.scanner import Panel
+from .synthetic import make_ohlcv
+
+ENTRY = "st_dir > 0 and rsi < {rsi_low}"
+EXIT = "st_dir < 0 or rsi > {rsi_high}"
+ALIASES = {'st_dir': 'st_direction({st_period},{st_mult})'}
+
+
+def make_panel(symbols, bars):
+    frames = [make_ohlcv(bars, seed=i) for i in range(symbols)]
+    columns = {field: np.stack([frame[field.capitalize()].to_numpy() for frame in frames]) for field in FIELDS}
+    last_dates = np.array([frame['Date'].iloc[-1] for frame in frames], dtype='datetime64[ns]')
+    return Panel([f"SYM{i}" for i in range(symbols)], columns, last_dates)
+
+
+def make_grid(combinations):
+    """A grid of about combinations entries over four parameters"""
+    side = max(1, round(combinations ** 0.25))
+    return {
+        'st_period': [7 + 3 * i for i in range(side)],
+        'st_mult': [2 + 0.5 * i for i in range(side)],
+        'rsi_low': [30 + 5 * i for i in range(side)],
+        'rsi_high': [60 + 5 * i for i in range(max(1, round(combinations / side ** 3)))],
+    }
+
+
+def run(symbols, bars, combinations, workers):
+    panel = make_panel(symbols, bars)
+    grid = make_grid(combinations)
+
+    started = time.perf_counter()
+    inline = BacktestService.sweep_panel(panel, ENTRY, EXIT, grid, ALIASES, workers=1, limit=3)
+    inline_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pooled = BacktestService.sweep_panel(panel, ENTRY, EXIT, grid, ALIASES, workers=workers, limit=3)
+    pooled_seconds = time.perf_counter() - started
+
+    runs = inline['runs']
+    return {
+        'symbols': symbols,
+        'bars': bars,
+        'combinations': inline['combinations'],
+        'runs': runs,
+        'workers': pooled['workers'],
+        'inline_seconds': round(inline_seconds, 3),
+        'pooled_seconds': round(pooled_seconds, 3),
+        'inline_runs_per_second': round(runs / inline_seconds, 1),
+        'pooled_runs_per_second': round(runs / pooled_seconds, 1),
+        'speedup': round(inline_seconds / pooled_seconds, 2),
+        'same_results': inline['results'] == pooled['results'],
+        'best': inline['results'][0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--bars', type=int, default=1000)
+    parser.add_argument('--combinations', type=int, default=100, help='Approximate parameter combinations')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    print(json.dumps(run(args.symbols, args.bars, args.combinations, args.workers), indent=2))
+
+
+if __name__ == '__main__':
+    main()
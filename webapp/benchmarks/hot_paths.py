@@ -0,0 +1,276 @@
+"""Time the hot paths: indicators, chart stages and order placement
+
+Run from the webapp directory:
+
+    python -m benchmarks.hot_paths --sizes 1000,10000,100000 --output results.json
+    python -m benchmarks.hot_paths --baseline results.json
+
+Every timing is reported in milliseconds as min/median/mean over the
+repeats. With --baseline, each median is also compared with the same
+entry of an earlier run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+from app.models.bar_series import BarSeries
+from app.utils import indicators, vectorized_indicators
+from .mock_gateway import MockGateway
+from .synthetic import make_ohlcv
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Business-day dates from 2000 overflow datetime64[ns] past ~65k bars
+_DAILY_MAX_BARS = 50_000
+
+
+def measure(fn, repeat=5, warmup=1):
+    """Call fn warmup + repeat times and summarise the timed calls in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        'min_ms': round(min(times), 4),
+        'median_ms': round(statistics.median(times), 4),
+        'mean_ms': round(statistics.fmean(times), 4),
+        'runs': repeat
+    }
+
+
+def _guarded(fn, *args, **kwargs):
+    try:
+        return measure(fn, *args, **kwargs)
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+
+
+def synthetic_frame(bars, seed=0):
+    return make_ohlcv(bars, seed=seed, freq='B' if bars <= _DAILY_MAX_BARS else 'h')
+
+
+def bench_indicators(bars, repeat, decimal_max_bars):
+    df = synthetic_frame(bars)
+    series = BarSeries.from_dataframe(df, 'BENCH')
+    h, l, c = series.high, series.low, series.close
+    results = {
+        'bar_series_from_dataframe': _guarded(lambda: BarSeries.from_dataframe(df, 'BENCH'), repeat),
+        'calculate_series_indicators': _guarded(lambda: indicators.calculate_series_indicators(series), repeat),
+        'vectorized.sma_200': _guarded(lambda: vectorized_indicators.sma(c, 200), repeat),
+        'vectorized.ema_20': _guarded(lambda: vectorized_indicators.ema(c, 20), repeat),
+        'vectorized.bollinger_bands': _guarded(lambda: vectorized_indicators.bollinger_bands(c, 20, 2), repeat),
+        'vectorized.supertrend': _guarded(lambda: vectorized_indicators.supertrend(h, l, c, 10, 3), repeat),
+        'vectorized.macd': _guarded(lambda: vectorized_indicators.macd(c, 12, 26, 9), repeat),
+        'vectorized.rsi': _guarded(lambda: vectorized_indicators.rsi(c, 14), repeat),
+        'vectorized.atr': _guarded(lambda: vectorized_indicators.atr(h, l, c, 14), repeat),
+    }
+
+    if bars > decimal_max_bars:
+        results['decimal'] = {'skipped': f"more than {decimal_max_bars} bars"}
+        return results
+
+    # The Decimal reference path is slow enough that one timed run is representative
+    quotes = series.to_quotes()
+    decimal_repeat = 1 if bars > 1_000 else repeat
+    results.update({
+        'calculate_indicators.vectorized': _guarded(lambda: indicators.calculate_indicators(quotes), repeat),
+        'calculate_indicators.decimal': _guarded(
+            lambda: indicators.calculate_indicators(quotes, indicators.MODE_DECIMAL), decimal_repeat, 0),
+        'calculate_sma': _guarded(lambda: indicators.calculate_sma(quotes, 200), decimal_repeat, 0),
+        'calculate_ema': _guarded(lambda: indicators.calculate_ema(quotes, 20), decimal_repeat, 0),
+        'calculate_bollinger_bands': _guarded(lambda: indicators.calculate_bollinger_bands(quotes, 20, 2), decimal_repeat, 0),
+        'calculate_supertrend': _guarded(lambda: indicators.calculate_supertrend(quotes, 10, 3), decimal_repeat, 0),
+        'calculate_macd': _guarded(lambda: indicators.calculate_macd(quotes, 12, 26, 9), decimal_repeat, 0),
+        'calculate_rsi': _guarded(lambda: indicators.calculate_rsi(quotes, 14), decimal_repeat, 0),
+        'calculate_atr': _guarded(lambda: indicators.calculate_atr(quotes, 14), decimal_repeat, 0),
+    })
+    return results
+
+
+def bench_chart(bars, repeat, width, height, image_format):
+    """Time generate_chart end to end per renderer and each of its stages on its own"""
+    import plotly.io as pio
+    from app.services.technical_chart_service import TechnicalChartService
+
+    df = synthetic_frame(bars)
+    series = BarSeries.from_dataframe(df, 'BENCH')
+    results = {'indicators': _guarded(lambda: indicators.calculate_series_indicators(series), repeat)}
+
+    computed = indicators.calculate_series_indicators(series)
+    results['figure'] = _guarded(
+        lambda: TechnicalChartService.build_figure(df, 'BENCH', series, computed), repeat)
+    try:
+        fig = TechnicalChartService.build_figure(df, 'BENCH', series, computed)
+    except Exception as e:
+        results['render'] = {'error': f"figure stage failed: {type(e).__name__}: {e}"}
+    else:
+        results['render'] = _guarded(
+            lambda: pio.to_image(fig, format=image_format, width=width, height=height), repeat)
+    for renderer in ('plotly', 'agg'):
+        results[f'generate_chart_{renderer}'] = _guarded(
+            lambda: TechnicalChartService.generate_chart(df, 'BENCH', width, height, image_format, use_cache=False,
+                                                         renderer=renderer), repeat)
+    return results
+
+
+def bench_orders(orders, repeat, latency):
+    """Time order placement against the mock gateway and mock NocoDB"""
+    from app.services import market_data_service, order_service
+    from app.services.http_client import HttpClient
+    from app.services.nocodb_writer import NocoDBWriteBehindQueue
+    from app.services.order_service import OrderService
+    from app.services.order_tracker import OrderTracker
+
+    saved = {name: getattr(order_service, name)
+             for name in ('gateway_client', 'nocodb_client', 'order_writer', 'order_tracker',
+                          'NOCODB_API_TOKEN', 'NOCODB_ORDERS_TABLE_ID')}
+    saved_market = {name: getattr(market_data_service, name) for name in ('gateway_client', 'STREAM_ENABLED')}
+
+    with MockGateway(latency=latency) as gateway, tempfile.TemporaryDirectory() as tmp:
+        gateway_client = HttpClient(gateway.api_url)
+        nocodb_client = HttpClient(gateway.base_url)
+        writer = NocoDBWriteBehindQueue('bench', os.path.join(tmp, 'orders.journal'), client=nocodb_client)
+        tracker = OrderTracker(client=gateway_client, webhook_client=None)
+        market_data_service.gateway_client = gateway_client
+        # Orders are priced from snapshots, as without a stream connection
+        market_data_service.STREAM_ENABLED = False
+        order_service.gateway_client = gateway_client
+        order_service.nocodb_client = nocodb_client
+        order_service.order_writer = writer
+        order_service.order_tracker = tracker
+        order_service.NOCODB_API_TOKEN = 'bench'
+        order_service.NOCODB_ORDERS_TABLE_ID = 'bench'
+        try:
+            def place(cold):
+                if cold:
+                    market_data_service.quote_cache.invalidate()
+                OrderService.place_order(265598, 'LMT', None, 10, 'BUY')
+
+            specs = [{'conid': 265598 + i, 'order_type': 'LMT', 'side': 'BUY', 'quantity': 1} for i in range(orders)]
+
+            def place_batch():
+                market_data_service.quote_cache.invalidate()
+                OrderService.place_orders(specs)
+
+            def place_sequential():
+                market_data_service.quote_cache.invalidate()
+                for spec in specs:
+                    OrderService.place_order(spec['conid'], spec['order_type'], None, spec['quantity'], spec['side'])
+
+            record = {'order_id': '1', 'order_status': 'Submitted'}
+            results = {
+                'mock_latency_ms': latency * 1000,
+                'place_order.cold_quote': _guarded(lambda: place(True), repeat),
+                'place_order.cached_quote': _guarded(lambda: place(False), repeat),
+                'save_order_to_nocodb': _guarded(
+                    lambda: OrderService.save_order_to_nocodb(record, 265598, 'LMT', 100.0, 10, 'BUY', 'DAY'), repeat),
+                f'place_order.sequential_{orders}': _guarded(place_sequential, max(1, repeat // 2)),
+                f'place_orders.batch_{orders}': _guarded(place_batch, max(1, repeat // 2)),
+            }
+            flush_started = time.perf_counter()
+            drained = writer.flush(30)
+            results['nocodb_queue_flush_ms'] = round((time.perf_counter() - flush_started) * 1000, 4)
+            results['nocodb_queue_drained'] = drained
+            results['gateway_requests'] = gateway.state.requests
+        finally:
+            writer.stop(5)
+            tracker.stop()
+            for name, value in saved.items():
+                setattr(order_service, name, value)
+            for name, value in saved_market.items():
+                setattr(market_data_service, name, value)
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+
+def run(sizes, suites, repeat, decimal_max_bars, chart_max_bars, orders, latency, width, height, image_format):
+    results = {'environment': environment(), 'sizes': list(sizes), 'results': {}}
+    if 'indicators' in suites:
+        results['results']['indicators'] = {
+            str(bars): bench_indicators(bars, repeat, decimal_max_bars) for bars in sizes
+        }
+    if 'chart' in suites:
+        results['results']['chart'] = {
+            str(bars): bench_chart(bars, max(1, repeat // 2), width, height, image_format)
+            if bars <= chart_max_bars else {'skipped': f"more than {chart_max_bars} bars"}
+            for bars in sizes
+        }
+    if 'orders' in suites:
+        results['results']['orders'] = bench_orders(orders, repeat, latency)
+    return results
+
+
+def _medians(tree, prefix=''):
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and 'median_ms' in value:
+            yield path, value['median_ms']
+        elif isinstance(value, dict):
+            yield from _medians(value, f"{path}/")
+
+
+def compare(current, baseline):
+    """Median of every timing against the same entry in a baseline run; ratio > 1 is slower"""
+    before = dict(_medians(baseline.get('results', {})))
+    return {
+        path: {'baseline_ms': before[path], 'current_ms': median,
+               'ratio': round(median / before[path], 3) if before[path] else None}
+        for path, median in _medians(current['results']) if path in before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated bar counts')
+    parser.add_argument('--suites', default='indicators,chart,orders')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--decimal-max-bars', type=int, default=10_000,
+                        help='skip the Decimal reference functions above this size')
+    parser.add_argument('--chart-max-bars', type=int, default=10_000,
+                        help='skip chart rendering above this size')
+    parser.add_argument('--orders', type=int, default=20, help='orders per batch placement run')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock upstream latency in seconds')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=2048)
+    parser.add_argument('--format', default='jpeg')
+    parser.add_argument('--output', help='write the JSON here as well as to stdout')
+    parser.add_argument('--baseline', help='earlier --output file to compare medians with')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    suites = set(args.suites.split(','))
+    results = run(sizes, suites, args.repeat, args.decimal_max_bars, args.chart_max_bars,
+                  args.orders, args.latency, args.width, args.height, args.format)
+    if args.baseline:
+        with open(args.baseline) as f:
+            results['comparison'] = compare(results, json.load(f))
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Compare bare requests calls with the pooled HttpClient against a mock gateway
+
+Run from the webapp directory:
+
+    python -m benchmarks.http_client_benchmark --requests 200
+"""
+import argparse
+import json
+import time
+import warnings
+import requests
+from app.services.http_client import HttpClient
+from .mock_gateway import MockGateway
+
+warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+
+
+def _time_calls(call, count):
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'total_seconds': round(total, 4),
+        'avg_ms': round(total / count * 1000, 3),
+        'p50_ms': round(latencies[count // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(count - 1, int(count * 0.99))] * 1000, 3)
+    }
+
+
+def run(count, tls, latency):
+    with MockGateway(latency=latency, tls=tls) as gateway:
+        api = gateway.api_url
+        client = HttpClient(api, verify=False)
+
+        def bare_snapshot(i):
+            requests.get(f"{api}/iserver/marketdata/snapshot",
+                         params={'conids': str(265598 + i), 'fields': '31'}, verify=False).raise_for_status()
+
+        def pooled_snapshot(i):
+            client.get('/iserver/marketdata/snapshot',
+                       params={'conids': str(265598 + i), 'fields': '31'}).raise_for_status()
+
+        def bare_order(i):
+            bare_snapshot(i)
+            requests.post(f"{api}/iserver/account/DU123456/orders",
+                          json={'orders': [{'conid': 265598, 'side': 'BUY', 'quantity': 1}]}, verify=False).raise_for_status()
+
+        def pooled_order(i):
+            pooled_snapshot(i)
+            client.post('/iserver/account/DU123456/orders',
+                        json={'orders': [{'conid': 265598, 'side': 'BUY', 'quantity': 1}]}).raise_for_status()
+
+        results = {
+            'requests': count,
+            'tls': tls,
+            'server_latency_ms': latency * 1000,
+            'snapshot_bare': _time_calls(bare_snapshot, count),
+            'snapshot_pooled': _time_calls(pooled_snapshot, count),
+            'order_path_bare': _time_calls(bare_order, count),
+            'order_path_pooled': _time_calls(pooled_order, count),
+            'client_metrics': client.metrics()
+        }
+        client.close()
+    results['snapshot_speedup'] = round(
+        results['snapshot_bare']['total_seconds'] / results['snapshot_pooled']['total_seconds'], 2)
+    results['order_path_speedup'] = round(
+        results['order_path_bare']['total_seconds'] / results['order_path_pooled']['total_seconds'], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock server latency in seconds')
+    parser.add_argument('--no-tls', action='store_true')
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, not args.no_tls, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Compare a rendered chart with the columnar indicator data endpoint
+
+Times TechnicalChartService.generate_chart against GET /indicators/<conid>
+in every installed format, with and without gzip, and the If-None-Match
+revalidation that returns 304. Bars come from a random-walk series in
+place of the bar store.
+
+Run from the webapp directory:
+
+    python -m benchmarks.indicator_data_benchmark --bars 252 --last 100
+"""
+import argparse
+import gzip
+import json
+from flask import Flask
+from app.models.bar_series import BarSeries
+from app.routes.indicator_routes import indicator_bp
+from app.services import indicator_data_service
+from app.services.technical_chart_service import TechnicalChartService
+from app.utils.columnar import available_formats
+from .hot_paths import measure
+from .synthetic import make_ohlcv
+
+
+class _StoredBars:
+    """Stands in for MarketDataService, serving one series for every conid"""
+
+    def __init__(self, series):
+        self.series = series
+
+    def get_bar_series(self, conid, period='1y', bar='1d'):
+        return self.series
+
+
+def run(bars, last, repeat, width, height):
+    df = make_ohlcv(bars)
+    series = BarSeries.from_dataframe(df, 'BENCH')
+    app = Flask(__name__)
+    app.register_blueprint(indicator_bp)
+    client = app.test_client()
+
+    chart = TechnicalChartService.generate_chart(df, 'BENCH', width, height, 'jpeg', use_cache=False)
+    results = {
+        'bars': bars,
+        'last': last,
+        'chart_jpeg': {
+            'bytes': chart.getbuffer().nbytes,
+            'median_ms': measure(lambda: TechnicalChartService.generate_chart(
+                df, 'BENCH', width, height, 'jpeg', use_cache=False), max(1, repeat // 10))['median_ms']
+        }
+    }
+
+    saved = indicator_data_service.MarketDataService
+    indicator_data_service.MarketDataService = _StoredBars(series)
+    try:
+        url = f"/indicators/265598?last={last}"
+        for data_format in available_formats():
+            for encoding in ('identity', 'gzip'):
+                headers = {'Accept-Encoding': encoding}
+                request_url = f"{url}&format={data_format}"
+                response = client.get(request_url, headers=headers)
+                body = response.get_data()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    assert gzip.decompress(body)
+
+                def uncached():
+                    indicator_data_service.indicator_data_cache.clear()
+                    client.get(request_url, headers=headers)
+                results[f"{data_format}.{encoding}"] = {
+                    'bytes': len(body),
+                    'uncached_median_ms': measure(uncached, repeat)['median_ms'],
+                    'cached_median_ms': measure(lambda: client.get(request_url, headers=headers), repeat)['median_ms']
+                }
+
+            request_url = f"{url}&format={data_format}"
+            etag = client.get(request_url).headers['ETag']
+            assert client.get(request_url, headers={'If-None-Match': etag}).status_code == 304
+            results[f"{data_format}.not_modified_median_ms"] = measure(
+                lambda: client.get(request_url, headers={'If-None-Match': etag}), repeat)['median_ms']
+    finally:
+        indicator_data_service.MarketDataService = saved
+        indicator_data_service.indicator_data_cache.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=252, help='Bars in the stored series')
+    parser.add_argument('--last', type=int, default=100, help='Bars returned by the endpoint')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=2048)
+    args = parser.parse_args()
+    print(json.dumps(run(args.bars, args.last, args.repeat, args.width, args.height), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Local stand-in for the IBKR Client Portal Gateway, NocoDB REST API and n8n webhook
+
+Serves the handful of endpoints the services call, with configurable
+latency and transient error rate, over HTTP/1.1 keep-alive and optionally
+TLS with a throwaway self-signed certificate.
+"""
+import itertools
+import json
+import os
+import random
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+API_PREFIX = '/v1/api'
+WEBHOOK_PREFIX = '/webhook/'
+
+
+class MockState:
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0, require_confirmation=False):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.require_confirmation = require_confirmation
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.order_ids = itertools.count(1000)
+        self.orders = {}
+        self.nocodb_records = []
+        self.webhook_events = []
+        self.order_requests = []
+        self.history_bars = 0
+        self.questions = {}
+        self.reply_ids = itertools.count(1)
+        self.requests = 0
+
+    def fill(self, order_id, price=None):
+        """Mark an order filled and return the time it happened"""
+        with self.lock:
+            order = self.orders[str(order_id)]
+            order['status'] = 'Filled'
+            order['filledQuantity'] = order['totalSize']
+            order['avgPrice'] = price if price is not None else order['price']
+        return time.time()
+
+    def price(self, conid):
+        return round(50 + (int(conid) % 1000) / 10.0, 2)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; avoid Nagle/delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null') if length else None
+
+    def _prelude(self):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            fail = state.random.random() < state.error_rate
+        if state.latency:
+            time.sleep(state.latency)
+        if fail:
+            self._send(503, {'error': 'Service Unavailable'})
+            return False
+        return True
+
+    def _accept(self, orders):
+        replies = []
+        for order in orders:
+            order_id = str(next(self.state.order_ids))
+            with self.state.lock:
+                self.state.orders[order_id] = {
+                    'orderId': int(order_id), 'conid': order.get('conid'), 'side': order.get('side'),
+                    'status': 'Submitted', 'filledQuantity': 0, 'totalSize': order.get('quantity'),
+                    'price': order.get('price'), 'cOID': order.get('cOID'), 'parentId': order.get('parentId')
+                }
+            replies.append({'order_id': order_id, 'order_status': 'Submitted', 'local_order_id': order.get('cOID')})
+        return replies
+
+    def do_GET(self):
+        self._body()
+        if not self._prelude():
+            return
+        url = urlparse(self.path)
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        query = parse_qs(url.query)
+
+        if path == '/iserver/marketdata/snapshot':
+            conids = query.get('conids', [''])[0].split(',')
+            self._send(200, [
+                {'conid': int(c), 'conidEx': c, '31': str(self.state.price(c)), '84': str(self.state.price(c) - 0.01),
+                 '86': str(self.state.price(c) + 0.01), '88': '100', '85': '100', '7059': '10'}
+                for c in conids if c
+            ])
+        elif path == '/iserver/marketdata/history':
+            conid = query.get('conid', ['0'])[0]
+            period = query.get('period', [''])[0]
+            bars = int(query.get('bars', ['365'])[0])
+            if period[:-1].isdigit() and period[-1] in 'dwy':
+                bars = int(period[:-1]) * {'d': 1, 'w': 7, 'y': 365}[period[-1]]
+            with self.state.lock:
+                self.state.history_bars += bars
+            end = int(time.time() // 86400) * 86400 * 1000
+            price = self.state.price(conid)
+            self._send(200, {'symbol': f"SYM{conid}", 'data': [
+                {'t': end - (bars - i) * 86400000, 'o': price, 'h': price + 1, 'l': price - 1, 'c': price + 0.5, 'v': 1000}
+                for i in range(bars)
+            ]})
+        elif path == '/iserver/accounts':
+            self._send(200, {'accounts': ['DU123456'], 'selectedAccount': 'DU123456'})
+        elif path == '/iserver/account/orders':
+            with self.state.lock:
+                orders = list(self.state.orders.values())
+            self._send(200, {'orders': orders, 'snapshot': True})
+        else:
+            self._send(404, {'error': f'Unknown path {path}'})
+
+    def do_POST(self):
+        body = self._body()
+        if not self._prelude():
+            return
+        path = urlparse(self.path).path
+        path = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path
+
+        if path.startswith('/iserver/account/') and path.endswith('/orders'):
+            orders = (body or {}).get('orders', [])
+            with self.state.lock:
+                self.state.order_requests.append(orders)
+            if self.state.require_confirmation:
+                # Like the real gateway: one precautionary question covering the whole request
+                reply_id = f"q{next(self.state.reply_ids)}"
+                with self.state.lock:
+                    self.state.questions[reply_id] = orders
+                self._send(200, [{'id': reply_id, 'message': ['Order price exceeds the price cap. Proceed?']}])
+            else:
+                self._send(200, self._accept(orders))
+        elif path.startswith('/iserver/reply/'):
+            with self.state.lock:
+                orders = self.state.questions.pop(path.rsplit('/', 1)[-1], None)
+            if orders is None:
+                self._send(400, {'error': 'Unknown reply id'})
+            else:
+                self._send(200, self._accept(orders))
+        elif path.startswith('/api/v2/tables/') and path.endswith('/records'):
+            records = body if isinstance(body, list) else [body]
+            with self.state.lock:
+                self.state.nocodb_records.extend(records)
+            ids = [{'Id': len(self.state.nocodb_records) - len(records) + i + 1} for i in range(len(records))]
+            self._send(200, ids if isinstance(body, list) else ids[0])
+        elif path.startswith(WEBHOOK_PREFIX):
+            with self.state.lock:
+                self.state.webhook_events.append(body)
+            self._send(200, {'message': 'Workflow was started'})
+        else:
+            self._send(404, {'error': f'Unknown path {path}'})
+
+
+class MockServer(ThreadingHTTPServer):
+    # Load tests open many connections at once; the default backlog of 5 stalls them on SYN retries
+    request_queue_size = 128
+
+
+def _self_signed_context(directory):
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+         '-days', '1', '-subj', '/CN=127.0.0.1'],
+        check=True, capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+class MockGateway:
+    """Run the mock server on a background thread: with MockGateway(tls=True) as gw: gw.api_url"""
+
+    def __init__(self, latency=0.0, error_rate=0.0, tls=False, port=0, require_confirmation=False):
+        self.state = MockState(latency, error_rate, require_confirmation=require_confirmation)
+        handler = type('BoundMockHandler', (MockHandler,), {'state': self.state})
+        self.server = MockServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.tls = tls
+        self._tmp = None
+        if tls:
+            self._tmp = tempfile.TemporaryDirectory()
+            context = _self_signed_context(self._tmp.name)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        scheme = 'https' if self.tls else 'http'
+        return f"{scheme}://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}{API_PREFIX}"
+
+    @property
+    def webhook_url(self):
+        return f"{self.base_url}{WEBHOOK_PREFIX}order-filled"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._tmp:
+            self._tmp.cleanup()
@@ -0,0 +1,113 @@
+"""Local stand-in for the Client Portal market data websocket
+
+Accepts 'smd+<conid>+{"fields": [...]}' subscriptions and 'umd+<conid>+{}'
+unsubscriptions, then pushes tick messages for every subscribed conid at
+a fixed interval, each carrying a random-walk last price and size. drop()
+closes every connection from the server side to exercise reconnects.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from aiohttp import web, WSMsgType
+
+WS_PATH = '/v1/api/ws'
+
+
+class MockMarketStream:
+    """Run the websocket server on a background thread: with MockMarketStream() as stream: stream.url"""
+
+    def __init__(self, tick_interval=0.01, port=0, seed=0):
+        self.tick_interval = tick_interval
+        self.port = port
+        self.random = random.Random(seed)
+        self.prices = {}
+        self.connections = 0
+        self.subscribe_messages = []
+        self.unsubscribe_messages = []
+        self.ticks_sent = 0
+        self._sockets = set()
+        self._loop = None
+        self._runner = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}{WS_PATH}"
+
+    def price(self, conid):
+        return self.prices.get(conid)
+
+    def _tick(self, conid):
+        price = self.prices.get(conid, 50 + (int(conid) % 1000) / 10.0)
+        price = round(max(0.01, price + self.random.gauss(0, 0.05)), 2)
+        self.prices[conid] = price
+        self.ticks_sent += 1
+        return {
+            'topic': f'smd+{conid}', 'conid': int(conid), 'conidEx': conid, '_updated': int(time.time() * 1000),
+            '31': str(price), '7059': str(self.random.randint(1, 500)),
+            '84': str(round(price - 0.01, 2)), '86': str(round(price + 0.01, 2))
+        }
+
+    async def _push(self, ws, subscribed):
+        while not ws.closed:
+            for conid in list(subscribed):
+                await ws.send_str(json.dumps(self._tick(conid)))
+            await asyncio.sleep(self.tick_interval)
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self._sockets.add(ws)
+        subscribed = set()
+        await ws.send_str(json.dumps({'topic': 'system', 'success': 'mock'}))
+        pusher = asyncio.ensure_future(self._push(ws, subscribed))
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                topic, _, rest = message.data.partition('+')
+                conid = rest.split('+', 1)[0]
+                if topic == 'smd':
+                    self.subscribe_messages.append(conid)
+                    subscribed.add(conid)
+                elif topic == 'umd':
+                    self.unsubscribe_messages.append(conid)
+                    subscribed.discard(conid)
+        finally:
+            pusher.cancel()
+            self._sockets.discard(ws)
+        return ws
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get(WS_PATH, self._handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def drop(self):
+        """Close every client connection from the server side"""
+        async def close_all():
+            for ws in list(self._sockets):
+                await ws.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result(5)
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
@@ -0,0 +1,81 @@
+"""Measure fill detection latency of the OrderTracker against a mock gateway
+
+Run from the webapp directory:
+
+    python -m benchmarks.order_tracker_benchmark --orders 50
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from app.config import ORDER_CHECK_INTERVAL
+from app.services.http_client import HttpClient
+from app.services.order_tracker import OrderTracker
+from .mock_gateway import MockGateway
+
+
+def run(orders, max_fill_delay, fast_interval, slow_interval, fast_window, seed=0):
+    rng = random.Random(seed)
+    with MockGateway() as gateway:
+        client = HttpClient(gateway.api_url)
+        tracker = OrderTracker(fast_interval, fast_window, slow_interval, client=client, webhook_client=None)
+        detected = {}
+        done = threading.Event()
+
+        def on_event(event):
+            if event['event'] == 'fill':
+                detected[event['order_id']] = event['detected_at']
+                if len(detected) == orders:
+                    done.set()
+
+        tracker.add_listener(on_event)
+
+        response = client.post('/iserver/account/DU123456/orders', json={'orders': [
+            {'conid': 265598 + i, 'side': 'BUY', 'quantity': 10, 'price': 100.0} for i in range(orders)
+        ]})
+        order_ids = [reply['order_id'] for reply in response.json()]
+        for order_id in order_ids:
+            tracker.track(order_id, quantity=10)
+
+        fills = {}
+        schedule = sorted((rng.uniform(0, max_fill_delay), order_id) for order_id in order_ids)
+        started = time.time()
+        for delay, order_id in schedule:
+            time.sleep(max(0.0, started + delay - time.time()))
+            fills[order_id] = gateway.state.fill(order_id)
+
+        done.wait(timeout=slow_interval * 3 + 5)
+        tracker.stop()
+        polls = tracker.polls
+
+    latencies = sorted(detected[o] - fills[o] for o in detected)
+    elapsed = max(max_fill_delay, 1e-9)
+    return {
+        'orders': orders,
+        'detected': len(latencies),
+        'fast_interval': fast_interval,
+        'slow_interval': slow_interval,
+        'avg_detection_ms': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+        'max_detection_ms': round(latencies[-1] * 1000, 1) if latencies else None,
+        'gateway_polls': polls,
+        # Fixed-interval, per-order polling detects a fill on average half an interval late
+        'fixed_poll_avg_detection_ms': ORDER_CHECK_INTERVAL / 2 * 1000,
+        'fixed_poll_gateway_polls': int(orders * (elapsed / ORDER_CHECK_INTERVAL + 1))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--max-fill-delay', type=float, default=5.0)
+    parser.add_argument('--fast-interval', type=float, default=0.5)
+    parser.add_argument('--slow-interval', type=float, default=ORDER_CHECK_INTERVAL)
+    parser.add_argument('--fast-window', type=float, default=60.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.orders, args.max_fill_delay, args.fast_interval, args.slow_interval,
+                         args.fast_window), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compare inline Kaleido rendering with the warm RenderPool
+
+Both sides are timed warm: the inline renderer draws one chart before
+timing starts, and the pool is started and warmed up before its timing.
+The warm-up times are reported separately.
+
+Run from the webapp directory:
+
+    python -m benchmarks.render_pool_benchmark --symbols 20 --workers 4
+"""
+import argparse
+import json
+import time
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+from app.utils.render_pool import RenderPool
+from .synthetic import make_ohlcv
+
+
+def build_figure(df, symbol):
+    """A 7-panel figure comparable in size to the technical chart"""
+    fig = make_subplots(rows=7, cols=1, shared_xaxes=True, specs=[[{"secondary_y": True}]] * 7)
+    fig.add_trace(go.Candlestick(x=df['Date'], open=df['Open'], high=df['High'],
+                                 low=df['Low'], close=df['Close'], name=symbol), row=1, col=1)
+    for row in range(2, 8):
+        fig.add_trace(go.Scatter(x=df['Date'], y=df['Close'].rolling(row * 5).mean(), mode='lines'), row=row, col=1)
+    fig.update_layout(title=symbol, xaxis_rangeslider_visible=False, template='plotly_white')
+    return fig
+
+
+def run(symbols, bars, workers, width, height, image_format):
+    figures = [build_figure(make_ohlcv(bars, seed=i), f"SYM{i}") for i in range(symbols)]
+
+    # Start Kaleido once first, as the pool's warm-up does, so both timings are of warm renders
+    warm_start = time.perf_counter()
+    pio.to_image(build_figure(make_ohlcv(bars, seed=symbols), 'WARMUP'), format=image_format, width=width, height=height)
+    inline_warm_up = time.perf_counter() - warm_start
+
+    start = time.perf_counter()
+    for fig in figures:
+        pio.to_image(fig, format=image_format, width=width, height=height)
+    inline = time.perf_counter() - start
+
+    pool = RenderPool(workers, max_queue=symbols, job_timeout=120)
+    warm_start = time.perf_counter()
+    pool.start(wait=True)
+    warm_up = time.perf_counter() - warm_start
+
+    start = time.perf_counter()
+    futures = [pool.submit(fig, image_format, width, height) for fig in figures]
+    for future in futures:
+        future.result()
+    pooled = time.perf_counter() - start
+    pool.shutdown()
+
+    return {
+        'symbols': symbols,
+        'bars': bars,
+        'workers': workers,
+        'size': f"{width}x{height}",
+        'format': image_format,
+        'inline_seconds': round(inline, 3),
+        'pooled_seconds': round(pooled, 3),
+        'inline_warm_up_seconds': round(inline_warm_up, 3),
+        'pool_warm_up_seconds': round(warm_up, 3),
+        'inline_charts_per_second': round(symbols / inline, 2),
+        'pooled_charts_per_second': round(symbols / pooled, 2),
+        'speedup': round(inline / pooled, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--bars', type=int, default=252)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=2048)
+    parser.add_argument('--format', default='jpeg')
+    args = parser.parse_args()
+    print(json.dumps(run(args.symbols, args.bars, args.workers, args.width, args.height, args.format), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Measure import time and memory of the app for order-only and chart workloads
+
+Run from the webapp directory:
+
+    python -m benchmarks.startup_benchmark --runs 5
+
+Each workload runs in a fresh interpreter. "eager" variants import pandas
+and plotly up front, as the chart service used to at module load, for
+comparison with the lazy imports.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Code run in the child; prints {"import_seconds", "first_use_seconds", "rss_mb", "heavy_modules"}
+_CHILD = r'''
+import json, resource, sys, time
+started = time.perf_counter()
+if {eager}:
+    import pandas, plotly.graph_objects, plotly.subplots, plotly.io
+{imports}
+imported = time.perf_counter()
+{first_use}
+used = time.perf_counter()
+print(json.dumps({{
+    "import_seconds": imported - started,
+    "first_use_seconds": used - imported,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": sorted(m for m in ("pandas", "plotly", "kaleido") if m in sys.modules)
+}}))
+'''
+
+WORKLOADS = {
+    'orders': {
+        'imports': 'from app.services.order_service import OrderService\n'
+                   'from app.services.technical_chart_service import TechnicalChartService',
+        'first_use': 'OrderService.build_order_record({}, 1, "LMT", 1.0, 1, "BUY", "DAY")',
+    },
+    'charts': {
+        'imports': 'from app.services.order_service import OrderService\n'
+                   'from app.services.technical_chart_service import TechnicalChartService',
+        'first_use': 'TechnicalChartService.prewarm(background=False)',
+    },
+}
+
+
+def run_child(workload, eager):
+    spec = WORKLOADS[workload]
+    code = _CHILD.format(eager=eager, imports=spec['imports'], first_use=spec['first_use'])
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    return {
+        'import_ms': round(statistics.median(s['import_seconds'] for s in samples) * 1000, 1),
+        'first_use_ms': round(statistics.median(s['first_use_seconds'] for s in samples) * 1000, 1),
+        'rss_mb': round(statistics.median(s['rss_mb'] for s in samples), 1),
+        'heavy_modules': samples[-1]['heavy_modules']
+    }
+
+
+def run(runs):
+    results = {}
+    for workload in WORKLOADS:
+        for eager in (False, True):
+            samples = [run_child(workload, eager) for _ in range(runs)]
+            results[f"{workload}{'_eager' if eager else ''}"] = summarize(samples)
+    return {'runs': runs, 'python': sys.version.split()[0], 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
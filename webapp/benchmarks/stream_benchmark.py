@@ -0,0 +1,122 @@
+"""Compare streamed and polled order pricing, and time a stream reconnect
+
+Streams ticks for --conids conids from the mock websocket into the live
+quote table, times get_optimal_order_price served from the last tick
+against the snapshot round trip to the mock gateway, then drops the
+connection and measures how long until every conid ticks again.
+
+Run from the webapp directory:
+
+    python -m benchmarks.stream_benchmark --conids 50 --latency 0.005
+"""
+import argparse
+import json
+import time
+from app.services import market_data_service, market_data_stream as market_data_stream_module
+from app.services.http_client import HttpClient
+from app.services.market_data_service import MarketDataService, live_quotes, quote_cache
+from app.services.market_data_stream import MarketDataStream
+from app.utils.rate_limiter import RateLimiter
+from .hot_paths import measure
+from .mock_gateway import MockGateway
+from .mock_stream import MockMarketStream
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Timed out waiting for the stream")
+        time.sleep(0.001)
+
+
+def run(count, latency, repeat, bar_seconds):
+    conids = [str(265598 + i) for i in range(count)]
+    saved = (market_data_service.gateway_client, market_data_service.snapshot_rate_limiter,
+             market_data_service.STREAM_ENABLED, market_data_stream_module.market_data_stream)
+
+    with MockGateway(latency=latency) as gateway, MockMarketStream(tick_interval=0.01) as mock:
+        market_data_service.gateway_client = HttpClient(gateway.api_url)
+        # Time the round trip itself, not the snapshot rate limit
+        market_data_service.snapshot_rate_limiter = RateLimiter(1e9)
+        market_data_service.STREAM_ENABLED = False
+        results = {'conids': count, 'mock_latency_ms': latency * 1000}
+        try:
+            def polled():
+                quote_cache.invalidate()
+                MarketDataService.get_optimal_order_price(conids[0], 'BUY')
+            results['get_optimal_order_price.polled'] = measure(polled, repeat)
+
+            # The stream order pricing starts, pointed at the mock
+            stream = MarketDataStream(url=mock.url, bar_seconds=bar_seconds)
+            market_data_stream_module.market_data_stream = stream
+            market_data_service.STREAM_ENABLED = True
+            bars = []
+            stream.add_listener(lambda conid, bar, indicators: bars.append(conid))
+            started = time.perf_counter()
+            stream.start()
+            stream.subscribe(conids)
+            stream.track_indicators(conids[0])
+            _wait_for(lambda: all(c in live_quotes for c in conids))
+            results['first_ticks_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+            results['quote_table.last'] = measure(lambda: live_quotes.last(conids[0], max_age=5.0), repeat * 1000)
+            results['get_optimal_order_price.streamed'] = measure(
+                lambda: MarketDataService.get_optimal_order_price(conids[0], 'BUY'), repeat * 1000)
+            price = MarketDataService.get_optimal_order_price(conids[0], 'BUY')
+            results['streamed_quote_age_ms'] = round(price['quote_age'] * 1000, 3)
+
+            # Drop every connection and time until each conid has ticked on the new one
+            connects = stream.connects
+            dropped_at = time.time()
+            started = time.perf_counter()
+            mock.drop()
+            _wait_for(lambda: stream.connects > connects and all(
+                live_quotes.get(c)['updated_at'] > dropped_at for c in conids))
+            results['reconnect_resubscribe_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+            # Unsubscribe the last conid: the mock stops sending its ticks and its row is dropped,
+            # so the next price lookup misses and subscribes it again
+            if count > 1:
+                stream.unsubscribe([conids[-1]])
+                _wait_for(lambda: conids[-1] in mock.unsubscribe_messages)
+                last_price = mock.price(conids[-1])
+                time.sleep(0.2)
+                if mock.price(conids[-1]) != last_price or conids[-1] in live_quotes:
+                    raise RuntimeError(f"Ticks for {conids[-1]} kept arriving after unsubscribe")
+                results['unsubscribe_stops_ticks'] = True
+                MarketDataService.get_optimal_order_price(conids[-1], 'BUY')
+                _wait_for(lambda: conids[-1] in live_quotes)
+                results['resubscribed_on_lookup'] = True
+
+            _wait_for(lambda: bars, timeout=bar_seconds * 3)
+            results['indicator_bars'] = len(bars)
+            results['live_indicators'] = {key: value for key, value in stream.indicators(conids[0]).items()
+                                          if not isinstance(value, dict)}
+            results['stream'] = {'connects': stream.connects, 'messages': stream.messages, 'ticks': stream.ticks,
+                                 'subscribe_messages': len(mock.subscribe_messages),
+                                 'unsubscribe_messages': len(mock.unsubscribe_messages)}
+            stream.stop()
+        finally:
+            (market_data_service.gateway_client, market_data_service.snapshot_rate_limiter,
+             market_data_service.STREAM_ENABLED, market_data_stream_module.market_data_stream) = saved
+            live_quotes.clear()
+
+    polled = results['get_optimal_order_price.polled']['median_ms']
+    streamed = results['get_optimal_order_price.streamed']['median_ms']
+    results['streamed_speedup'] = round(polled / streamed, 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--conids', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.005, help='Mock gateway latency in seconds')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--bar-seconds', type=int, default=1, help='Streamed bar length fed to the indicators')
+    args = parser.parse_args()
+    print(json.dumps(run(args.conids, args.latency, args.repeat, args.bar_seconds), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(bars, seed=0, start='2000-01-03', freq='B', start_price=100.0):
+    """Generate a random-walk OHLCV DataFrame with the chart service's column names"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0002, 0.015, bars)))
+    open_ = close * (1 + rng.normal(0, 0.004, bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, bars)))
+    volume = rng.integers(100_000, 5_000_000, bars).astype(np.float64)
+    return pd.DataFrame({
+        'Date': pd.date_range(start, periods=bars, freq=freq),
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume
+    })
@@ -0,0 +1,84 @@
+"""AsyncOrderService account resolution
+
+Run from the webapp directory: python -m pytest tests
+"""
+import asyncio
+import pytest
+from app.services import async_order_service
+from app.services.async_market_data_service import AsyncMarketDataService
+from app.services.async_order_service import AsyncOrderService
+
+
+class FakeResponse:
+    status_code = 200
+    text = ''
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeGateway:
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.posts = []
+
+    async def get(self, path, **kwargs):
+        assert path == '/iserver/accounts'
+        return FakeResponse(self.accounts)
+
+    async def post(self, path, json=None, **kwargs):
+        self.posts.append(path)
+        return FakeResponse([{'order_status': 'Submitted'} for _ in json['orders']])
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    async def no_price(conid, side):
+        return None
+
+    async def no_quotes(conids, *args, **kwargs):
+        return {}
+
+    def use(accounts):
+        fake = FakeGateway(accounts)
+        monkeypatch.setattr(async_order_service, 'async_gateway_client', fake)
+        return fake
+
+    monkeypatch.setattr(async_order_service, 'ACCOUNT_ID', None)
+    monkeypatch.setattr(AsyncMarketDataService, 'get_optimal_order_price', staticmethod(no_price))
+    monkeypatch.setattr(AsyncMarketDataService, 'get_quotes', staticmethod(no_quotes))
+    return use
+
+
+def test_place_order_without_an_account_is_not_submitted(gateway):
+    fake = gateway({'accounts': []})
+    result = asyncio.run(AsyncOrderService.place_order(265598, 'LMT', 100.0, 1, 'BUY', persist=False, notify=False))
+
+    assert isinstance(result, tuple) and 'No account' in result[0]['error']
+    assert fake.posts == []
+
+
+def test_place_orders_without_an_account_is_not_submitted(gateway):
+    fake = gateway({'accounts': []})
+    results = asyncio.run(AsyncOrderService.place_orders([
+        {'conid': 265598, 'order_type': 'LMT', 'price': 100.0, 'quantity': 1, 'side': 'BUY'}
+    ]))
+
+    assert 'No account' in results[0]['error']
+    assert fake.posts == []
+
+
+def test_both_paths_post_to_the_looked_up_account(gateway):
+    fake = gateway({'accounts': ['DU1', 'DU2'], 'selectedAccount': 'DU2'})
+    asyncio.run(AsyncOrderService.place_order(265598, 'LMT', 100.0, 1, 'BUY', persist=False, notify=False))
+    asyncio.run(AsyncOrderService.place_orders([
+        {'conid': 265598, 'order_type': 'LMT', 'price': 100.0, 'quantity': 1, 'side': 'BUY'}
+    ]))
+
+    assert fake.posts == ['/iserver/account/DU2/orders'] * 2
@@ -0,0 +1,72 @@
+"""Bar store backfill through MarketDataService.get_bar_series, and store key validation
+
+Run from the webapp directory: python -m pytest tests
+"""
+import time
+import numpy as np
+import pytest
+from app.services import market_data_service
+from app.services.market_data_service import MarketDataService, period_seconds
+from app.utils.bar_store import BarStore, BarStoreKeyError
+
+DAY_MS = 86_400_000
+
+
+class FakeGateway:
+    """Daily bars for the last three years, served like /iserver/marketdata/history"""
+
+    def __init__(self):
+        end = int(time.time() * 1000) // DAY_MS * DAY_MS
+        self.times = np.arange(end - 3 * 365 * DAY_MS, end + 1, DAY_MS)
+        self.requests = []
+
+    def get_historical_data(self, conid, period='1y', bar='1d', outside_rth=False):
+        self.requests.append(period)
+        start = time.time() * 1000 - period_seconds(period) * 1000
+        return {'symbol': 'TEST', 'data': [
+            {'t': int(t), 'o': i, 'h': i + 1, 'l': i - 1, 'c': i + 0.5, 'v': 1000}
+            for i, t in enumerate(self.times) if t >= start
+        ]}
+
+
+@pytest.fixture
+def gateway(tmp_path, monkeypatch):
+    fake = FakeGateway()
+    monkeypatch.setattr(market_data_service, 'bar_store', BarStore(str(tmp_path)))
+    monkeypatch.setattr(MarketDataService, 'get_historical_data', staticmethod(fake.get_historical_data))
+    return fake
+
+
+def test_longer_period_backfills_in_front(gateway):
+    one_year = MarketDataService.get_bar_series('265598', '1y')
+    two_years = MarketDataService.get_bar_series('265598', '2y')
+
+    assert gateway.requests == ['1y', '2y']
+    assert len(one_year) == 365
+    assert len(two_years) == 730
+    dates = two_years.dates.astype('datetime64[ms]').astype(np.int64)
+    np.testing.assert_array_equal(dates, gateway.times[-730:])
+    np.testing.assert_array_equal(two_years.open, np.arange(len(gateway.times))[-730:])
+
+
+def test_covered_period_is_not_refetched(gateway):
+    MarketDataService.get_bar_series('265598', '2y')
+    one_year = MarketDataService.get_bar_series('265598', '1y')
+
+    assert gateway.requests == ['2y']
+    assert len(one_year) == 365
+
+
+@pytest.mark.parametrize('conid, bar', [
+    ('../../x', '1d'), ('265598', '../x'), ('265598', '/tmp'), ('265598/..', '1d'), ('26559٨', '1d'), ('265598', '1d\n')
+])
+def test_rejects_keys_outside_the_store(tmp_path, conid, bar):
+    store = BarStore(str(tmp_path / 'store'))
+    with pytest.raises(BarStoreKeyError):
+        store.meta(conid, bar)
+
+
+def test_accepts_bar_sizes(tmp_path):
+    store = BarStore(str(tmp_path))
+    for bar in ('1d', '5min', '1h', '1w', '1m', '1d-ext'):
+        assert store.meta(265598, bar)['count'] == 0
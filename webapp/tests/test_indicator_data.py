@@ -0,0 +1,39 @@
+"""Indicator data precision checks and ETags
+
+Run from the webapp directory: python -m pytest tests
+"""
+import numpy as np
+import pytest
+from app.models.bar_series import BarSeries
+from app.services.indicator_data_service import IndicatorDataError, IndicatorDataService
+from app.services.market_data_service import MarketDataService
+
+
+def make_series(bars=50):
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, bars))
+    return BarSeries(np.arange(bars).astype('datetime64[D]'), close, close + 1, close - 1, close,
+                     np.full(bars, 1e6), symbol='AAPL')
+
+
+@pytest.fixture
+def series(monkeypatch):
+    series = make_series()
+    monkeypatch.setattr(MarketDataService, 'get_bar_series', staticmethod(lambda conid, period, bar: series))
+    return series
+
+
+@pytest.mark.parametrize('precision', [-1, 13])
+def test_out_of_range_precision_is_rejected(series, precision):
+    with pytest.raises(IndicatorDataError, match='precision'):
+        IndicatorDataService.get_indicator_data('265598', precision=precision)
+
+
+def test_precision_only_versions_json(series):
+    fields = ('date', 'close')
+
+    def etag(data_format, precision):
+        return IndicatorDataService.etag('265598', '1y', '1d', series, fields, 20, data_format, precision)
+
+    assert etag('json', 2) != etag('json', 4)
+    assert etag('arrow', 2) == etag('arrow', 4)
+    assert etag('msgpack', 2) == etag('msgpack', 4)
@@ -0,0 +1,74 @@
+"""The vectorized indicator engine must agree with the Decimal reference implementation
+
+Run from the webapp directory: python -m pytest tests
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+import pytest
+from app.utils.indicators import MODE_DECIMAL, MODE_VECTORIZED, calculate_indicators
+from app.models.quote import Quote
+
+LENGTHS = [0, 1, 2, 5, 14, 15, 27, 35, 60, 250]
+
+
+def make_quotes(count, seed=0):
+    """Random-walk daily bars as Decimal quotes"""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0002, 0.015, count)))
+    open_ = close * (1 + rng.normal(0, 0.004, count))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, count)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, count)))
+    volume = rng.integers(100_000, 5_000_000, count)
+    start = datetime(2020, 1, 1)
+    return [
+        Quote(start + timedelta(days=i), *(Decimal(str(round(float(column[i]), 4))) for column in (open_, high, low, close)),
+              Decimal(int(volume[i])))
+        for i in range(count)
+    ]
+
+
+def flatten(indicators, prefix=''):
+    flat = {}
+    for key, value in indicators.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def pairs(count, seed=0):
+    quotes = make_quotes(count, seed)
+    reference = flatten(calculate_indicators(quotes, MODE_DECIMAL))
+    vectorized = flatten(calculate_indicators(quotes, MODE_VECTORIZED))
+    for name, expected in reference.items():
+        yield name, expected, vectorized[name]
+
+
+@pytest.mark.parametrize('count', LENGTHS)
+def test_modes_agree(count):
+    for name, expected, actual in pairs(count):
+        actual = np.asarray(actual, dtype=np.float64)
+        assert actual.shape == (count,), name
+        undefined = np.array([value is None for value in expected], dtype=bool)
+        # None in the reference is NaN in the vectorized result, at the same bars
+        np.testing.assert_array_equal(np.isnan(actual), undefined, err_msg=f"NaN placement of {name}")
+        reference = np.array([0.0 if value is None else float(value) for value in expected])
+        np.testing.assert_allclose(actual[~undefined], reference[~undefined], rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_supertrend_direction_matches_and_holds_trends(seed):
+    quotes = make_quotes(500, seed)
+    reference = calculate_indicators(quotes, MODE_DECIMAL)['supertrend']['direction']
+    direction = np.asarray(calculate_indicators(quotes, MODE_VECTORIZED)['supertrend']['direction'])
+    assert direction.tolist() == reference
+    # A trend usually lasts several bars; flipping on most bars means the stop is reset to the wrong band
+    flips = np.count_nonzero(np.diff(direction[11:]))
+    assert flips < len(direction) // 4
+
+
+def test_empty_series():
+    indicators = flatten(calculate_indicators([], MODE_VECTORIZED))
+    assert all(len(values) == 0 for values in indicators.values())
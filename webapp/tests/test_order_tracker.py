@@ -0,0 +1,56 @@
+"""OrderTracker event delivery across stop() and a later track()
+
+Run from the webapp directory: python -m pytest tests
+"""
+import threading
+from app.services.order_tracker import OrderTracker
+
+
+class FakeResponse:
+    def __init__(self, body=None):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeGateway:
+    def __init__(self):
+        self.orders = []
+
+    def get(self, path):
+        return FakeResponse({'orders': list(self.orders)})
+
+
+class FakeWebhook:
+    def __init__(self):
+        self.events = []
+        self.received = threading.Event()
+
+    def post(self, path, json=None):
+        self.events.append(json)
+        self.received.set()
+        return FakeResponse()
+
+
+def test_track_after_stop_still_emits_events():
+    gateway, webhook = FakeGateway(), FakeWebhook()
+    tracker = OrderTracker(fast_interval=0.01, fast_window=60, slow_interval=0.01, client=gateway,
+                           webhook_client=webhook)
+    tracker.track('1', quantity=10)
+    tracker.stop()
+
+    listened = []
+    tracker.add_listener(listened.append)
+    tracker.track('2', quantity=10)
+    gateway.orders = [{'orderId': '2', 'status': 'Filled', 'filledQuantity': 10, 'avgPrice': '101.5'}]
+    try:
+        assert webhook.received.wait(timeout=5)
+    finally:
+        tracker.stop()
+
+    assert [event['event'] for event in listened] == ['fill', 'status_change']
+    assert [event['order_id'] for event in webhook.events] == ['2', '2']
@@ -0,0 +1,21 @@
+"""QuoteTable row removal
+
+Run from the webapp directory: python -m pytest tests
+"""
+from app.utils.quote_table import QuoteTable
+
+
+def test_removed_conid_misses_and_other_rows_keep_their_values():
+    table = QuoteTable(['last_price', 'bid'], capacity=2)
+    for conid, price in (('1', 10.0), ('2', 20.0), ('3', 30.0)):
+        table.update(conid, {'last_price': price, 'bid': price - 1})
+    misses = []
+    table.on_miss = misses.extend
+
+    table.remove('1')
+
+    assert '1' not in table and len(table) == 2
+    assert table.last('1') is None and misses == ['1']
+    assert table.last('2')[0] == 20.0 and table.get('3')['bid'] == 29.0
+    table.update('4', {'last_price': 40.0})
+    assert table.last('4')[0] == 40.0 and table.get('4')['bid'] is None
@@ -0,0 +1,28 @@
+"""Scan expression truth values
+
+Run from the webapp directory: python -m pytest tests
+"""
+import numpy as np
+import pytest
+from app.models.bar_series import BarSeries
+from app.utils.scanner import Panel, scan
+
+
+def make_panel(bars=30):
+    rng = np.random.default_rng(0)
+    series = {}
+    for conid in ('1', '2'):
+        close = 100 + np.cumsum(rng.normal(0, 1, bars))
+        series[conid] = BarSeries(np.arange(bars).astype('datetime64[D]'), close, close + 1, close - 1, close,
+                                  np.full(bars, 1e6), symbol=conid)
+    return Panel.from_series(series, bars)
+
+
+@pytest.mark.parametrize('expression', ['sma_200', 'sma_200 and close > 0', 'sma_200 > 0 or sma_200'])
+def test_warming_up_indicator_fails_the_filter(expression):
+    # 30 bars leave the 200-bar SMA undefined (NaN) on the latest bar
+    assert scan(make_panel(), expression) == []
+
+
+def test_defined_values_still_pass():
+    assert [hit['symbol'] for hit in scan(make_panel(), 'sma_20 or sma_200')] == ['1', '2']